@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Nikos Cafe — Pipeline Benchmark
+Headless timing of every loader and rollup stage on synthetic workbooks
+(see nikos_synth.py), with per-stage peak memory. Results go to a JSON file
+so runs from different commits can be diffed for regressions.
+
+Usage:
+  python nikos_bench.py                          # small + medium
+  python nikos_bench.py --sizes small,large --out bench_results.json
+  python nikos_bench.py --sizes xl --no-memory   # skip the traced second pass
+"""
+
+import argparse, copy, datetime as dt, json, platform, resource, shutil, subprocess, time, tracemalloc
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+import nikos_partitions
+import nikos_rollups
+import nikos_store
+import nikos_synth
+from nikos_data import (CACHE_DIR, SALES_FIELDS, cached_frames, memory_report, parse_inventory,
+                        parse_sales_incremental, parse_sales_workbook)
+from nikos_engine import build_aggregates, build_drilldowns, slot_heatmaps
+
+# history length × invoice volume per preset
+SIZES = {
+    'small':  dict(weeks=8,   invoice_lines=5_000),
+    'medium': dict(weeks=52,  invoice_lines=100_000),
+    'large':  dict(weeks=156, invoice_lines=1_000_000),
+    'xl':     dict(weeks=520, invoice_lines=3_000_000),
+}
+
+# ─────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def measure(fn, memory=True):
+    """Run fn() for wall time; with `memory`, run it again under tracemalloc for its peak.
+
+    The traced pass is separate so tracing overhead never leaks into the timing.
+    Returns (result, {'seconds': …, 'peak_mb': …}).
+    """
+    t = time.perf_counter()
+    out = fn()
+    stats = {'seconds': round(time.perf_counter() - t, 4)}
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            stats['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+    return out, stats
+
+def workbooks(workdir, size):
+    """Synthetic workbooks for a preset, generated once and reused across runs."""
+    out = Path(workdir) / size
+    sales_path = out / 'combined_sales_data.xlsx'
+    inv_path   = out / 'COMBINED_Master_Analysis.xlsx'
+    if not (sales_path.exists() and inv_path.exists()):
+        p = SIZES[size]
+        nikos_synth.generate(out, 7 * p['weeks'], p['invoice_lines'])
+    return sales_path, inv_path
+
+# ─────────────────────────────────────────
+# STAGES
+# ─────────────────────────────────────────
+def run_size(size, workdir, memory=True):
+    """Time every pipeline stage for one preset; returns the scenario record."""
+    sales_path, inv_path = workbooks(workdir, size)
+    shutil.rmtree(sales_path.parent / CACHE_DIR, ignore_errors=True)   # cold caches
+    stages = {}
+
+    def stage(name, fn):
+        out, stages[name] = measure(fn, memory)
+        print(f"  {name:<26} {stages[name]['seconds']:>9.3f}s"
+              + (f"  {stages[name]['peak_mb']:>9.1f} MB" if 'peak_mb' in stages[name] else ''))
+        return out
+
+    fin_df, slots_df = stage('parse_sales_workbook', lambda: parse_sales_workbook(sales_path))
+    stage('sales_incremental_cold', lambda: (shutil.rmtree(sales_path.parent / CACHE_DIR, ignore_errors=True),
+                                             parse_sales_incremental(sales_path)))
+    stage('sales_incremental_warm', lambda: parse_sales_incremental(sales_path))
+    inv_df = stage('parse_inventory', lambda: parse_inventory(inv_path))
+    stage('arrow_cache_write', lambda: (shutil.rmtree(sales_path.parent / CACHE_DIR, ignore_errors=True),
+                                        cached_frames(sales_path, 'sales', parse_sales_incremental, key=SALES_FIELDS),
+                                        cached_frames(inv_path, 'inventory', parse_inventory)))
+    stage('arrow_cache_read', lambda: (cached_frames(sales_path, 'sales', parse_sales_incremental, key=SALES_FIELDS),
+                                       cached_frames(inv_path, 'inventory', parse_inventory)))
+    agg   = stage('build_aggregates', lambda: build_aggregates(fin_df, inv_df))
+    tail  = max(len(inv_df) // SIZES[size]['weeks'], 1)                # ≈ one week of new invoice lines
+    prior = stage('rollups_full', lambda: nikos_rollups.inventory_rollups(inv_df.iloc[:-tail]))
+    stage('rollups_append_week', lambda: nikos_rollups.fold_inventory(copy.deepcopy(prior), inv_df.iloc[-tail:]))
+    drill = stage('build_drilldowns', lambda: build_drilldowns(fin_df, slots_df, agg))
+    stage('slot_heatmaps', lambda: slot_heatmaps(drill['slots']))
+    parts = Path(workdir) / size / 'parts'
+    stage('partitions_write', lambda: (shutil.rmtree(parts, ignore_errors=True),
+                                       nikos_partitions.write_sales_partitions(parts, fin_df, slots_df),
+                                       nikos_partitions.write_invoice_partitions(parts, inv_df)))
+    stage('partitions_read', lambda: (nikos_partitions.read_sales_partitions(parts / nikos_partitions.SALES_DIR),
+                                      nikos_partitions.read_invoice_partitions(parts / nikos_partitions.INVOICE_DIR)))
+    stage('partitions_read_90d', lambda: (nikos_partitions.read_sales_partitions(parts / nikos_partitions.SALES_DIR, 90),
+                                          nikos_partitions.read_invoice_partitions(parts / nikos_partitions.INVOICE_DIR, 90)))
+    db = stage('invoice_db_build', lambda: (nikos_store.invoice_db_path(inv_path).unlink(missing_ok=True),
+                                            nikos_store.build_invoice_db(inv_path, inv_df))[1])
+    stage('invoice_db_drilldowns', lambda: [(nikos_store.subcategory_spend(db, c), nikos_store.category_items(db, c))
+                                            for c in drill['categories']])
+
+    frames = memory_report({'sales': fin_df, 'slots': slots_df, 'inventory': inv_df})
+    for r in frames.itertuples():
+        print(f"  mem.{r.frame:<22} {r.before_mb:>9.1f} MB → {r.after_mb:>7.1f} MB  (-{r.saved_pct:.0f}%)")
+
+    return {'size': size, 'params': SIZES[size],
+            'rows': {'days': len(fin_df), 'slots': len(slots_df), 'invoice_lines': len(inv_df)},
+            'frames_memory': frames.to_dict('records'),
+            'stages': stages}
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Benchmark the Nikos loaders and rollups on synthetic data.')
+    ap.add_argument('--sizes', default='small,medium', help=f"comma list of {', '.join(SIZES)}")
+    ap.add_argument('--workdir', default='bench_data', help='where synthetic workbooks are generated and kept')
+    ap.add_argument('--out', default='bench_results.json')
+    ap.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass (timings only)')
+    a = ap.parse_args(argv)
+
+    sizes = [s.strip() for s in a.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        ap.error(f"unknown size(s): {', '.join(unknown)}")
+
+    scenarios = []
+    for size in sizes:
+        print(f"▶ {size}  {SIZES[size]}")
+        scenarios.append(run_size(size, a.workdir, memory=not a.no_memory))
+
+    result = {
+        'timestamp': dt.datetime.now().isoformat(timespec='seconds'),
+        'commit':    _git_commit(),
+        'python':    platform.python_version(),
+        'pandas':    pd.__version__,
+        'numpy':     np.__version__,
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'scenarios': scenarios,
+    }
+    Path(a.out).write_text(json.dumps(result, indent=2))
+    print(f"✅ wrote {a.out}")
+
+if __name__ == '__main__':
+    main()
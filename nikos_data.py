@@ -0,0 +1,727 @@
+"""
+Nikos Cafe — Data Layer
+Workbook parsing for the dashboard: daily POS sales sheets + supplier invoices
+"""
+
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import hashlib, json, os, pickle, threading, zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from openpyxl.reader.excel import ExcelReader
+from openpyxl.reader.strings import read_string_table
+
+CACHE_DIR = '.nikos_cache'   # lives next to the workbooks, e.g. data/.nikos_cache/
+
+# Day sheets are parsed across this many processes (1 = serial). Set NIKOS_PARSE_WORKERS for backfills.
+PARSE_WORKERS = int(os.environ.get('NIKOS_PARSE_WORKERS', '1'))
+
+# ─────────────────────────────────────────
+# CALENDAR DIMENSION — Thu–Wed weeks, academic terms
+# 1970-01-01 was a Thursday, so whole weeks since the epoch are Thu–Wed
+# weeks and `week_key` is a plain integer that sorts chronologically.
+# ─────────────────────────────────────────
+_THURSDAY = np.datetime64('1970-01-01', 'D')
+DAY_NAMES = np.array(['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'])
+
+# (month, day, term) — first day of each academic term; Fall starts the academic year
+TERM_STARTS = ((1, 1, 'Spring'), (5, 16, 'Summer'), (8, 16, 'Fall'))
+
+def week_frame(week_keys):
+    """week_start / week_label for integer week keys (label format: 'Jan 15 – Jan 21')."""
+    keys  = np.asarray(week_keys, dtype=np.int64)
+    start = pd.DatetimeIndex(_THURSDAY + keys * 7)
+    label = start.strftime('%b %d') + ' – ' + (start + pd.Timedelta(days=6)).strftime('%b %d')
+    return pd.DataFrame({'week_key': keys, 'week_start': start, 'week_label': np.asarray(label, dtype=object)})
+
+def build_calendar(start, end, operating_dates=None):
+    """One row per day from start to end: week key/start/label, day of week, academic term and an operating-day flag."""
+    days  = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    since = (days - _THURSDAY).astype(np.int64)
+    cal   = pd.DataFrame({'Date': pd.DatetimeIndex(days), 'week_key': since // 7, 'dow': (since + 3) % 7})
+    weeks = week_frame(np.unique(cal['week_key'].values))
+    pos   = cal['week_key'].values - weeks['week_key'].values[0]
+    cal['week_start'] = weeks['week_start'].values[pos]
+    cal['week_label'] = weeks['week_label'].values[pos]
+    cal['day_name']   = DAY_NAMES[cal['dow'].values]
+
+    md    = cal['Date'].dt.month.values * 100 + cal['Date'].dt.day.values
+    term  = np.searchsorted([mo * 100 + d for mo, d, _ in TERM_STARTS], md, side='right') - 1
+    year  = cal['Date'].dt.year
+    names = pd.Series([t for _, _, t in TERM_STARTS])
+    cal['term'] = names.values[term] + ' ' + year.astype(str)
+    ay    = year - (term < names.tolist().index('Fall'))
+    cal['academic_year'] = ay.astype(str) + '-' + ((ay + 1) % 100).astype(str).str.zfill(2)
+    cal['is_operating']  = np.isin(days, np.asarray(operating_dates, dtype='datetime64[D]')) \
+                           if operating_dates is not None else False
+    return cal
+
+def attach_calendar(df, date_col, cols=('week_key','week_start','week_label')):
+    """Add calendar columns to df by positional lookup into a calendar spanning its dates."""
+    if df.empty:
+        for c in cols: df[c] = pd.Series(dtype=object)
+        return df
+    days = df[date_col].values.astype('datetime64[D]')
+    cal  = build_calendar(days.min(), days.max())
+    pos  = (days - days.min()).astype(np.int64)
+    for c in cols:
+        df[c] = cal[c].values[pos]
+    return df
+
+# ─────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────
+# Strings pandas' Excel reader turns into NaN by default (keep_default_na=True)
+_NA_TOKENS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+def _cell(v):
+    """Normalize one openpyxl value the same way pd.read_excel(header=None) does."""
+    if v is None or v == '':
+        return None
+    if isinstance(v, float):
+        return int(v) if v.is_integer() else v
+    if isinstance(v, str) and (v in ERROR_CODES or v in _NA_TOKENS):
+        return np.nan
+    return v
+
+def sheet_rows(ws):
+    """Read a read-only worksheet into a padded list of rows (pandas layout, NaN for blanks)."""
+    ws.reset_dimensions()
+    data, last = [], -1
+    for i, row in enumerate(ws.iter_rows(values_only=True)):
+        row = [_cell(v) for v in row]
+        while row and row[-1] is None:
+            row.pop()
+        if row:
+            last = i
+        data.append(row)
+    data  = data[:last + 1]
+    width = max((len(r) for r in data), default=0)
+    return [[np.nan if v is None else v for v in r] + [np.nan] * (width - len(r)) for r in data]
+
+# ─────────────────────────────────────────
+# SALES — one sheet per day named YYYY-MM-DD
+# ─────────────────────────────────────────
+# Column-0 label -> fin_df field. New POS lines (e.g. GetApp online totals) only need an
+# entry here; build_sales_frames adds a zero-filled numeric column for every field.
+SALES_FIELDS = {
+    'Gross Sales Before Discounts': 'gross_before',
+    'Total Discounts':              'discounts',
+    'Sales Net VAT':                'net_sales',
+    'Credit Card':                  'credit_card',
+    'Cash':                         'cash',
+}
+
+def _num(v):
+    """float(v), or None when it doesn't convert (text headers, dates)."""
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def parse_day(date, data, fields=None):
+    """Extract the KPI row and 15-min slot rows from one day sheet's rows.
+
+    Column 0 is stripped once into a label index; KPI fields are looked up
+    through `fields` (last numeric match wins) and the slot block is the slice
+    after the 'time_slots' marker, skipping blank and 'Total' rows.
+    """
+    fields = SALES_FIELDS if fields is None else fields
+    width  = len(data[0]) if data else 0
+    if len(data) > 1 and width < 2:
+        raise ValueError("day sheet has no value column")
+    day    = str(data[1][1]) if len(data) > 1 else ''
+    m      = {'Date': date, 'Day': day}
+    labels = [str(r[0]).strip() if r[0] == r[0] else '' for r in data]   # NaN != NaN
+    if width >= 2:
+        for k, row in zip(labels, data):
+            f = fields.get(k)
+            if f is not None:
+                v = _num(row[1])
+                if v is not None: m[f] = v
+
+    slot_rows = []
+    lowered   = [k.lower() for k in labels]
+    if 'time_slots' in lowered and width >= 3:
+        ts = lowered.index('time_slots') + 1
+        for slot, low, row in zip(labels[ts:], lowered[ts:], data[ts:]):
+            if not slot or low in ('nan', 'total'): continue
+            sales = _num(row[1])
+            txns  = _num(row[2]) if row[2] == row[2] else 0
+            if sales is None or txns is None: continue
+            slot_rows.append({'Date': date, 'Day': day, 'Slot': slot, 'Sales': sales, 'Txns': txns})
+    return m, slot_rows
+
+# 15-min POS slots on a fixed minute-of-day grid: slot i starts at minute i * SLOT_MINUTES
+SLOT_MINUTES = 15
+N_SLOTS      = 24 * 60 // SLOT_MINUTES
+
+def slot_minutes(slots):
+    """Minute of day each '11:00 AM - 11:15 AM' label starts at (-1 when unparseable).
+
+    Only the distinct labels are parsed — a multi-year export repeats the same ~50.
+    """
+    labels = slots.astype(str)
+    uniq   = pd.Series(labels.unique())
+    start  = pd.to_datetime(uniq.str.split(' - ').str[0].str.strip(), format='%I:%M %p', errors='coerce')
+    minute = (start.dt.hour * 60 + start.dt.minute).fillna(-1).astype(int)
+    return labels.map(dict(zip(uniq, minute))).astype(np.int16)
+
+def slot_label(minute):
+    """'11:00 AM - 11:15 AM' for the slot starting at `minute`."""
+    fmt = lambda m: f"{(m // 60 - 1) % 12 + 1}:{m % 60:02d} {'AM' if m % 1440 < 720 else 'PM'}"
+    return f"{fmt(minute)} - {fmt(minute + SLOT_MINUTES)}"
+
+def build_sales_frames(rows, slot_rows, fields=None):
+    """Assemble per-day KPI rows and slot rows into the dashboard's fin / slots frames."""
+    fields = SALES_FIELDS if fields is None else fields
+    fin = pd.DataFrame(rows).sort_values('Date')
+    for col in fields.values():
+        fin[col] = pd.to_numeric(fin.get(col, 0), errors='coerce').fillna(0)
+    fin['discount_rate'] = (fin['discounts'] / fin['gross_before'].replace(0, np.nan) * 100).fillna(0)
+    attach_calendar(fin, 'Date', ('week_key','week_start','week_label','term'))
+    slots = pd.DataFrame(slot_rows)
+    if not slots.empty:
+        slots['Avg_Ticket'] = np.where(slots['Txns'] > 0, slots['Sales'] / slots['Txns'], 0)
+        slots['minute']     = slot_minutes(slots['Slot'])
+        slots = compact_frame(slots, SLOT_DTYPES)
+    return fin, slots
+
+def _parse_sheet(ws, fields=None):
+    """Parse one day sheet; None when it isn't a readable YYYY-MM-DD day."""
+    try:
+        date = pd.to_datetime(ws.title)
+        return parse_day(date, sheet_rows(ws), fields)
+    except Exception:
+        return None
+
+def _frames_from_entries(titles, entries, fields):
+    rows, slot_rows = [], []
+    for t in titles:
+        if entries[t] is None: continue
+        rows.append(entries[t][0])
+        slot_rows.extend(entries[t][1])
+    return build_sales_frames(rows, slot_rows, fields)
+
+def parse_sales_workbook(path, workers=None, fields=None):
+    """Open the sales workbook once (read-only, streaming) and parse every day sheet in one pass.
+
+    Sheets whose name isn't a date, or whose layout can't be read, are skipped.
+    With workers > 1 the sheets are spread across a process pool (see parse_sheets);
+    `fields` overrides the SALES_FIELDS label mapping.
+    """
+    workers = PARSE_WORKERS if workers is None else workers
+    fields  = SALES_FIELDS if fields is None else fields
+    if workers > 1:
+        titles = list(workbook_fingerprints(path)[0])
+        return _frames_from_entries(titles, parse_sheets(path, titles, workers, fields), fields)
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        entries = {ws.title: _parse_sheet(ws, fields) for ws in wb.worksheets}
+    finally:
+        wb.close()
+    return _frames_from_entries(list(entries), entries, fields)
+
+# ── PARALLEL PARSING ─────────────────────
+def _parse_chunk(path, titles, fields):
+    """Worker: open just `titles` and parse them. Top-level so it pickles under spawn (macOS)."""
+    wb = open_sheets(path, titles)
+    try:
+        sheets = {ws.title: ws for ws in wb.worksheets}
+        return [(t, _parse_sheet(sheets[t], fields)) for t in titles]
+    finally:
+        wb.close()
+
+def parse_sheets(path, titles, workers=1, fields=None):
+    """Parse the named day sheets -> {title: (kpi_row, slot_rows) or None}.
+
+    With workers > 1 the titles are split into contiguous chunks (4 per worker,
+    so a slow chunk doesn't stall the pool) and each process opens only its own
+    sheets. Every sheet goes through the same _parse_sheet as the serial path,
+    so the merged result, including skipped sheets, is identical.
+    """
+    titles = list(titles)
+    if workers > 1 and len(titles) >= 2 * workers:
+        n      = min(len(titles), workers * 4)
+        chunks = [titles[i * len(titles) // n:(i + 1) * len(titles) // n] for i in range(n)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return dict(kv for part in pool.map(_parse_chunk, [path] * n, chunks, [fields] * n) for kv in part)
+    return dict(_parse_chunk(path, titles, fields)) if titles else {}
+
+# ─────────────────────────────────────────
+# INCREMENTAL SALES INGESTION
+# Parsed KPI + slot rows are kept per day sheet, keyed by sheet name and a
+# content fingerprint, so a daily update only parses the new/changed sheets.
+# ─────────────────────────────────────────
+SHEET_STORE_VERSION = 2
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL  = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG  = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+def _strings_hash(strings):
+    return hashlib.sha1('\x00'.join(strings).encode('utf-8', 'surrogatepass')).hexdigest()
+
+def workbook_fingerprints(path):
+    """Fingerprint every worksheet from the xlsx zip directory (CRC + size), without reading sheet XML.
+
+    Returns (sheets, styles, strings): {title: fingerprint} in workbook order, the
+    styles.xml fingerprint and the shared-string table (list, empty when inline strings are used).
+    """
+    with zipfile.ZipFile(path) as z:
+        rels, sst, styles = {}, None, ''
+        for r in ET.fromstring(z.read('xl/_rels/workbook.xml.rels')).iter(_NS_PKG + 'Relationship'):
+            target = r.get('Target')
+            part   = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+            rels[r.get('Id')] = part
+            if r.get('Type', '').endswith('/sharedStrings'): sst = part
+            if r.get('Type', '').endswith('/styles'):
+                info   = z.getinfo(part)
+                styles = f'{info.CRC:08x}:{info.file_size}'
+        sheets = {}
+        for sh in ET.fromstring(z.read('xl/workbook.xml')).iter(_NS_MAIN + 'sheet'):
+            part = rels.get(sh.get(_NS_REL + 'id'), '')
+            if '/worksheets/' not in part: continue
+            info = z.getinfo(part)
+            sheets[sh.get('name')] = f'{info.CRC:08x}:{info.file_size}'
+        strings = []
+        if sst and sst in z.namelist():
+            with z.open(sst) as f:
+                strings = read_string_table(f)
+    return sheets, styles, strings
+
+class _SheetSubsetReader(ExcelReader):
+    """Read-only ExcelReader that only materializes the named worksheets.
+
+    openpyxl sizes every sheet on open (~1ms each), which would dominate an
+    incremental reload of a multi-year workbook.
+    """
+    def __init__(self, path, titles):
+        super().__init__(path, read_only=True, data_only=True, keep_links=False)
+        self._titles = set(titles)
+
+    def read_worksheets(self):
+        find_sheets = self.parser.find_sheets
+        self.parser.find_sheets = lambda: ((sh, rel) for sh, rel in find_sheets() if sh.name in self._titles)
+        super().read_worksheets()
+
+def open_sheets(path, titles):
+    """Open only `titles` of a workbook (read-only); falls back to a full open."""
+    try:
+        reader = _SheetSubsetReader(path, titles)
+        reader.read()
+        return reader.wb
+    except Exception:
+        return load_workbook(path, read_only=True, data_only=True, keep_links=False)
+
+def sheet_store_path(path):
+    p = Path(path)
+    return p.parent / CACHE_DIR / f'{p.stem}.sheets.pkl'
+
+def _read_store(store_path, version=SHEET_STORE_VERSION):
+    try:
+        with open(store_path, 'rb') as f:
+            store = pickle.load(f)
+        return store if store.get('version') == version else None
+    except Exception:
+        return None
+
+def _write_store(store_path, store):
+    """Atomic write; the store is only an accelerator, so a read-only disk is not an error."""
+    try:
+        store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = store_path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, store_path)
+    except OSError:
+        pass
+
+def parse_sales_incremental(path, store_path=None, workers=None, fields=None):
+    """Same output as parse_sales_workbook, but only parses sheets that are new or changed.
+
+    A cached sheet stays valid while its zip entry is byte-identical, styles.xml is
+    unchanged and the shared-string entries it could reference (the first n strings
+    the store was built against) are unchanged. A different `fields` mapping
+    invalidates the whole store.
+    """
+    fields     = SALES_FIELDS if fields is None else fields
+    store_path = Path(store_path) if store_path else sheet_store_path(path)
+    sheets, styles, strings = workbook_fingerprints(path)
+    store  = _read_store(store_path)
+    cached = {}
+    if store and store['styles'] == styles and store['fields'] == fields and len(strings) >= store['ss_n'] \
+            and _strings_hash(strings[:store['ss_n']]) == store['ss_hash']:
+        cached = store['sheets']
+
+    entries = {t: cached[t][1] for t, fp in sheets.items() if t in cached and cached[t][0] == fp}
+    todo    = [t for t in sheets if t not in entries]
+    entries.update(parse_sheets(path, todo, PARSE_WORKERS if workers is None else workers, fields))
+    if todo or len(cached) != len(sheets):
+        _write_store(store_path, {
+            'version': SHEET_STORE_VERSION, 'styles': styles, 'fields': dict(fields),
+            'ss_n': len(strings), 'ss_hash': _strings_hash(strings),
+            'sheets': {t: (fp, entries[t]) for t, fp in sheets.items()},
+        })
+
+    return _frames_from_entries(list(sheets), entries, fields)
+
+# ─────────────────────────────────────────
+# INVENTORY — single ALL_DATA sheet of invoice lines
+# ─────────────────────────────────────────
+def parse_inventory(path):
+    df = pd.read_excel(path, sheet_name='ALL_DATA')
+    df['Invoice_Date']   = pd.to_datetime(df['Invoice_Date'])
+    df['Category/Class'] = df['Category/Class'].fillna('Uncategorized')
+    df['Subcategory']    = df['Subcategory'].fillna('General')
+    df['Vendor']         = df['Source'].str.strip()
+    attach_calendar(df, 'Invoice_Date')
+    return compact_frame(df, INVENTORY_DTYPES)
+
+# ─────────────────────────────────────────
+# COMPACT DTYPES
+# Repeated labels become categoricals, integer keys are downcast and counts /
+# quantities go to float32. Currency stays float64 so multi-year sums keep
+# their cents. Applied by the loaders, so the Arrow cache, the in-process
+# caches and every copy Streamlit makes of a frame hold the compact form.
+# ─────────────────────────────────────────
+SLOT_DTYPES = {'Day': 'category', 'Slot': 'category', 'Txns': 'float32'}
+
+INVENTORY_DTYPES = {
+    'Invoice_No':           'integer',
+    'Item_Name':            'category',
+    'Qty':                  'float32',
+    'Category/Class':       'category',
+    'Subcategory':          'category',
+    'Standard_Item_Name':   'category',
+    'Source':               'category',
+    'Mapping_Completeness': 'category',
+    'Vendor':               'category',
+    'week_key':             'integer',
+    'week_label':           'category',
+}
+
+def compact_frame(df, dtypes):
+    """Apply a {column: dtype} map in place ('integer' = smallest integer type that fits)."""
+    for col, dtype in dtypes.items():
+        if col not in df:
+            continue
+        if dtype == 'integer':
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+FRAME_DTYPES = {'slots': SLOT_DTYPES, 'inventory': INVENTORY_DTYPES}
+
+def _widen(df, dtypes):
+    """`df` with the `dtypes` columns back in loader form: strings, int64, float64."""
+    out = df.copy()
+    for col, dtype in dtypes.items():
+        if col in df:
+            out[col] = df[col].astype({'category': 'str', 'integer': 'int64'}.get(dtype, 'float64'))
+    return out
+
+def memory_report(frames):
+    """Deep memory per frame as loaded vs. uncompacted: {name: DataFrame} -> DataFrame.
+
+    Names are FRAME_DTYPES keys ('slots', 'inventory'); other frames are reported as-is.
+    """
+    rows = []
+    for name, df in frames.items():
+        after  = df.memory_usage(deep=True).sum()
+        before = _widen(df, FRAME_DTYPES.get(name, {})).memory_usage(deep=True).sum()
+        rows.append({'frame': name, 'rows': len(df), 'before_mb': round(before / 2**20, 3),
+                     'after_mb': round(after / 2**20, 3),
+                     'saved_pct': round((1 - after / before) * 100, 1) if before else 0.0})
+    return pd.DataFrame(rows)
+
+# ─────────────────────────────────────────
+# EMPTY FRAMES — zero-row loader output with the loaders' columns and dtypes,
+# standing in for a source that failed to load so the other source still renders
+# ─────────────────────────────────────────
+def _typed(**cols):
+    return pd.DataFrame({c: pd.Series(dtype=t) for c, t in cols.items()})
+
+def empty_sales_frames():
+    fin = _typed(Date='datetime64[us]', Day='str', **{c: 'float64' for c in SALES_FIELDS.values()},
+                 discount_rate='float64', week_key='int64', week_start='datetime64[s]', week_label='str', term='str')
+    slots = _typed(Date='datetime64[us]', Day='str', Slot='str', Sales='float64', Txns='float64',
+                   Avg_Ticket='float64', minute='int16')
+    return fin, compact_frame(slots, SLOT_DTYPES)
+
+def empty_inventory_frame():
+    df = _typed(Invoice_Date='datetime64[us]', Invoice_No='int64', Item_Name='str', Qty='float64',
+                Unit_Price='float64', Total_Price='float64', **{'Category/Class': 'str'}, Subcategory='str',
+                Standard_Item_Name='str', Source='str', Notes='float64', Mapping_Completeness='str', Vendor='str',
+                week_key='int64', week_start='datetime64[s]', week_label='str')
+    return compact_frame(df, INVENTORY_DTYPES)
+
+# ─────────────────────────────────────────
+# ON-DISK FRAME CACHE
+# Normalized loader output is kept as uncompressed Arrow IPC (Feather v2) files
+# so a cold start is a memory-mapped read instead of an Excel parse. Bump
+# FRAME_CACHE_VERSION whenever a loader's output columns or dtypes change.
+# ─────────────────────────────────────────
+FRAME_CACHE_VERSION = 4
+
+def source_files(path):
+    """Data files under a partition folder (parse caches excluded), in name order."""
+    return sorted(p for p in Path(path).rglob('*') if p.is_file() and CACHE_DIR not in p.parts)
+
+def source_version(path):
+    """Cheap content version of a source file (mtime, size) for keying in-process caches.
+    A partition folder's version is its newest mtime, total size and file count."""
+    if os.path.isdir(path):
+        stats = [p.stat() for p in source_files(path)]
+        return max((s.st_mtime_ns for s in stats), default=0), sum(s.st_size for s in stats), len(stats)
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def source_sha1(path):
+    """Content hash of a source file, or of a partition folder's file names and contents."""
+    if not os.path.isdir(path):
+        return file_sha1(path)
+    h = hashlib.sha1()
+    for p in source_files(path):
+        h.update(f'{p.relative_to(path).as_posix()}\0{file_sha1(p)}\n'.encode())
+    return h.hexdigest()
+
+def _frame_paths(src, name, n):
+    base, stem = Path(src).parent / CACHE_DIR, f'{Path(src).stem}.{name}'
+    return base / f'{stem}.manifest.json', [base / f'{stem}.{i}.arrow' for i in range(n)]
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_manifest(path, manifest):
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+def _cache_is_valid(manifest, path, src, stat, key):
+    """mtime + size is the fast path; a touched-but-identical file (git checkout, cp) is rescued by its hash."""
+    if not manifest or manifest.get('version') != FRAME_CACHE_VERSION or manifest.get('key') != key:
+        return False
+    if manifest['mtime_ns'] == stat.st_mtime_ns and manifest['size'] == stat.st_size:
+        return True
+    if manifest['size'] != stat.st_size or manifest['sha1'] != file_sha1(src):
+        return False
+    try:
+        _write_manifest(path, {**manifest, 'mtime_ns': stat.st_mtime_ns})
+    except OSError:
+        pass
+    return True
+
+def cached_frames(src, name, build, key=None):
+    """Return the frames `build(src)` produces, served from the on-disk Arrow cache while src is unchanged.
+
+    `name` identifies the loader (e.g. 'sales'); the cache is rebuilt whenever the
+    source workbook, FRAME_CACHE_VERSION or the JSON-able loader config `key`
+    changes. A single DataFrame or a tuple of DataFrames round-trips as-is.
+    """
+    stat = os.stat(src)
+    manifest_path, _ = _frame_paths(src, name, 0)
+    manifest = _read_manifest(manifest_path)
+    if _cache_is_valid(manifest, manifest_path, src, stat, key):
+        _, paths = _frame_paths(src, name, manifest['n'])
+        try:
+            frames = [feather.read_table(p, memory_map=True).to_pandas() for p in paths]
+            return frames[0] if manifest['single'] else tuple(frames)
+        except (OSError, pa.ArrowException):
+            pass
+
+    sha1   = file_sha1(src)
+    result = build(src)
+    single = isinstance(result, pd.DataFrame)
+    frames = [result] if single else list(result)
+    _, paths = _frame_paths(src, name, len(frames))
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        for df, p in zip(frames, paths):
+            feather.write_feather(df, p, compression='uncompressed')
+        _write_manifest(manifest_path, {'version': FRAME_CACHE_VERSION, 'mtime_ns': stat.st_mtime_ns,
+                                        'size': stat.st_size, 'sha1': sha1, 'n': len(frames), 'single': single,
+                                        'key': key})
+    except (OSError, pa.ArrowException):
+        pass
+    return result
+
+# ─────────────────────────────────────────
+# SHARED DATASET CACHE
+# One in-memory copy of each loaded dataset for every session, evicted least
+# recently used first once their deep size passes the budget. A hit hands out
+# shallow copies: under pandas 3 copy-on-write they share every column buffer,
+# and a caller's in-place edit copies just what it touches, never the cached frame.
+# ─────────────────────────────────────────
+DATASET_CACHE_MB = int(os.environ.get('NIKOS_CACHE_MB', '1024'))
+
+def frame_bytes(value):
+    """Deep memory of a frame or a tuple of frames."""
+    frames = value if isinstance(value, tuple) else (value,)
+    return int(sum(df.memory_usage(deep=True).sum() for df in frames))
+
+def _view(value):
+    return tuple(df.copy(deep=False) for df in value) if isinstance(value, tuple) else value.copy(deep=False)
+
+class DatasetCache:
+    """LRU of loaded frames bounded by total memory rather than entry count.
+
+    get(key, load) returns a zero-copy view of the cached value, calling load()
+    on a miss; concurrent misses on one key wait for a single load. The newest
+    entry is kept even when it alone exceeds the budget.
+    """
+
+    def __init__(self, budget_mb=DATASET_CACHE_MB):
+        self.budget  = budget_mb * 2**20
+        self.nbytes  = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()                      # key -> (value, bytes), oldest first
+        self._loading = {}                                 # key -> lock held while it loads
+        self._lock    = threading.Lock()
+
+    def _hit(self, key):
+        value, _ = self._entries[key]
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _view(value)
+
+    def get(self, key, load):
+        with self._lock:
+            if key in self._entries:
+                return self._hit(key)
+            gate = self._loading.setdefault(key, threading.Lock())
+        with gate:
+            with self._lock:
+                if key in self._entries:                   # loaded by another session while we waited
+                    return self._hit(key)
+                self.misses += 1
+            try:
+                value = load()
+                size  = frame_bytes(value)
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            with self._lock:
+                old = self._entries.pop(key, None)         # e.g. re-added after discard() raced the load
+                if old is not None:
+                    self.nbytes -= old[1]
+                self._entries[key] = (value, size)
+                self.nbytes += size
+                self._loading.pop(key, None)               # only now can a new miss find the entry
+                while self.nbytes > self.budget and len(self._entries) > 1:
+                    _, (_, freed) = self._entries.popitem(last=False)
+                    self.nbytes -= freed
+                    self.evictions += 1
+        return _view(value)
+
+    def discard(self, key):
+        """Drop one entry (e.g. a replaced source version); sessions holding its frames keep them."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'mb': round(self.nbytes / 2**20, 1),
+                    'budget_mb': round(self.budget / 2**20, 1), 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+# ─────────────────────────────────────────
+# SOURCE WATCHING
+# A background thread stats each source every WATCH_INTERVAL seconds and
+# hashes it only once its mtime/size moved and then held still for a poll (so
+# a half-copied workbook is never picked up). The version is the content
+# hash, so a touched-but-identical file keeps it.
+# ─────────────────────────────────────────
+WATCH_INTERVAL = 5.0
+
+class SourceWatcher:
+    """Content versions of named source files, kept current by a daemon thread.
+
+    on_change(old, current) runs on the watcher thread after versions move, with
+    {name: old_version} for the changed sources and every source's current version;
+    `generation` counts those changes so readers can poll it cheaply.
+    """
+
+    def __init__(self, paths, on_change=None, interval=WATCH_INTERVAL):
+        self.paths, self.on_change, self.interval = dict(paths), on_change, interval
+        self.generation = 0
+        self._lock  = threading.Lock()
+        self._stat, self._hash = {}, {}
+        for n, p in self.paths.items():
+            try:
+                self._stat[n], self._hash[n] = source_version(p), source_sha1(p)
+            except OSError:                                # missing for now: version None until it appears
+                self._stat[n] = self._hash[n] = None
+        self._moved = {}                                   # name -> stat seen moving on the last poll
+        self._stop  = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='nikos-source-watcher', daemon=True)
+        self._thread.start()
+
+    def version(self, name):
+        with self._lock:
+            return self._hash[name]
+
+    def versions(self):
+        with self._lock:
+            return dict(self._hash)
+
+    def poll(self):
+        """One check of every source; returns {name: old_version} for the ones whose content changed."""
+        changed = {}
+        for name, path in self.paths.items():
+            try:
+                stat = source_version(path)
+                if stat == self._stat[name]:
+                    continue
+                if self._moved.get(name) != stat:          # still being written: wait for it to settle
+                    self._moved[name] = stat
+                    continue
+                sha1 = source_sha1(path)
+            except OSError:                                # mid-replace; try again next poll
+                continue
+            del self._moved[name]
+            with self._lock:
+                self._stat[name], old = stat, self._hash[name]
+                if sha1 != old:
+                    self._hash[name], changed[name] = sha1, old
+        if changed:
+            with self._lock:
+                self.generation += 1
+            if self.on_change:
+                self.on_change(changed, self.versions())
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:                              # a failed callback must not kill the watcher
+                pass
+
+    def stop(self):
+        self._stop.set()
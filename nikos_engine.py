@@ -0,0 +1,478 @@
+"""
+Nikos Cafe — Analytics Engine
+Rollups of the loaded sales + inventory frames. build_aggregates depends only
+on the data, so the dashboard computes it once per data version; sidebar
+settings are applied afterwards by apply_settings as cheap post-processing on
+those small tables.
+"""
+
+import numpy as np
+import pandas as pd
+import nikos_rollups
+from nikos_data import N_SLOTS, SLOT_MINUTES, slot_label, week_frame
+from nikos_perf import stopwatch
+
+DOW_ORDER       = ['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']
+PERISHABLE_CATS = ['PRODUCE','DAIRY PROD & SUBS','PROTEIN','SEAFOOD','GROCERY REFRIGERATED']
+
+# ─────────────────────────────────────────
+# WEEKLY
+# ─────────────────────────────────────────
+def weekly_rollup(sales, inv):
+    """Thu–Wed weekly sales merged with weekly inventory spend, plus the derived ratios.
+
+    Reads the incremental stores from nikos_rollups, so only the ratios are
+    recomputed — over the weekly table, never the raw rows.
+    """
+    weekly_inv = nikos_rollups.weekly_inventory(inv)
+    weekly = nikos_rollups.weekly_sales(sales).merge(weekly_inv, on='week_key', how='left')
+    weekly['inv_spend'] = weekly['inv_spend'].fillna(0)
+    return add_weekly_ratios(weekly), weekly_inv
+
+def add_weekly_ratios(weekly):
+    """Derived weekly columns; only reads the weekly table itself."""
+    weekly['food_cost_pct'] = (weekly['inv_spend'] / weekly['net_sales'].replace(0, np.nan) * 100).round(1)
+    weekly['fc_pct_gross']  = (weekly['inv_spend'] / weekly['gross_before'] * 100).round(1)
+    weekly['gross_profit']  = weekly['net_sales'] - weekly['inv_spend']
+    weekly['discount_rate'] = (weekly['discounts'] / weekly['gross_before'].replace(0, np.nan) * 100).round(1)
+    weekly['wow_net']       = weekly['net_sales'].pct_change()   * 100
+    weekly['wow_gross']     = weekly['gross_before'].pct_change() * 100
+
+    avg_wk_spend = weekly['inv_spend'].mean()
+    weekly['spend_vs_avg']    = ((weekly['inv_spend'] - avg_wk_spend) / avg_wk_spend * 100).round(1)
+    weekly['status']          = np.select([weekly['spend_vs_avg'] > 20, weekly['spend_vs_avg'] > -20],
+                                          ['🔴 Over', '🟢 Normal'], '🟡 Under')
+    weekly['spend_per_sales'] = (weekly['inv_spend'] / weekly['net_sales'] * 100).round(1)
+    return weekly
+
+# ─────────────────────────────────────────
+# AGGREGATE CUBE
+# ─────────────────────────────────────────
+@np.errstate(divide='ignore', invalid='ignore')    # an empty (failed) source leaves NaN ratios, shown as —
+def build_aggregates(fin_df, inv_df, rollups=None):
+    """Every rollup the dashboard shows that doesn't depend on sidebar settings.
+
+    Returns a flat dict of small frames and scalars: weekly, day-of-week,
+    category×week, vendor×week, item×date and protein views plus overall KPIs.
+    `rollups` is a (sales, inventory) pair of nikos_rollups stores for these
+    frames; without it they are folded in memory.
+    """
+    a, split = {}, stopwatch('agg')
+    sales_r, inv_r = rollups or (nikos_rollups.sales_rollups(fin_df), nikos_rollups.inventory_rollups(inv_df))
+    split('rollups')
+    a['weekly'], weekly_inv = weekly_rollup(sales_r, inv_r)
+    split('weekly')
+
+    # Overall KPIs
+    a['total_sales']          = total_sales = fin_df['net_sales'].sum()
+    a['total_gross']          = total_gross = fin_df['gross_before'].sum()
+    a['total_inv']            = total_inv   = inv_df['Total_Price'].sum()
+    a['total_discounts']      = fin_df['discounts'].sum()
+    a['total_credit_card']    = fin_df['credit_card'].sum()
+    a['overall_fc_pct']       = round(total_inv / total_sales * 100, 1)   # vs net — operational view
+    a['overall_fc_pct_gross'] = round(total_inv / total_gross * 100, 1)   # vs gross — contract view
+    a['contract_disc_pct']    = round(a['total_discounts'] / total_gross * 100, 1)  # Aramark/Sodexo discount rate
+    a['cc_sales_pct']         = round(a['total_credit_card'] / total_gross * 100, 1)  # full-price CC %
+    a['avg_daily_net']        = fin_df['net_sales'].mean()
+    a['avg_daily_gross']      = fin_df['gross_before'].mean()
+    a['n_days']               = fin_df['Date'].nunique()
+    a['date_range_str']       = f"{fin_df['Date'].min().strftime('%b %d')} – {fin_df['Date'].max().strftime('%b %d, %Y')}" \
+                                if not fin_df.empty else 'no sales data'
+
+    # Day of week
+    a['dow_stats'] = fin_df.groupby('Day').agg(
+        avg_net   = ('net_sales',    'mean'),
+        avg_gross = ('gross_before', 'mean'),
+        avg_disc  = ('discount_rate','mean'),
+        count     = ('Date',         'count')
+    ).reindex(DOW_ORDER).reset_index()
+    split('kpis_dow')
+
+    # Category / vendor / item
+    cat_spend = inv_df.groupby('Category/Class', observed=True)['Total_Price'].sum().sort_values(ascending=False).reset_index()
+    cat_spend['% of Inv']       = (cat_spend['Total_Price'] / total_inv    * 100).round(1)
+    cat_spend['% of Net Sales'] = (cat_spend['Total_Price'] / total_sales  * 100).round(1)
+    cat_spend['% of Gross']     = (cat_spend['Total_Price'] / total_gross  * 100).round(1)
+    a['cat_spend']     = cat_spend
+    a['n_categories']  = inv_df['Category/Class'].nunique()
+    a['n_items']       = inv_df['Standard_Item_Name'].nunique()
+    a['top_items']     = inv_df.groupby('Standard_Item_Name', observed=True)['Total_Price'].sum().sort_values(ascending=False).head(12).reset_index()
+    vendor_spend       = inv_df.groupby('Vendor', observed=True)['Total_Price'].sum()
+    a['rd_spend']      = vendor_spend.get('Restaurant Depot', 0.0)
+    a['pfs_spend']     = vendor_spend.get('Performance Food Service', 0.0)
+    a['vendor_weekly'] = nikos_rollups.vendor_weekly(inv_r)
+    a['cat_subcat']    = inv_df.groupby(['Category/Class','Subcategory'], observed=True)['Total_Price'].sum() \
+                               .reset_index().sort_values('Total_Price', ascending=False)
+    a['cat_items']     = inv_df.groupby(['Category/Class','Standard_Item_Name','Vendor'], observed=True).agg(
+        spend=('Total_Price','sum'), qty=('Qty','sum'), lines=('Total_Price','count'),
+        last_purchase=('Invoice_Date','max')).reset_index().sort_values('spend', ascending=False)
+    a['item_daily']    = inv_df.groupby(['Category/Class','Standard_Item_Name','Invoice_Date'], observed=True).agg(
+        unit_price=('Unit_Price','mean'), spend=('Total_Price','sum'), qty=('Qty','sum')).reset_index()
+    split('category_vendor_item')
+
+    # Purchasing consistency — category × week, std dev from the running moments
+    cat_weekly = nikos_rollups.category_weekly(inv_r)
+    cat_stats  = nikos_rollups.category_moments(inv_r)
+    cat_stats.columns = ['Category','Avg Weekly Spend','Std Dev']
+    cat_stats['Std Dev'] = cat_stats['Std Dev'].fillna(0)
+    cat_stats['CV %']    = (cat_stats['Std Dev'] / cat_stats['Avg Weekly Spend'] * 100).round(1)
+    cat_stats['Risk']    = np.select([cat_stats['CV %'] > 50, cat_stats['CV %'] > 25],
+                                     ['🔴 High', '🟡 Moderate'], '🟢 Consistent')
+    a['cat_weekly'] = cat_weekly
+    a['cat_stats']  = cat_stats.sort_values('CV %', ascending=False)
+    split('consistency')
+
+    # Perishables
+    p_items = inv_df[inv_df['Category/Class'].isin(PERISHABLE_CATS)].groupby(
+        ['Standard_Item_Name','Category/Class'], observed=True
+    ).agg(total_spend=('Total_Price','sum'), total_qty=('Qty','sum'), orders=('Invoice_No','nunique')).reset_index()
+    a['perishables'] = p_items.sort_values('total_spend', ascending=False).head(15)
+    split('perishables')
+
+    # Protein
+    protein_df = inv_df[inv_df['Category/Class'] == 'PROTEIN']
+    a['total_protein'] = total_protein = protein_df['Total_Price'].sum()
+    a['protein_pct']   = round(total_protein / total_inv * 100, 1)
+    protein_weekly = cat_weekly.loc[cat_weekly['Category/Class'] == 'PROTEIN', ['week_key','Total_Price']] \
+                               .reset_index(drop=True)
+    protein_weekly.insert(1, 'week_label', week_frame(protein_weekly['week_key'])['week_label'].values)
+    prot_inv_merge = protein_weekly.merge(weekly_inv, on='week_key', how='left')
+    protein_weekly['pct_of_inv'] = (prot_inv_merge['Total_Price'] / prot_inv_merge['inv_spend'] * 100).round(1).values
+    a['protein_weekly']     = protein_weekly
+    a['avg_protein_weekly'] = protein_weekly['Total_Price'].mean()
+    a['latest_protein_pct'] = protein_weekly['pct_of_inv'].iloc[-1] if not protein_weekly.empty else 0
+    a['prot_items'] = protein_df.groupby('Standard_Item_Name', observed=True)['Total_Price'].sum().sort_values(ascending=False).reset_index()
+    a['prot_price'] = a['item_daily'].loc[a['item_daily']['Category/Class'] == 'PROTEIN',
+                                          ['Standard_Item_Name','Invoice_Date','unit_price']].sort_values('Invoice_Date')
+    item_spend = inv_df.groupby('Standard_Item_Name', observed=True)['Total_Price'].sum()
+    a['beef_spend'] = item_spend.get('Beef', 0.0)
+    a['lamb_spend'] = item_spend.get('Lamb', 0.0)
+    split('protein')
+
+    # Unit-price creep — every item × vendor
+    a['price_history'], a['price_creep'] = price_creep(inv_df)
+    split('price_creep')
+    return a
+
+# ─────────────────────────────────────────
+# PRICE CREEP
+# ─────────────────────────────────────────
+CREEP_BASELINE    = 8      # previous purchases in each item × vendor baseline
+CREEP_MIN_HISTORY = 3      # purchases needed before a pair is scored
+CREEP_Z           = 2.0    # z-score that makes a move significant
+CREEP_PCT         = 5.0    # % vs baseline that makes a move material
+CREEP_NOISE_FLOOR = 0.01   # std never below 1% of the baseline, so flat price histories don't give infinite z
+
+def price_creep(inv_df, baseline=CREEP_BASELINE):
+    """Unit-price creep for every Standard_Item_Name × Vendor in one vectorized pass.
+
+    Each purchase (item × vendor × invoice date, mean unit price) is compared with
+    the mean / std of that pair's previous `baseline` purchases, taken from running
+    sums that restart at each pair. Returns (history, latest): every purchase with
+    its baseline, std, pct_change and z, and one row per pair for its latest
+    purchase with a status, sorted by z.
+    """
+    h = inv_df.groupby(['Standard_Item_Name','Vendor','Invoice_Date'], observed=True).agg(
+        Category=('Category/Class','first'), unit_price=('Unit_Price','mean')).reset_index()
+    n     = len(h)
+    price = h['unit_price'].to_numpy(dtype=float)
+    pair  = h.groupby(['Standard_Item_Name','Vendor'], observed=True, sort=False).ngroup().to_numpy()
+    start = np.flatnonzero(np.r_[n > 0, pair[1:] != pair[:-1]])          # rows are sorted by pair, then date
+    sizes = np.diff(np.r_[start, n])
+    k     = np.minimum(np.arange(n) - np.repeat(start, sizes), baseline)   # baseline length per purchase
+    i     = np.arange(n)
+    c1, c2 = np.r_[0.0, np.cumsum(price)], np.r_[0.0, np.cumsum(price ** 2)]
+    s1, s2 = c1[i] - c1[i - k], c2[i] - c2[i - k]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(k >= CREEP_MIN_HISTORY, s1 / k, np.nan)
+        std  = np.sqrt(np.clip((s2 - k * mean ** 2) / (k - 1), 0, None))
+        std  = np.maximum(std, CREEP_NOISE_FLOOR * mean)
+        h['baseline']   = mean
+        h['std']        = std
+        h['pct_change'] = (price - mean) / mean * 100
+        h['z']          = (price - mean) / std
+
+    last   = start + sizes - 1
+    latest = h.iloc[last].reset_index(drop=True)
+    latest.insert(3, 'purchases', sizes)
+    latest['since_first_pct'] = (price[last] - price[start]) / price[start] * 100
+    latest['status'] = np.select(
+        [latest['baseline'].isna(),
+         (latest['z'] >= CREEP_Z)  & (latest['pct_change'] >= CREEP_PCT),
+         latest['pct_change'] >= CREEP_PCT,
+         (latest['z'] <= -CREEP_Z) & (latest['pct_change'] <= -CREEP_PCT)],
+        ['⚪ Too few', '🔴 Creep', '🟡 Rising', '🟢 Drop'], '⚪ Stable')
+    latest = latest[['Category','Standard_Item_Name','Vendor','purchases','Invoice_Date','unit_price',
+                     'baseline','pct_change','z','since_first_pct','status']]
+    history = h.drop(columns='Category')
+    return history, latest.sort_values('z', ascending=False, na_position='last').reset_index(drop=True)
+
+# ─────────────────────────────────────────
+# SETTINGS-DEPENDENT KPIS
+# ─────────────────────────────────────────
+# Sidebar defaults; rates are fractions, food cost / protein thresholds are percents.
+DEFAULT_SETTINGS = dict(aramark_rate=0.20, cc_fee_rate=0.03, target_food_cost=38.0,
+                        daily_fixed_cost=800.0, protein_alert_pct=35.0)
+
+def apply_settings(agg, fin_df, settings):
+    """Break-even, fee, food-cost and protein alert results for one set of settings.
+
+    Reads only fin_df's daily totals and build_aggregates' output, so re-applying
+    after a sidebar change is a handful of scalar ops over small tables.
+    """
+    s, k = {**DEFAULT_SETTINGS, **settings}, {}
+    fixed, target = s['daily_fixed_cost'], s['target_food_cost']
+
+    # Break-even
+    k['be_gap']           = agg['avg_daily_net'] - fixed
+    k['days_above_gross'] = int((fin_df['gross_before'] >= fixed).sum())
+    k['days_above_net']   = int((fin_df['net_sales']    >= fixed).sum())
+
+    # Food cost vs target
+    weekly = agg['weekly']
+    k['latest_fc'] = latest_fc = weekly['food_cost_pct'].iloc[-1] if not weekly.empty else 0.0
+    k['fc_status'] = 'bad' if latest_fc > target + 8 else ('warn' if latest_fc > target else 'good')
+
+    # Net profitability after fees
+    k['aramark_fee'] = agg['total_sales'] * s['aramark_rate']
+    k['cc_fee']      = agg['total_credit_card'] * s['cc_fee_rate']
+    k['net_after']   = agg['total_sales'] - agg['total_inv'] - k['aramark_fee'] - k['cc_fee']
+
+    # Protein alert
+    k['protein_alert'] = bool(agg['protein_pct'] > s['protein_alert_pct'])
+
+    # Day of week vs break-even; slow days ranked by average net
+    dow = agg['dow_stats']
+    be_summary = dow[['Day','avg_gross','avg_net','avg_disc','count']].copy()
+    be_summary['vs_break_even'] = be_summary['avg_net'] - fixed
+    be_summary['status'] = np.select([be_summary['vs_break_even'] < 0, be_summary['vs_break_even'] < 200],
+                                     ['🔴 Below BE', '🟡 Near BE'], '🟢 Above BE')
+    k['be_summary'] = be_summary
+    slow_days = dow.dropna(subset=['avg_net']).sort_values('avg_net').head(3).copy()
+    slow_days['gap_to_be']   = slow_days['avg_net'] - fixed
+    slow_days['gap_to_best'] = dow['avg_net'].max() - slow_days['avg_net']
+    k['slow_days'] = slow_days.reset_index(drop=True)
+    k['best_day']  = dow.loc[dow['avg_net'].idxmax(), 'Day'] if dow['avg_net'].notna().any() else None
+    return k
+
+# ─────────────────────────────────────────
+# WHAT-IF SCENARIOS — every combination of contract / cost settings at once
+# ─────────────────────────────────────────
+SCENARIO_AXES = ('aramark_rate', 'cc_fee_rate', 'daily_fixed_cost', 'target_food_cost')
+
+def scenario_grid(agg, fin_df, **axes):
+    """apply_settings' money KPIs for every combination of the given setting values
+    (axes not given stay at DEFAULT_SETTINGS), one row per scenario.
+
+    Each setting is its own array dimension, so a metric only broadcasts over the
+    settings it reads: fees scale the totals, fixed costs are searched against the
+    sorted daily net, and weekly margins are (weeks × commission × fee × fixed).
+    Weekly margin = net − inventory − commission − CC fee − fixed costs × days open.
+    """
+    values = [np.atleast_1d(np.asarray(axes.get(a, DEFAULT_SETTINGS[a]), dtype=float)) for a in SCENARIO_AXES]
+    shape  = tuple(len(v) for v in values)
+    rate, fee, fixed, target = np.ix_(*values)            # (n,1,1,1), (1,n,1,1), …
+    m = {}
+
+    # Totals after fees (and after fixed costs for every loaded day)
+    m['net_after']       = agg['total_sales'] * (1 - rate) - agg['total_inv'] - agg['total_credit_card'] * fee
+    m['net_after_fixed'] = m['net_after'] - fixed * len(fin_df)
+
+    # Days at or above break-even (net_sales >= fixed)
+    daily = np.sort(fin_df['net_sales'].to_numpy(dtype=float))
+    daily = daily[~np.isnan(daily)]
+    m['days_above_be'] = len(daily) - np.searchsorted(daily, fixed, side='left')
+
+    # Weekly margins, weeks leading
+    weekly = agg['weekly']
+    col    = lambda c: weekly[c].to_numpy(dtype=float).reshape(-1, 1, 1, 1, 1)
+    open_days = fin_df.groupby('week_key').size().reindex(weekly['week_key'], fill_value=0).to_numpy(dtype=float)
+    margin = (col('net_sales') * (1 - rate) - col('inv_spend') - col('credit_card') * fee
+              - open_days.reshape(-1, 1, 1, 1, 1) * fixed)
+    with np.errstate(invalid='ignore'):                   # no weeks loaded: NaN average
+        m['avg_weekly_margin'] = margin.sum(axis=0) / len(weekly)
+    m['weeks_positive']  = (margin > 0).sum(axis=0)
+    m['weeks_on_target'] = (col('food_cost_pct')[..., 0] <= target.ravel()).sum(axis=0).reshape(target.shape)
+
+    grid = np.meshgrid(*values, indexing='ij')
+    return pd.DataFrame({**{a: g.ravel() for a, g in zip(SCENARIO_AXES, grid)},
+                         **{k: np.broadcast_to(v, shape).ravel() for k, v in m.items()}})
+
+# ─────────────────────────────────────────
+# TABLE PAGES — server-side search / sort / slice for long tables
+# ─────────────────────────────────────────
+PAGE_SIZE = 50
+
+def table_page(df, page=1, size=PAGE_SIZE, sort=None, descending=False, search='', search_cols=()):
+    """One page of df after a case-insensitive substring search over `search_cols` and a
+    stable sort; returns (page rows, matching row count). Categorical columns are matched
+    once per category rather than once per row."""
+    if search:
+        hit = np.zeros(len(df), dtype=bool)
+        for c in search_cols:
+            col = df[c]
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                match = col.cat.categories.astype(str).str.contains(search, case=False, regex=False)
+                hit  |= np.append(match, False)[col.cat.codes.to_numpy()]    # code -1 (NaN) picks the False
+            else:
+                hit  |= col.astype(str).str.contains(search, case=False, regex=False).to_numpy()
+        df = df[hit]
+    if sort:
+        df = df.sort_values(sort, ascending=not descending, kind='stable', na_position='last')
+    pages = max(-(-len(df) // size), 1)
+    start = (min(max(page, 1), pages) - 1) * size          # past the last page shows the last page
+    return df.iloc[start:start + size], len(df)
+
+# ─────────────────────────────────────────
+# LONG SERIES — chart-sized views of daily history
+# ─────────────────────────────────────────
+SERIES_MAX_POINTS = 600                       # most points per trace sent to the browser
+AUTO_GRAIN_DAYS   = (('D', 2 * 365), ('W', 8 * 365))   # longest span shown per grain under 'Auto'
+
+def lttb_indices(x, y, n):
+    """Largest-Triangle-Three-Buckets: positions of `n` points of (x, y) that keep its visual shape.
+
+    First and last points are always kept; each bucket in between keeps the point
+    forming the largest triangle with the previous pick and the next bucket's mean.
+    """
+    m = len(y)
+    if n >= m or n < 3:
+        return np.arange(m)
+    x = np.asarray(x)
+    x = (x.astype('datetime64[ns]').view(np.int64) if x.dtype.kind == 'M' else x).astype(float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    edges = (np.arange(n - 1) * ((m - 2) / (n - 2))).astype(int) + 1    # n-2 buckets over points 1 … m-2
+    out, a = np.empty(n, dtype=int), 0
+    out[0], out[-1] = 0, m - 1
+    for i in range(n - 2):
+        lo, hi  = edges[i], edges[i + 1]
+        nxt     = slice(hi, edges[i + 2] if i + 2 < len(edges) else m)
+        cx, cy  = x[nxt].mean(), y[nxt].mean()
+        area    = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a       = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+def trend_frame(df, date_col, cols, window_days=None, grain='Auto'):
+    """Chart-ready view of daily `cols`: last `window_days`, at grain 'D' / 'W' / 'M' (or 'Auto').
+
+    Weekly (Thu–Wed) and monthly rows are per-day averages, so daily reference
+    lines such as break-even still apply. Daily views longer than
+    SERIES_MAX_POINTS are LTTB-downsampled on the first column.
+    Returns (frame, grain, n_days).
+    """
+    d = df[[date_col, *cols]]
+    if window_days and not d.empty:
+        d = d[d[date_col] > d[date_col].max() - pd.Timedelta(days=window_days)]
+    n_days = len(d)
+    if grain == 'Auto':
+        span  = (d[date_col].max() - d[date_col].min()).days + 1 if n_days else 0
+        grain = next((g for g, days in AUTO_GRAIN_DAYS if span <= days), 'M')
+    if grain == 'D':
+        if n_days > SERIES_MAX_POINTS:
+            d = d.iloc[lttb_indices(d[date_col].to_numpy(), d[cols[0]].to_numpy(), SERIES_MAX_POINTS)]
+        return d.reset_index(drop=True), grain, n_days
+    bucket = d[date_col].dt.to_period({'W': 'W-WED', 'M': 'M'}[grain]).dt.start_time
+    return d.groupby(bucket)[cols].mean().rename_axis(date_col).reset_index(), grain, n_days
+
+# ─────────────────────────────────────────
+# DRILL-DOWN INDEXES
+# ─────────────────────────────────────────
+def build_slot_store(fin_df, slots_df):
+    """Dense days × N_SLOTS arrays of slot Sales / Txns (NaN where the POS had no slot).
+
+    Row i is fin_df's i-th day, column j the slot starting at minute j * SLOT_MINUTES,
+    so history views are array reductions. In those views a slot off the 15-minute
+    grid counts toward the cell it starts in, and a slot with no parseable start
+    time is left out. A day with any such slot, or with two slots in one cell, also
+    keeps its own slot rows under `irregular`, so its drill-down shows them as the
+    POS reported them (by start time, unparseable last) instead of the grid.
+    """
+    days   = fin_df['Date'].to_numpy(dtype='datetime64[D]')
+    sales  = np.full((len(days), N_SLOTS), np.nan)
+    txns   = np.full((len(days), N_SLOTS), np.nan)
+    labels = np.array([slot_label(j * SLOT_MINUTES) for j in range(N_SLOTS)], dtype=object)
+    irregular = {}
+    if not slots_df.empty:
+        day    = slots_df['Date'].to_numpy(dtype='datetime64[D]')
+        row    = np.searchsorted(days, day)
+        ok     = (row < len(days)) & (days[np.minimum(row, len(days) - 1)] == day)
+        minute = slots_df['minute'].to_numpy()
+        parsed = ok & (minute >= 0)
+        col    = np.where(parsed, minute // SLOT_MINUTES, 0)
+        cell, n = np.unique(row[parsed] * N_SLOTS + col[parsed], return_counts=True)
+        odd    = set(row[ok & ((minute < 0) | (minute % SLOT_MINUTES != 0))]) | set(cell[n > 1] // N_SLOTS)
+        if odd:
+            keep = ok & np.isin(row, list(odd))
+            g = slots_df.loc[keep, ['Slot','Sales','Txns','Avg_Ticket']].assign(
+                    row=row[keep], start=np.where(minute < 0, 24 * 60, minute)[keep]) \
+                .sort_values(['row','start'], kind='mergesort')
+            irregular = {int(i): f.drop(columns=['row','start']).reset_index(drop=True)
+                         for i, f in g.groupby('row', sort=False)}
+        r, c = row[parsed], col[parsed]
+        sales[r, c] = 0
+        txns[r, c]  = 0
+        np.add.at(sales, (r, c), slots_df['Sales'].to_numpy()[parsed])
+        np.add.at(txns,  (r, c), slots_df['Txns'].to_numpy()[parsed])
+        on_grid = parsed & (minute % SLOT_MINUTES == 0)
+        labels[col[on_grid]] = slots_df['Slot'].to_numpy()[on_grid]    # keep the POS's own label text
+    return {'days': days, 'dow': (days.astype(np.int64) + 3) % 7,   # Monday = 0
+            'sales': sales, 'txns': txns, 'labels': labels, 'irregular': irregular}
+
+def slot_frame(store, i):
+    """Slot frame (Slot, Sales, Txns, Avg_Ticket) for the store's i-th day, in time order."""
+    if i in store['irregular']:
+        return store['irregular'][i]
+    cols = np.flatnonzero(~np.isnan(store['sales'][i]))
+    sales, txns = store['sales'][i, cols], store['txns'][i, cols]
+    return pd.DataFrame({'Slot': store['labels'][cols], 'Sales': sales, 'Txns': txns,
+                         'Avg_Ticket': np.divide(sales, txns, out=np.zeros_like(sales), where=txns > 0)})
+
+def slot_heatmaps(store):
+    """All-history day-of-week × slot average sales and average ticket.
+
+    Returns (avg_sales, avg_ticket, slot_labels) as 7 × k arrays over the k
+    slots that ever traded; cells with no history are NaN.
+    """
+    active = np.flatnonzero(~np.isnan(store['sales']).all(axis=0))
+    sales  = store['sales'][:, active]
+    txns   = store['txns'][:, active]
+    seen   = ~np.isnan(sales)
+    by_dow    = (store['dow'] == np.arange(7)[:, None]).astype(float)    # 7 × days one-hot
+    sum_sales = by_dow @ np.where(seen, sales, 0)
+    sum_txns  = by_dow @ np.where(seen, txns, 0)
+    n         = by_dow @ seen
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_sales  = np.where(n > 0, sum_sales / n, np.nan)
+        avg_ticket = np.where(sum_txns > 0, sum_sales / sum_txns, np.nan)
+    return avg_sales, avg_ticket, store['labels'][active]
+
+def build_drilldowns(fin_df, slots_df, agg):
+    """Pre-indexed lookups for the drill-down sections, so a selection is a dict hit.
+
+    days / day_fin / day_pos: date options ('YYYY-MM-DD'), each day's sales row
+    and its row in the dense `slots` store (see build_slot_store).
+    categories / cat_subcat / cat_items: category options and their subcategory
+    spend and top-10 item frames.
+    price_history: each (item, vendor) pair's purchases with their creep baseline.
+    ledger: every item × vendor pair's spend, qty, average unit price, lines and last purchase.
+    """
+    d = {}
+    d['days']    = fin_df['Date'].dt.strftime('%Y-%m-%d').tolist()
+    d['day_fin'] = dict(zip(d['days'], fin_df.to_dict('records')))
+
+    d['slots']   = build_slot_store(fin_df, slots_df)
+    d['day_pos'] = {day: i for i, day in enumerate(d['days'])}
+
+    d['categories'] = sorted(agg['cat_spend']['Category/Class'])
+    d['cat_subcat'] = {c: g.drop(columns='Category/Class').reset_index(drop=True)
+                       for c, g in agg['cat_subcat'].groupby('Category/Class', sort=False, observed=True)}
+    d['cat_items']  = {c: g[['Standard_Item_Name','Vendor','spend','qty']].head(10).reset_index(drop=True)
+                       for c, g in agg['cat_items'].groupby('Category/Class', sort=False, observed=True)}
+    d['price_history'] = {pair: g.reset_index(drop=True) for pair, g in
+                          agg['price_history'].groupby(['Standard_Item_Name','Vendor'], sort=False, observed=True)}
+    items = agg['cat_items']
+    d['ledger'] = items[['Standard_Item_Name','Vendor','Category/Class','spend','qty']].assign(
+        unit_price=(items['spend'] / items['qty'].replace(0, np.nan)).values,
+        lines=items['lines'].values, last_purchase=items['last_purchase'].values).reset_index(drop=True)
+    return d
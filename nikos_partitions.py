@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Nikos Cafe — Partitioned Storage
+Converts the two workbooks into small append-only Parquet partitions, so the
+repo and each deploy only gain the new days instead of whole workbooks:
+
+  <out>/sales/daily/YYYY-MM-DD.parquet    one POS day (the fin_df row)
+  <out>/sales/slots/YYYY-MM-DD.parquet    that day's 15-minute slots
+  <out>/invoices/YYYY-MM-DD.parquet       one Thu–Wed week of invoice lines (named by its Thursday)
+
+A partition is only written when it is new or its contents changed (normally
+just the current day and week), and nothing is ever deleted. The loaders read
+a partition folder wherever they take a workbook path; a day window prunes by
+file name before any Parquet is opened.
+
+Usage:
+  python nikos_partitions.py --sales data/combined_sales_data.xlsx \\
+      --inventory data/COMBINED_Master_Analysis.xlsx --out data/parts
+"""
+
+import argparse, io, os
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from nikos_data import (INVENTORY_DTYPES, SALES_FIELDS, SLOT_DTYPES, _widen, cached_frames, compact_frame,
+                        parse_inventory, parse_sales_incremental)
+
+SALES_DIR   = 'sales'
+INVOICE_DIR = 'invoices'
+
+# ─────────────────────────────────────────
+# WRITE
+# ─────────────────────────────────────────
+def _write_partition(path, df):
+    """Write df as one Parquet partition unless an identical one is already there; True when written."""
+    buf = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buf)
+    data = buf.getvalue()
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+def _write_groups(folder, df, keys, dtypes=None):
+    """One partition per distinct `keys` value (a date); returns (written, unchanged) counts."""
+    df = _widen(df, dtypes) if dtypes else df          # plain columns, so partitions concatenate cleanly
+    written = unchanged = 0
+    for key, part in df.groupby(keys, sort=True):
+        if _write_partition(Path(folder) / f'{pd.Timestamp(key):%Y-%m-%d}.parquet', part.reset_index(drop=True)):
+            written += 1
+        else:
+            unchanged += 1
+    return written, unchanged
+
+def write_sales_partitions(out, fin_df, slots_df):
+    base = Path(out) / SALES_DIR
+    daily = _write_groups(base / 'daily', fin_df, fin_df['Date'].dt.normalize())
+    _write_groups(base / 'slots', slots_df, slots_df['Date'].dt.normalize(), SLOT_DTYPES)
+    return daily
+
+def write_invoice_partitions(out, inv_df):
+    return _write_groups(Path(out) / INVOICE_DIR, inv_df, inv_df['week_start'], INVENTORY_DTYPES)
+
+# ─────────────────────────────────────────
+# READ — partition pruning by file name
+# ─────────────────────────────────────────
+def _partitions(folder, start=None, span=1):
+    """Partition files of `folder` oldest first; with `start`, only those that can hold a date
+    on or after it (each file covers `span` days from the date in its name)."""
+    files = sorted(Path(folder).glob('*.parquet'))
+    if start is None:
+        return files
+    return [f for f in files if pd.Timestamp(f.stem) + pd.Timedelta(days=span - 1) >= start]
+
+def _read(files):
+    """One frame from many partitions; a single dataset scan reads the files in parallel, in order."""
+    if not files:
+        return pd.DataFrame()
+    return ds.dataset([str(f) for f in files], format='parquet').to_table().to_pandas()
+
+def _window_start(last, days):
+    return None if not days else pd.Timestamp(last).normalize() - pd.Timedelta(days=days - 1)
+
+def read_sales_partitions(path, days=None):
+    """(fin_df, slots_df) from a sales partition folder, optionally just its last `days` days."""
+    base  = Path(path)
+    daily = _partitions(base / 'daily')
+    if days and daily:
+        daily = _partitions(base / 'daily', _window_start(daily[-1].stem, days))
+    slots = [base / 'slots' / f.name for f in daily if (base / 'slots' / f.name).exists()]
+    return _read(daily), compact_frame(_read(slots), SLOT_DTYPES)
+
+def read_invoice_partitions(path, days=None):
+    """Invoice lines from an invoice partition folder; with `days`, weeks before the window are
+    pruned by name and the first kept week is trimmed to the exact start date."""
+    files = _partitions(path)
+    if not (days and files):
+        return compact_frame(_read(files), INVENTORY_DTYPES)
+    last   = pq.read_table(files[-1], columns=['Invoice_Date'])['Invoice_Date'].to_pandas().max()
+    start  = _window_start(last, days)
+    inv_df = _read(_partitions(path, start, span=7))
+    return compact_frame(inv_df[inv_df['Invoice_Date'] >= start].reset_index(drop=True), INVENTORY_DTYPES)
+
+# ─────────────────────────────────────────
+# LOADERS — a workbook path or a partition folder
+# ─────────────────────────────────────────
+def last_days(df, date_col, days):
+    """Rows of df within the last `days` days of its own data (all rows when days is None)."""
+    if not days or df.empty:
+        return df
+    return df[df[date_col] >= _window_start(df[date_col].max(), days)].reset_index(drop=True)
+
+def load_sales_source(path, days=None):
+    """(fin_df, slots_df) from a sales workbook (through the Arrow frame cache) or a sales partition folder."""
+    if os.path.isdir(path):
+        return read_sales_partitions(path, days)
+    fin_df, slots_df = cached_frames(path, 'sales', parse_sales_incremental, key=SALES_FIELDS)
+    if not days:
+        return fin_df, slots_df
+    fin_df = last_days(fin_df, 'Date', days)
+    return fin_df, slots_df[slots_df['Date'] >= fin_df['Date'].min()].reset_index(drop=True)
+
+def load_inventory_source(path, days=None):
+    """Invoice lines from an inventory workbook or an invoice partition folder."""
+    if os.path.isdir(path):
+        return read_invoice_partitions(path, days)
+    return last_days(cached_frames(path, 'inventory', parse_inventory), 'Invoice_Date', days)
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Append new days / weeks from the Nikos workbooks as Parquet partitions.')
+    ap.add_argument('--sales',     default='data/combined_sales_data.xlsx')
+    ap.add_argument('--inventory', default='data/COMBINED_Master_Analysis.xlsx')
+    ap.add_argument('--out',       default='data/parts')
+    a = ap.parse_args(argv)
+
+    fin_df, slots_df = cached_frames(a.sales, 'sales', parse_sales_incremental, key=SALES_FIELDS)
+    days = write_sales_partitions(a.out, fin_df, slots_df)
+    weeks = write_invoice_partitions(a.out, cached_frames(a.inventory, 'inventory', parse_inventory))
+    print(f"✅ {a.out}: {days[0]} day partition(s) written, {days[1]} unchanged; "
+          f"{weeks[0]} invoice week(s) written, {weeks[1]} unchanged")
+
+if __name__ == '__main__':
+    main()
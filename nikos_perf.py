@@ -0,0 +1,107 @@
+"""
+Nikos Cafe — Performance Instrumentation
+Named stage timers, structured timing log lines and a one-shot cProfile of a
+single rerun. Collection is per script run and off by default: with no run
+started, timer() hands back a shared no-op context and stopwatch() a no-op
+function, so instrumented code pays one ContextVar lookup.
+
+Enable with NIKOS_PERF=1 or the sidebar 'Performance' toggle.
+"""
+
+import contextlib, contextvars, cProfile, io, json, logging, marshal, os, pstats, time
+
+log = logging.getLogger('nikos.perf')
+
+ENABLED_BY_ENV = os.environ.get('NIKOS_PERF', '') not in ('', '0')
+
+_run  = contextvars.ContextVar('nikos_perf_run', default=None)
+_NULL = contextlib.nullcontext()
+
+def _noop(name):
+    pass
+
+# ─────────────────────────────────────────
+# RUNS
+# ─────────────────────────────────────────
+def begin_run(enabled, label='rerun'):
+    """Start (or, when not `enabled`, clear) timing collection for this script run."""
+    if not enabled:
+        _run.set(None)
+        return None
+    if not log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    run = {'id': f'{time.time():.3f}', 'label': label, 'start': time.perf_counter(), 'stages': []}
+    _run.set(run)
+    return run
+
+def record(name, seconds):
+    """Add one stage timing to the current run and emit it as a JSON log line."""
+    run = _run.get()
+    if run is None:
+        return
+    run['stages'].append((name, seconds))
+    log.info(json.dumps({'event': 'stage', 'run': run['id'], 'stage': name, 'ms': round(seconds * 1000, 2)}))
+
+def end_run():
+    """Close the current run; logs and returns its total wall time (None when off)."""
+    run = _run.get()
+    if run is None:
+        return None
+    total = time.perf_counter() - run['start']
+    log.info(json.dumps({'event': 'run', 'run': run['id'], 'label': run['label'],
+                         'ms': round(total * 1000, 2), 'stages': len(run['stages'])}))
+    return total
+
+# ─────────────────────────────────────────
+# TIMERS
+# ─────────────────────────────────────────
+class _Timer:
+    __slots__ = ('name', 't0')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.t0)
+        return False
+
+def timer(name, enabled=True):
+    """Context manager timing a named stage; a shared no-op when collection is off."""
+    if not enabled or _run.get() is None:
+        return _NULL
+    return _Timer(name)
+
+def stopwatch(prefix):
+    """Lap timer for straight-line code: split('x') records `prefix.x` as the time since the last split."""
+    if _run.get() is None:
+        return _noop
+    last = [time.perf_counter()]
+    def split(name):
+        now = time.perf_counter()
+        record(f'{prefix}.{name}', now - last[0])
+        last[0] = now
+    return split
+
+# ─────────────────────────────────────────
+# PROFILING
+# ─────────────────────────────────────────
+def profile_start():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def profile_report(profiler, limit=40):
+    """Stop `profiler`; returns (text report sorted by cumulative time, raw pstats bytes)."""
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats('cumulative').print_stats(limit)
+    profiler.create_stats()
+    return out.getvalue(), marshal.dumps(profiler.stats)      # same bytes as Stats.dump_stats
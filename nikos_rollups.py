@@ -0,0 +1,160 @@
+"""
+Nikos Cafe — Incremental Weekly Rollups
+Append-only running totals behind the weekly views: sales sums per week,
+invoice spend per week, per week × category and per vendor × week, and per
+category the count, sum and sum of squares of its weekly totals (so the
+'Purchasing Consistency' std dev and CV % stay exact without a rescan).
+
+New days and invoice lines only touch the weeks they fall in. A folded row
+that changed or disappeared can't be subtracted back out, so it rebuilds
+the store from scratch instead. Stores persist next to each workbook
+(data/.nikos_cache/); without a path they are built in memory.
+"""
+
+import hashlib
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from nikos_data import CACHE_DIR, _read_store, _write_store, week_frame
+
+ROLLUP_VERSION = 1
+
+SALES_SUMS = ['net_sales','gross_before','discounts','credit_card','cash']
+SALES_KEY  = ['Date', *SALES_SUMS]                    # a sales day is re-folded when any of these change
+INV_KEY    = ['Invoice_Date','Invoice_No','Category/Class','Vendor','Total_Price']   # fingerprinted invoice columns
+
+# ─────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────
+def rollup_path(path, name):
+    p = Path(path)
+    return p.parent / CACHE_DIR / f'{p.stem}.{name}.rollups.pkl'
+
+def _digest(hashes):
+    return hashlib.sha1(np.ascontiguousarray(hashes).tobytes()).hexdigest()
+
+def _accumulate(table, delta):
+    """table + delta aligned on the index (new keys start at 0), sorted by key."""
+    out = table.add(delta, fill_value=0).sort_index()
+    return out.astype({'lines': np.int64}) if 'lines' in out else out
+
+def _spend(rows, keys):
+    """Spend and line count of invoice rows per `keys`, with plain (non-categorical) key levels."""
+    g = rows.groupby(keys, observed=True)['Total_Price'].agg(spend='sum', lines='count')
+    if isinstance(g.index, pd.MultiIndex):
+        g.index = pd.MultiIndex.from_frame(g.index.to_frame().astype(
+            {k: np.int64 if k == 'week_key' else object for k in keys}))
+    else:
+        g.index = g.index.astype(np.int64)
+    return g
+
+def _empty(index_names, cols):
+    idx = pd.MultiIndex.from_arrays([[]] * len(index_names), names=index_names) if len(index_names) > 1 \
+          else pd.Index([], dtype=np.int64, name=index_names[0])
+    return pd.DataFrame({c: pd.Series(dtype=np.int64 if c in ('lines','weeks') else float) for c in cols}, index=idx)
+
+# ─────────────────────────────────────────
+# SALES — one store row per Thu–Wed week
+# ─────────────────────────────────────────
+def empty_sales():
+    return {'version': ROLLUP_VERSION,
+            'days':    pd.Series(dtype=np.uint64),               # row hash per folded Date
+            'weeks':   _empty(['week_key'], SALES_SUMS + ['days'])}
+
+def fold_sales(store, rows):
+    """Add new sales days to the weekly sums in place; only their weeks change."""
+    delta = rows.groupby('week_key')[SALES_SUMS].sum()
+    delta['days'] = rows.groupby('week_key').size()
+    delta.index   = delta.index.astype(np.int64)
+    store['weeks'] = _accumulate(store['weeks'], delta).astype({'days': np.int64})
+    return store
+
+def sales_rollups(fin_df, path=None):
+    """Weekly sales store for fin_df; with `path`, folds only days the persisted store hasn't seen."""
+    days = pd.Series(pd.util.hash_pandas_object(fin_df[SALES_KEY], index=False).values, index=fin_df['Date'].values)
+    store_path = rollup_path(path, 'sales') if path else None
+    store = (_read_store(store_path, ROLLUP_VERSION) if store_path else None) or empty_sales()
+
+    seen = store['days']
+    if not seen.index.isin(days.index).all() or (seen != days.reindex(seen.index)).any():
+        store, seen = empty_sales(), empty_sales()['days']       # a folded day was edited or removed
+    new = ~days.index.isin(seen.index)
+    if new.any():
+        fold_sales(store, fin_df[new])
+        store['days'] = pd.concat([seen, days[new]])
+        if store_path:
+            _write_store(store_path, store)
+    return store
+
+# ─────────────────────────────────────────
+# INVENTORY — week, week × category, vendor × week and category moments
+# ─────────────────────────────────────────
+def empty_inventory():
+    return {'version':     ROLLUP_VERSION,
+            'rows':        0,                                   # invoice lines folded so far
+            'fingerprint': _digest(np.empty(0, np.uint64)),     # of those lines' INV_KEY hashes
+            'weeks':       _empty(['week_key'], ['spend','lines']),
+            'categories':  _empty(['week_key','Category/Class'], ['spend','lines']),
+            'vendors':     _empty(['Vendor','week_key'], ['spend','lines']),
+            'moments':     _empty(['Category/Class'], ['weeks','sum','sumsq'])}
+
+def fold_inventory(store, rows):
+    """Add new invoice lines in place: spend tables plus, for each touched week × category
+    cell, the change in its category's weekly-total count, sum and sum of squares."""
+    store['weeks']   = _accumulate(store['weeks'],   _spend(rows, ['week_key']))
+    store['vendors'] = _accumulate(store['vendors'], _spend(rows, ['Vendor','week_key']))
+
+    delta = _spend(rows, ['week_key','Category/Class'])
+    old   = store['categories']['spend'].reindex(delta.index)
+    store['categories'] = cats = _accumulate(store['categories'], delta)
+    new   = cats['spend'].reindex(delta.index)
+    step  = pd.DataFrame({'weeks': old.isna().astype(np.int64),
+                          'sum':   new - old.fillna(0),
+                          'sumsq': new ** 2 - old.fillna(0) ** 2})
+    store['moments'] = _accumulate(store['moments'], step.groupby(level='Category/Class').sum()) \
+                           .astype({'weeks': np.int64})
+    return store
+
+def inventory_rollups(inv_df, path=None):
+    """Weekly inventory store for inv_df; with `path`, folds only lines appended since the
+    persisted store (its fingerprint must still match the leading rows)."""
+    hashes = pd.util.hash_pandas_object(inv_df[INV_KEY], index=False).values
+    store_path = rollup_path(path, 'inventory') if path else None
+    store = (_read_store(store_path, ROLLUP_VERSION) if store_path else None) or empty_inventory()
+
+    n = store['rows']
+    if n > len(hashes) or _digest(hashes[:n]) != store['fingerprint']:
+        store, n = empty_inventory(), 0                          # rows were edited, removed or reordered
+    if n < len(hashes):
+        fold_inventory(store, inv_df.iloc[n:])
+        store['rows'], store['fingerprint'] = len(hashes), _digest(hashes)
+        if store_path:
+            _write_store(store_path, store)
+    return store
+
+# ─────────────────────────────────────────
+# VIEWS — frames in the shape build_aggregates publishes
+# ─────────────────────────────────────────
+def weekly_sales(sales):
+    w = sales['weeks']
+    return week_frame(w.index.values)[['week_key','week_label','week_start']].join(
+        w[SALES_SUMS].reset_index(drop=True))
+
+def weekly_inventory(inv):
+    return inv['weeks']['spend'].rename('inv_spend').reset_index()
+
+def category_weekly(inv):
+    return inv['categories']['spend'].rename('Total_Price').reset_index()
+
+def vendor_weekly(inv):
+    v = inv['vendors']['spend'].rename('Total_Price').reset_index()
+    labels = week_frame(inv['weeks'].index.values).set_index('week_key')['week_label']
+    v.insert(2, 'week_label', labels.reindex(v['week_key']).values)
+    return v
+
+def category_moments(inv):
+    """Mean and sample std (ddof=1) of each category's weekly totals, from count / sum / sum of squares."""
+    m    = inv['moments']
+    mean = m['sum'] / m['weeks']
+    var  = ((m['sumsq'] - m['sum'] * mean) / (m['weeks'] - 1).replace(0, np.nan)).clip(lower=0)
+    return pd.DataFrame({'Category': m.index, 'mean': mean.values, 'std': np.sqrt(var).values})
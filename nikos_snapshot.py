@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Nikos Cafe — Snapshots
+Computes every KPI and table the dashboard shows for one set of settings,
+without a Streamlit server, and writes them to a snapshot folder:
+
+  snapshot.json       settings, sources, scalar KPIs and the table index
+  tables/*.parquet    daily sales, slots and every rollup table
+  report.html         static report for ownership / Aramark (--html)
+
+The dashboard can start from a snapshot instead of the workbooks (sidebar
+'Snapshot Folder' or NIKOS_SNAPSHOT), so nightly jobs can do the heavy work.
+
+Usage:
+  python nikos_snapshot.py --out snapshots/latest
+  python nikos_snapshot.py --sales data/combined_sales_data.xlsx \\
+      --inventory data/COMBINED_Master_Analysis.xlsx --fixed-cost 900 --out snapshots/latest --html
+"""
+
+import argparse, datetime as dt, html, json, os, shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+import nikos_rollups
+from nikos_engine import DEFAULT_SETTINGS, apply_settings, build_aggregates
+from nikos_partitions import load_inventory_source, load_sales_source
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_META    = 'snapshot.json'
+
+# ─────────────────────────────────────────
+# COMPUTE
+# ─────────────────────────────────────────
+def compute(sales_path, inv_path, settings=None):
+    """Load both sources — workbooks (through the Arrow frame cache) or partition folders — and compute everything.
+
+    Returns (fin_df, slots_df, agg, kpi) — agg from build_aggregates, kpi from
+    apply_settings for `settings` over DEFAULT_SETTINGS.
+    """
+    fin_df, slots_df = load_sales_source(sales_path)
+    inv_df = load_inventory_source(inv_path)
+    rollups = (nikos_rollups.sales_rollups(fin_df, sales_path), nikos_rollups.inventory_rollups(inv_df, inv_path))
+    agg = build_aggregates(fin_df, inv_df, rollups)
+    kpi = apply_settings(agg, fin_df, {**DEFAULT_SETTINGS, **(settings or {})})
+    return fin_df, slots_df, agg, kpi
+
+# ─────────────────────────────────────────
+# READ / WRITE
+# ─────────────────────────────────────────
+def _scalar(v):
+    if isinstance(v, np.generic):
+        v = v.item()
+    return None if isinstance(v, float) and np.isnan(v) else v
+
+def _split(d):
+    """(tables, scalars) of a flat result dict."""
+    tables  = {k: v for k, v in d.items() if isinstance(v, pd.DataFrame)}
+    scalars = {k: _scalar(v) for k, v in d.items() if k not in tables}
+    return tables, scalars
+
+def write_snapshot(out_dir, fin_df, slots_df, agg, kpi, settings, sources=None, report=False):
+    """Write a snapshot folder; snapshot.json goes last, so a reader never sees a half-written one."""
+    out = Path(out_dir)
+    agg_tables, agg_scalars = _split(agg)
+    kpi_tables, kpi_scalars = _split(kpi)
+    tables = {'daily': fin_df, 'slots': slots_df, **agg_tables, **kpi_tables}
+
+    (out / 'tables').mkdir(parents=True, exist_ok=True)
+    for name, df in tables.items():
+        df.to_parquet(out / 'tables' / f'{name}.parquet', index=False)
+    if report:
+        (out / 'report.html').write_text(render_report(fin_df, agg, kpi, settings), encoding='utf-8')
+
+    meta = {
+        'version':   SNAPSHOT_VERSION,
+        'generated': dt.datetime.now().isoformat(timespec='seconds'),
+        'settings':  {**DEFAULT_SETTINGS, **settings},
+        'sources':   sources or {},
+        'scalars':   {'aggregates': agg_scalars, 'kpis': kpi_scalars},
+        'tables':    {'aggregates': list(agg_tables), 'kpis': list(kpi_tables)},
+    }
+    tmp = out / (SNAPSHOT_META + '.tmp')
+    tmp.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp, out / SNAPSHOT_META)
+    return out / SNAPSHOT_META
+
+def read_snapshot(path):
+    """Load a snapshot folder; returns (fin_df, slots_df, agg, kpi, meta)."""
+    base = Path(path)
+    meta = json.loads((base / SNAPSHOT_META).read_text())
+    if meta.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"snapshot version {meta.get('version')} (expected {SNAPSHOT_VERSION}) — regenerate it")
+    table = lambda name: pd.read_parquet(base / 'tables' / f'{name}.parquet')
+    agg = {**meta['scalars']['aggregates'], **{n: table(n) for n in meta['tables']['aggregates']}}
+    kpi = {**meta['scalars']['kpis'],       **{n: table(n) for n in meta['tables']['kpis']}}
+    return table('daily'), table('slots'), agg, kpi, meta
+
+# ─────────────────────────────────────────
+# STATIC REPORT
+# ─────────────────────────────────────────
+_REPORT_CSS = """
+body { font-family: 'DM Sans', sans-serif; background: #F5EFE6; color: #1E1612; margin: 32px; }
+h1   { font-family: 'Playfair Display', serif; color: #C45C3A; margin-bottom: 0; }
+h2   { font-family: 'Playfair Display', serif; color: #C45C3A; border-bottom: 2px solid #C4922A; padding-bottom: 4px; }
+.kpis { display: flex; flex-wrap: wrap; gap: 12px; }
+.kpi  { background: #FFFAF5; border-left: 4px solid #C45C3A; border-radius: 10px; padding: 12px 18px; min-width: 150px; }
+.kpi b { display: block; font-size: 1.4rem; }
+.kpi span { font-size: 0.75rem; color: #6B5B52; text-transform: uppercase; }
+table { border-collapse: collapse; background: #FFFAF5; font-size: 0.85rem; margin-bottom: 12px; }
+th, td { border: 1px solid #E0D5C8; padding: 4px 10px; text-align: right; }
+th { background: #F0E6DC; }
+"""
+
+def _fmt_table(df, formats):
+    return df.to_html(index=False, border=0, na_rep='—',
+                      formatters={c: f.format for c, f in formats.items() if c in df.columns})
+
+def render_report(fin_df, agg, kpi, settings):
+    """Self-contained HTML report: headline KPIs and the weekly, day-of-week and category tables."""
+    s = {**DEFAULT_SETTINGS, **settings}
+    cards = [
+        ('Gross Sales',       f"${agg['total_gross']:,.0f}"),
+        ('Net Sales',         f"${agg['total_sales']:,.0f}"),
+        ('Contract Discounts',f"${agg['total_discounts']:,.0f} ({agg['contract_disc_pct']}%)"),
+        ('Inv. Spend',        f"${agg['total_inv']:,.0f}"),
+        ('Food Cost % (Net)', f"{agg['overall_fc_pct']}% vs {s['target_food_cost']:.0f}% target"),
+        ('Food Cost % (Gross)', f"{agg['overall_fc_pct_gross']}%"),
+        ('Avg Daily vs Break-Even', f"${kpi['be_gap']:+,.0f}"),
+        ('Days Above BE (Net)', f"{kpi['days_above_net']}/{len(fin_df)}"),
+        ('Protein % of Inv.', f"{agg['protein_pct']}%" + (' 🚨' if kpi['protein_alert'] else '')),
+        ('Est. Net After Fees', f"${kpi['net_after']:,.0f}"),
+    ]
+    weekly = agg['weekly'][['week_label','gross_before','net_sales','discounts','inv_spend','food_cost_pct',
+                            'fc_pct_gross','wow_net','status']]
+    be     = kpi['be_summary']
+    cats   = agg['cat_stats']
+    money  = '${:,.0f}'
+    body = [
+        f"<h1>🥙 Nikos Cafe — Command Center Report</h1><p>{html.escape(agg['date_range_str'])} · "
+        f"{agg['n_days']} operating days · generated {dt.datetime.now():%Y-%m-%d %H:%M}</p>",
+        '<div class="kpis">' + ''.join(f'<div class="kpi"><span>{k}</span><b>{v}</b></div>' for k, v in cards) + '</div>',
+        '<h2>Weekly Summary</h2>',
+        _fmt_table(weekly, {'gross_before': money, 'net_sales': money, 'discounts': money, 'inv_spend': money,
+                            'food_cost_pct': '{:.1f}%', 'fc_pct_gross': '{:.1f}%', 'wow_net': '{:+.1f}%'}),
+        '<h2>Day of Week vs Break-Even</h2>',
+        _fmt_table(be, {'avg_gross': money, 'avg_net': money, 'avg_disc': '{:.1f}%', 'vs_break_even': '${:+,.0f}'}),
+        '<h2>Purchasing Consistency by Category</h2>',
+        _fmt_table(cats, {'Avg Weekly Spend': money, 'Std Dev': money, 'CV %': '{:.1f}%'}),
+        '<h2>Top Items by Spend</h2>',
+        _fmt_table(agg['top_items'], {'Total_Price': '${:,.2f}'}),
+        f"<p style='color:#6B5B52;font-size:0.8rem;'>Settings: Aramark/Sodexo commission {s['aramark_rate']*100:.1f}% · "
+        f"CC fee {s['cc_fee_rate']*100:.1f}% · daily fixed costs ${s['daily_fixed_cost']:,.0f} · "
+        f"protein alert {s['protein_alert_pct']:.0f}%</p>",
+    ]
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Nikos Cafe Report</title>"
+            f"<style>{_REPORT_CSS}</style></head><body>{''.join(body)}</body></html>")
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    d  = DEFAULT_SETTINGS
+    ap = argparse.ArgumentParser(description='Precompute the Nikos dashboard KPIs and tables to a snapshot folder.')
+    ap.add_argument('--sales',     default='data/combined_sales_data.xlsx', help='workbook or partition folder')
+    ap.add_argument('--inventory', default='data/COMBINED_Master_Analysis.xlsx', help='workbook or partition folder')
+    ap.add_argument('--out',       default='snapshots/latest')
+    ap.add_argument('--html',      action='store_true', help='also write a static report.html')
+    ap.add_argument('--aramark-rate',  type=float, default=d['aramark_rate'] * 100,  help='Aramark/Sodexo commission %%')
+    ap.add_argument('--cc-fee-rate',   type=float, default=d['cc_fee_rate'] * 100,   help='credit card fee %%')
+    ap.add_argument('--target-food-cost', type=float, default=d['target_food_cost'], help='target food cost %% (vs net)')
+    ap.add_argument('--fixed-cost',    type=float, default=d['daily_fixed_cost'],    help='daily fixed costs ($)')
+    ap.add_argument('--protein-alert', type=float, default=d['protein_alert_pct'],   help='protein alert (%% of inventory)')
+    ap.add_argument('--clean', action='store_true', help='remove the output folder first')
+    a = ap.parse_args(argv)
+
+    settings = dict(aramark_rate=a.aramark_rate / 100, cc_fee_rate=a.cc_fee_rate / 100,
+                    target_food_cost=a.target_food_cost, daily_fixed_cost=a.fixed_cost,
+                    protein_alert_pct=a.protein_alert)
+    if a.clean:
+        shutil.rmtree(a.out, ignore_errors=True)
+    fin_df, slots_df, agg, kpi = compute(a.sales, a.inventory, settings)
+    meta = write_snapshot(a.out, fin_df, slots_df, agg, kpi, settings,
+                          sources={'sales': str(a.sales), 'inventory': str(a.inventory)}, report=a.html)
+    print(f"✅ wrote {meta.parent}  ({agg['date_range_str']}, {len(fin_df)} days)")
+
+if __name__ == '__main__':
+    main()
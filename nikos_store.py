@@ -0,0 +1,143 @@
+"""
+Nikos Cafe — Invoice Store
+Optional indexed SQLite copy of the invoice lines, so invoice-level drill-downs
+and rollups run as indexed queries instead of boolean-mask scans of the whole
+inventory frame. Built next to the workbook (data/.nikos_cache/) and rebuilt
+only when the workbook changes; queries open their own read-only connection,
+so the file is safe to share across sessions and threads.
+
+Enable in the dashboard with NIKOS_INVOICE_DB=1.
+"""
+
+import os, sqlite3, tempfile
+from contextlib import closing
+from pathlib import Path
+import pandas as pd
+from nikos_data import CACHE_DIR, source_sha1, source_version
+
+INVOICE_DB_VERSION = 4
+
+ENABLED_BY_ENV = os.environ.get('NIKOS_INVOICE_DB', '') not in ('', '0')
+
+# SQLite column -> inventory frame column
+_COLUMNS = {
+    'invoice_date': 'Invoice_Date',
+    'invoice_no':   'Invoice_No',
+    'week_key':     'week_key',
+    'week_label':   'week_label',
+    'category':     'Category/Class',
+    'subcategory':  'Subcategory',
+    'vendor':       'Vendor',
+    'item':         'Standard_Item_Name',
+    'qty':          'Qty',
+    'unit_price':   'Unit_Price',
+    'total_price':  'Total_Price',
+}
+
+# Trailing value columns make each index covering for the queries below
+_INDEXES = {
+    'ix_invoices_category': 'category, subcategory, total_price',
+    'ix_invoices_vendor':   'vendor, week_key, total_price',
+    'ix_invoices_item':     'item, invoice_date, unit_price',
+}
+
+# ─────────────────────────────────────────
+# BUILD
+# ─────────────────────────────────────────
+def invoice_db_path(inv_path):
+    return Path(inv_path).parent / CACHE_DIR / f'{Path(inv_path).stem}.invoices.sqlite'
+
+def _db_meta(db):
+    try:
+        with closing(connect(db)) as con:
+            return dict(con.execute('SELECT key, value FROM meta').fetchall())
+    except (sqlite3.Error, OSError):
+        return {}
+
+def build_invoice_db(inv_path, inv_df):
+    """Path to the indexed SQLite copy of `inv_df`, (re)built only when inv_path changed.
+
+    Like the Arrow frame cache, mtime + size is the fast path and the content
+    hash rescues a touched-but-identical workbook (or partition folder).
+    """
+    db, stat = invoice_db_path(inv_path), str(source_version(inv_path))
+    meta = _db_meta(db)
+    if meta.get('version') == str(INVOICE_DB_VERSION):
+        if meta['stat'] == stat:
+            return db
+        sha1 = source_sha1(inv_path)
+        if meta['sha1'] == sha1:
+            return db
+    else:
+        sha1 = source_sha1(inv_path)
+
+    frame = pd.DataFrame({col: inv_df[src] for col, src in _COLUMNS.items()})
+    frame['invoice_date'] = frame['invoice_date'].dt.strftime('%Y-%m-%d %H:%M:%S')   # ISO text sorts by time
+    db.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=db.parent, prefix=f'{db.stem}.', suffix='.tmp')   # one per concurrent build
+    os.close(fd)
+    try:
+        with closing(sqlite3.connect(tmp)) as con:
+            with con:
+                frame.to_sql('invoices', con, index=False, chunksize=50_000)
+                for name, cols in _INDEXES.items():
+                    con.execute(f'CREATE INDEX {name} ON invoices ({cols})')
+                con.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+                con.executemany('INSERT INTO meta VALUES (?, ?)', [
+                    ('version', str(INVOICE_DB_VERSION)), ('sha1', sha1), ('stat', stat)])
+            con.execute('ANALYZE')
+        os.replace(tmp, db)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return db
+
+def connect(db):
+    """Read-only connection to an invoice db."""
+    return sqlite3.connect(f'file:{Path(db).resolve()}?mode=ro', uri=True)
+
+def query(db, sql, params=()):
+    with closing(connect(db)) as con:
+        return pd.read_sql_query(sql, con, params=params)
+
+# ─────────────────────────────────────────
+# QUERIES — column names match the pandas rollups in nikos_engine
+# ─────────────────────────────────────────
+def subcategory_spend(db, category):
+    """One category's spend by subcategory (ix_invoices_category)."""
+    return query(db, """
+        SELECT subcategory AS Subcategory, SUM(total_price) AS Total_Price
+        FROM invoices WHERE category = ?
+        GROUP BY subcategory ORDER BY Total_Price DESC""", (category,))
+
+def category_items(db, category, limit=10):
+    """Top item × vendor lines of one category by spend."""
+    return query(db, """
+        SELECT item AS Standard_Item_Name, vendor AS Vendor, SUM(total_price) AS spend, SUM(qty) AS qty
+        FROM invoices WHERE category = ?
+        GROUP BY item, vendor ORDER BY spend DESC LIMIT ?""", (category, limit))
+
+def item_prices(db, items, category=None):
+    """Average unit price per invoice date for `items` (ix_invoices_item), oldest first."""
+    items = list(items)
+    if not items:
+        return pd.DataFrame(columns=['Standard_Item_Name','Invoice_Date','unit_price'])
+    where, params = f"item IN ({', '.join('?' * len(items))})", items
+    if category is not None:
+        where, params = where + ' AND category = ?', items + [category]
+    df = query(db, f"""
+        SELECT item AS Standard_Item_Name, invoice_date AS Invoice_Date, AVG(unit_price) AS unit_price
+        FROM invoices WHERE {where}
+        GROUP BY item, invoice_date ORDER BY invoice_date""", params)
+    df['Invoice_Date'] = pd.to_datetime(df['Invoice_Date'])
+    return df
+
+def vendor_weekly(db, vendors):
+    """Weekly spend for each of `vendors` (ix_invoices_vendor), oldest week first."""
+    vendors = list(vendors)
+    if not vendors:
+        return pd.DataFrame(columns=['Vendor','week_key','week_label','Total_Price'])
+    return query(db, f"""
+        SELECT vendor AS Vendor, week_key, MIN(week_label) AS week_label, SUM(total_price) AS Total_Price
+        FROM invoices WHERE vendor IN ({', '.join('?' * len(vendors))})
+        GROUP BY vendor, week_key ORDER BY vendor, week_key""", vendors)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Nikos Cafe — Synthetic Data Generator
+Writes realistic stand-ins for the two source workbooks so loaders and
+rollups can be exercised at any scale:
+  • combined_sales_data.xlsx — one YYYY-MM-DD sheet per operating day with the
+    POS Financial Control / Payment Summary rows and a 15-min `Time_slots` block
+  • COMBINED_Master_Analysis.xlsx — an ALL_DATA sheet of supplier invoice lines
+
+Usage:
+  python nikos_synth.py --weeks 8 --invoice-lines 5000 --out synth/
+  python nikos_synth.py --years 10 --invoice-lines 2000000 --out synth/
+"""
+
+import argparse, datetime as dt
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+# (Category/Class, Subcategory, Standard_Item_Name, Source, base unit price)
+CATALOG = [
+    ('PRODUCE',              'Tomato',        'Tomato',           'Restaurant Depot',         22.96),
+    ('PRODUCE',              'Onions',        'Red Onions',       'Restaurant Depot',         18.40),
+    ('PRODUCE',              'Cucumbers',     'Cucumber',         'Restaurant Depot',         24.10),
+    ('PRODUCE',              'Lettuce',       'Romaine',          'Performance Food Service', 31.75),
+    ('PRODUCE',              'Lemons',        'Lemons',           'Restaurant Depot',         29.90),
+    ('GROCERY DRY',          'Sugar',         'Domino Sugar',     'Restaurant Depot',         37.16),
+    ('GROCERY DRY',          'Canned Beans',  'Beans',            'Restaurant Depot',          6.83),
+    ('GROCERY DRY',          'Seasonings',    'Oregano',          'Restaurant Depot',         44.35),
+    ('GROCERY DRY',          'Rice',          'Basmati Rice',     'Performance Food Service', 38.20),
+    ('GROCERY DRY',          'Oil',           'Olive Oil',        'Performance Food Service', 61.50),
+    ('DAIRY PROD & SUBS',    'Eggs',          'Whole Eggs',       'Restaurant Depot',         42.80),
+    ('DAIRY PROD & SUBS',    'Cheese',        'Feta',             'Performance Food Service', 54.30),
+    ('DAIRY PROD & SUBS',    'Yogurt',        'Greek Yogurt',     'Performance Food Service', 33.60),
+    ('PROTEIN',              'Beef',          'Beef',             'Performance Food Service', 96.40),
+    ('PROTEIN',              'Lamb',          'Lamb',             'Performance Food Service', 118.25),
+    ('PROTEIN',              'Chicken',       'Chicken Breast',   'Restaurant Depot',         64.90),
+    ('PROTEIN',              'Gyro',          'Gyro Cone',        'Performance Food Service', 89.00),
+    ('SEAFOOD',              'Fish',          'Salmon',           'Restaurant Depot',         78.50),
+    ('SIDES',                'Fries',         'French Fries',     'Performance Food Service', 41.20),
+    ('SIDES',                'Pita',          'Pita Bread',       'Performance Food Service', 19.80),
+    ('BEVERAGE',             'Soda',          'Canned Soda',      'Restaurant Depot',         14.50),
+    ('BEVERAGE',             'Water',         'Bottled Water',    'Restaurant Depot',          6.99),
+    ('GROCERY REFRIGERATED', 'Sauces',        'Tzatziki',         'Performance Food Service', 27.40),
+    ('GROCERY REFRIGERATED', 'Hummus',        'Hummus',           'Performance Food Service', 25.10),
+    ('FROZEN FOOD PROCESS',  'Falafel',       'Falafel',          'Performance Food Service', 36.70),
+    ('CHEMICALS & CLEANING', 'Cleaners',      'Degreaser',        'Restaurant Depot',         21.30),
+    ('DISPOSABLES',          'Containers',    'Takeout Boxes',    'Restaurant Depot',         48.60),
+    ('COOKWARE',             'Pans',          'Pizza Pan',        'Restaurant Depot',         19.36),
+]
+
+INVOICE_COLUMNS = ['Invoice_Date','Invoice_No','Item_Name','Qty','Unit_Price','Total_Price','Category/Class',
+                   'Subcategory','Standard_Item_Name','Source','Notes','Mapping_Completeness']
+
+FIRST_SLOT, LAST_SLOT = 9 * 60, 20 * 60 + 30     # 9:00 AM … 8:30 PM slot starts
+SLOT_STARTS = np.arange(FIRST_SLOT, LAST_SLOT + 1, 15)
+
+# ─────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────
+def _clock(m):
+    return f"{(m // 60 - 1) % 12 + 1}:{m % 60:02d} {'AM' if m % 1440 < 720 else 'PM'}"
+
+SLOT_LABELS = [f"{_clock(m)} - {_clock(m + 15)}" for m in SLOT_STARTS]
+
+def operating_days(start, days, weekdays_only=True):
+    """`days` calendar days from `start`, minus weekends when `weekdays_only`."""
+    out = [start + dt.timedelta(days=i) for i in range(days)]
+    return [d for d in out if not weekdays_only or d.weekday() < 5]
+
+def _slot_shape():
+    """Relative demand per slot: lunch peak around 12:45, smaller dinner bump around 6 PM."""
+    h = SLOT_STARTS / 60
+    return 0.15 + np.exp(-((h - 12.75) / 1.1) ** 2) + 0.45 * np.exp(-((h - 18.0) / 0.9) ** 2)
+
+# ─────────────────────────────────────────
+# SALES WORKBOOK
+# ─────────────────────────────────────────
+def day_sheet_rows(date, rng, shape=None):
+    """Rows of one POS day sheet, laid out like the real Symphony export."""
+    shape  = _slot_shape() if shape is None else shape
+    dow    = (1.15, 1.1, 1.05, 1.0, 0.8, 0.6, 0.5)[date.weekday()]
+    lam    = shape * dow * rng.uniform(0.6, 1.4) * 9.0
+    txns   = rng.poisson(lam)
+    ticket = rng.gamma(9.0, 1.0, size=len(txns))
+    sales  = np.round(txns * ticket, 2)
+    net    = round(float(sales.sum()), 2)
+    disc   = round(net * rng.uniform(0.4, 0.7), 2)
+    gross  = round(net + disc, 2)
+    card   = round(net * rng.uniform(0.08, 0.2), 2)
+    rows = [
+        ('Date', date.isoformat(), None), ('Day', date.strftime('%A'), None), (None, None, None),
+        ('Run Financial Control Report', None, None), ('Name', 'Amount', None),
+        ('Gross Sales Before Discounts', gross, None), ('Total Discounts', disc, None),
+        ('Gross Sales After Discounts', net, None), ('Tax Collected', 0, None),
+        ('Sales Net VAT', net, None), ('Service Charges', 0, None), ('Non-Revenue Total', 0, None),
+        (None, None, None), (None, None, None),
+        ('Payment Summary', None, None), ('Type', 'Amount', None),
+        ('Credit Card', card, None), ('Cash', 0, None), ('Sales Tax Collected', 0, None),
+        (None, None, None), (None, None, None),
+        ('Day Part Summary', None, None),
+        ('Time_slots', 'Sales Net VAT (After discount)', 'Transaction count'),
+    ]
+    rows += [(lab, float(s), int(t)) for lab, s, t in zip(SLOT_LABELS, sales, txns)]
+    rows.append(('Total', net, int(txns.sum())))
+    return rows
+
+def write_sales_workbook(path, start, days, weekdays_only=True, seed=0):
+    """Write a combined_sales_data.xlsx-format workbook covering `days` calendar days."""
+    rng, shape = np.random.default_rng(seed), _slot_shape()
+    wb = Workbook(write_only=True)
+    dates = operating_days(start, days, weekdays_only)
+    for d in dates:
+        ws = wb.create_sheet(d.isoformat())
+        for row in day_sheet_rows(d, rng, shape):
+            ws.append(row)
+    wb.save(path)
+    return len(dates)
+
+# ─────────────────────────────────────────
+# INVOICE WORKBOOK
+# ─────────────────────────────────────────
+def invoice_frame(start, days, lines, n_items=None, seed=0, daily_spend=800.0, annual_inflation=0.04):
+    """`lines` invoice lines (~12 per invoice) spread over `days`.
+
+    n_items widens the catalog with numbered variants (e.g. 'Tomato 17') to mimic
+    large item masters. Prices are scaled so spend averages `daily_spend` per
+    calendar day whatever the line count (the sample runs ~$800/day), and drift
+    up with `annual_inflation` plus noise so price-trend views have signal.
+    """
+    rng  = np.random.default_rng(seed)
+    base = pd.DataFrame(CATALOG, columns=['Category/Class','Subcategory','Standard_Item_Name','Source','price'])
+    if n_items and n_items > len(base):
+        reps = -(-n_items // len(base))
+        base = pd.concat([base.assign(Standard_Item_Name=base['Standard_Item_Name'] + (f' {k}' if k else ''),
+                                      price=base['price'] * (1 + 0.1 * k)) for k in range(reps)],
+                         ignore_index=True).head(n_items)
+
+    n_inv   = max(1, lines // 12)                                    # ~12 lines per invoice
+    inv_day = np.sort(rng.integers(0, max(days, 1), n_inv))
+    inv_no  = 10000 + np.arange(n_inv)
+    which   = np.sort(rng.integers(0, n_inv, lines))
+    item    = rng.integers(0, len(base), lines)
+    day     = inv_day[which]
+    stamp   = (pd.Timestamp(start) + pd.to_timedelta(day, unit='D')
+               + pd.to_timedelta(rng.integers(7 * 60, 15 * 60, n_inv)[which], unit='min'))
+    drift   = (1 + annual_inflation) ** (day / 365.0)
+    price   = base['price'].to_numpy()[item] * drift * rng.normal(1, 0.03, lines)
+    qty     = rng.choice([1.0, 1.0, 1.0, 2.0, 2.0, 3.0, 4.0, 6.0], lines)
+    price   = np.round(price * daily_spend * max(days, 1) / max((qty * price).sum(), 0.01), 2)
+    cat     = base.iloc[item].reset_index(drop=True)
+    return pd.DataFrame({
+        'Invoice_Date': stamp, 'Invoice_No': inv_no[which],
+        'Item_Name': cat['Standard_Item_Name'].str.lower().str.slice(0, 12) + ' cs',
+        'Qty': qty, 'Unit_Price': price, 'Total_Price': np.round(qty * price, 2),
+        'Category/Class': cat['Category/Class'], 'Subcategory': cat['Subcategory'],
+        'Standard_Item_Name': cat['Standard_Item_Name'], 'Source': cat['Source'],
+        'Notes': np.nan, 'Mapping_Completeness': 'Complete',
+    })[INVOICE_COLUMNS]
+
+def write_invoice_workbook(path, start, days, lines, n_items=None, seed=0, daily_spend=800.0):
+    """Write a COMBINED_Master_Analysis.xlsx-format workbook with an ALL_DATA sheet."""
+    df = invoice_frame(start, days, lines, n_items, seed, daily_spend)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('ALL_DATA')
+    ws.append(INVOICE_COLUMNS)
+    for row in df.itertuples(index=False):
+        ws.append([None if v != v else v for v in row])              # NaN → empty cell
+    wb.save(path)
+    return len(df)
+
+def generate(out_dir, days, invoice_lines, n_items=None, start=dt.date(2026, 1, 19), seed=0):
+    """Write both workbooks into out_dir; returns their paths."""
+    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+    sales_path = out / 'combined_sales_data.xlsx'
+    inv_path   = out / 'COMBINED_Master_Analysis.xlsx'
+    write_sales_workbook(sales_path, start, days, seed=seed)
+    write_invoice_workbook(inv_path, start, days, invoice_lines, n_items, seed=seed)
+    return sales_path, inv_path
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Write synthetic Nikos sales + invoice workbooks.')
+    span = ap.add_mutually_exclusive_group()
+    span.add_argument('--weeks', type=int, help='history length in weeks')
+    span.add_argument('--years', type=float, help='history length in years')
+    ap.add_argument('--invoice-lines', type=int, default=5000)
+    ap.add_argument('--items', type=int, default=None, help='distinct standard items (default: built-in catalog)')
+    ap.add_argument('--start', default='2026-01-19')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--out', default='synth')
+    a = ap.parse_args(argv)
+    days = int(round(a.years * 365)) if a.years else 7 * (a.weeks or 8)
+    paths = generate(a.out, days, a.invoice_lines, a.items, dt.date.fromisoformat(a.start), a.seed)
+    for p in paths:
+        print(f"✅ {p}")
+
+if __name__ == '__main__':
+    main()
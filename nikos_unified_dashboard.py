@@ -4,14 +4,28 @@ Nikos Cafe — Unified Dashboard
 Sales + Inventory | 5 Business Questions + Break-Even + WoW + Protein Alert + Slow Day Recovery
 """
 
+import os
 from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+import threading
 import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from nikos_data import (DATASET_CACHE_MB, WATCH_INTERVAL, DatasetCache, SourceWatcher, empty_inventory_frame,
+                        empty_sales_frames, memory_report, source_version)
+import nikos_perf
+import nikos_rollups
+import nikos_store
+from nikos_perf import timer
+from nikos_engine import (CREEP_BASELINE, CREEP_Z, DOW_ORDER, PAGE_SIZE, SCENARIO_AXES, apply_settings, build_aggregates,
+                          build_drilldowns, scenario_grid, slot_frame, slot_heatmaps, table_page, trend_frame)
+from nikos_partitions import load_inventory_source, load_sales_source
+from nikos_snapshot import SNAPSHOT_META, read_snapshot
 
 # ─────────────────────────────────────────
 # PAGE CONFIG
@@ -23,6 +37,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ── PERFORMANCE INSTRUMENTATION (no-op unless enabled) ──
+# A profiler still in session state belongs to a rerun that ended before the panel at the bottom
+# (st.stop(), st.rerun() or an error in a tab): stop it now and show its report this time.
+stale    = st.session_state.pop('perf_profiler', None)
+late     = nikos_perf.profile_report(stale) if stale is not None else None
+perf_run = nikos_perf.begin_run(nikos_perf.ENABLED_BY_ENV or st.session_state.get('perf_on', False))
+profiler = nikos_perf.profile_start() if st.session_state.pop('perf_profile_next', False) else None
+if profiler is not None:
+    st.session_state['perf_profiler'] = profiler
+
 # ── GLOBAL PLOTLY DEFAULTS ────────────────
 # Warm cream background, dark readable text, subtle grid
 import plotly.io as pio
@@ -34,46 +58,30 @@ CLAY    = '#C45C3A'
 GOLD    = '#C4922A'
 OLIVE   = '#4A5E2A'
 
-pio.templates["nikos"] = pio.templates["plotly_white"]
+# All theming lives in the template, so a figure is styled once at creation with
+# no per-figure restyle pass. Template axis/legend settings apply to every axis
+# (xaxis2, yaxis2, …) and the text defaults cover bar/scatter/pie traces.
+_AXIS = dict(gridcolor=GRID, linecolor=GRID, zerolinecolor=GRID,
+             tickfont=dict(color=INK, size=11), title_font=dict(color=INK, size=12))
+
+pio.templates["nikos"] = go.layout.Template(pio.templates["plotly_white"])
 pio.templates["nikos"].layout.update(
     paper_bgcolor=CREAM,
     plot_bgcolor=CREAM,
     font=dict(family='DM Sans, sans-serif', color=INK, size=12),
-    title_font=dict(family='Playfair Display, serif', color=INK, size=15),
+    title_font=dict(family='Playfair Display, serif', color=INK, size=14),
     colorway=[CLAY, GOLD, OLIVE, '#8B3A22', '#2980B9', '#8E44AD', '#BDC3C7'],
-    xaxis=dict(gridcolor=GRID, linecolor=GRID, zerolinecolor=GRID,
-               tickfont=dict(color=INK), title_font=dict(color=INK)),
-    yaxis=dict(gridcolor=GRID, linecolor=GRID, zerolinecolor=GRID,
-               tickfont=dict(color=INK), title_font=dict(color=INK)),
+    xaxis=_AXIS,
+    yaxis=_AXIS,
     legend=dict(bgcolor='rgba(245,239,230,0.92)', bordercolor=GRID, borderwidth=1,
-                font=dict(color=INK)),
+                font=dict(color=INK, size=11)),
     hoverlabel=dict(bgcolor='#FFFAF5', font_color=INK, bordercolor=GRID),
 )
+for trace_type in ('bar', 'scatter', 'pie'):
+    for trace in pio.templates["nikos"].data[trace_type]:
+        trace.textfont = dict(color=INK)
 pio.templates.default = "nikos"
 
-# ── HELPER: stamp black text on every chart ──────────────────
-_AXIS = dict(tickfont=dict(color=INK, size=11), title_font=dict(color=INK, size=12),
-             gridcolor=GRID, linecolor=GRID, zerolinecolor=GRID)
-_LEG  = dict(font=dict(color=INK, size=11), bgcolor='rgba(245,239,230,0.92)',
-             bordercolor=GRID, borderwidth=1)
-
-def ink(fig, **extra):
-    """Call after every figure is fully built to guarantee all text is black."""
-    fig.update_layout(
-        paper_bgcolor=CREAM, plot_bgcolor=CREAM,
-        font=dict(color=INK, family='DM Sans, sans-serif', size=12),
-        title_font=dict(color=INK, family='Playfair Display, serif', size=14),
-        xaxis=_AXIS, yaxis=_AXIS, legend=_LEG,
-        **extra
-    )
-    for ax in ['xaxis2','yaxis2','xaxis3','yaxis3']:
-        try:
-            fig.update_layout(**{ax: _AXIS})
-        except:
-            pass
-    fig.update_traces(textfont=dict(color=INK))
-    return fig
-
 # ─────────────────────────────────────────
 # CUSTOM CSS — warm mediterranean palette
 # ─────────────────────────────────────────
@@ -255,13 +263,23 @@ hr { border-color: var(--border) !important; }
 # ─────────────────────────────────────────
 # SIDEBAR
 # ─────────────────────────────────────────
+TREND_WINDOWS = {'All history': None, 'Last 3 years': 3 * 365, 'Last 12 months': 365, 'Last 90 days': 90}
+
+# Partition folders written by nikos_partitions.py (update.sh) win over the workbooks when present
+SALES_DEFAULT = 'data/parts/sales'    if Path('data/parts/sales').is_dir()    else 'data/combined_sales_data.xlsx'
+INV_DEFAULT   = 'data/parts/invoices' if Path('data/parts/invoices').is_dir() else 'data/COMBINED_Master_Analysis.xlsx'
+
 with st.sidebar:
     st.markdown("## 🥙 Nikos Command Center")
     st.markdown("---")
-    sales_path = st.text_input("Sales Excel Path",
-        value="data/combined_sales_data.xlsx")
-    inv_path = st.text_input("Inventory Excel Path",
-        value="data/COMBINED_Master_Analysis.xlsx")
+    sales_path = st.text_input("Sales Data Path", value=SALES_DEFAULT,
+        help="Sales workbook (.xlsx) or a partition folder written by nikos_partitions.py.")
+    inv_path = st.text_input("Inventory Data Path", value=INV_DEFAULT,
+        help="Inventory workbook (.xlsx) or an invoice partition folder written by nikos_partitions.py.")
+    history_days = TREND_WINDOWS[st.selectbox("History loaded", list(TREND_WINDOWS),
+        help="Limits every KPI and table to the most recent days. Partition folders only read the partitions in range.")]
+    snapshot_dir = st.text_input("Snapshot Folder (optional)", value=os.environ.get('NIKOS_SNAPSHOT', ''),
+        help="Start from a folder written by nikos_snapshot.py instead of parsing the Excel files.")
     st.markdown("### ⚙️ Financial Settings")
     st.caption("💡 Aramark/Sodexo sets discounts — these are contract terms, not operational choices.")
     aramark_rate      = st.number_input("Aramark/Sodexo Commission %", 0.0, 100.0, 20.0, 0.5) / 100
@@ -276,135 +294,454 @@ with st.sidebar:
     st.markdown("### 📊 Display Settings")
     top_pct  = st.slider("Peak slots (Top %)",    1, 30, 10) / 100
     slow_pct = st.slider("Slow slots (Bottom %)", 1, 50, 20) / 100
+    trend_days  = TREND_WINDOWS[st.selectbox("Trend window", list(TREND_WINDOWS))]
+    trend_grain = st.radio("Trend granularity", ['Auto','D','W','M'], horizontal=True,
+        format_func={'Auto': 'Auto', 'D': 'Daily', 'W': 'Weekly', 'M': 'Monthly'}.get,
+        help="Auto shows days up to 2 years, then weekly, then monthly averages. Long daily views are downsampled (LTTB).")
     st.markdown("---")
-    st.caption("Data refreshes on reload • Thu–Wed week cycle")
+    st.caption("Data refreshes when a workbook changes • Thu–Wed week cycle")
+    perf_panel = st.expander("⏱️ Performance")
+    with perf_panel:
+        st.toggle("Collect stage timings", key='perf_on',
+                  help="Times data load, rollups, figures and the active tab; also logged as JSON lines.")
+        st.button("Profile one rerun", on_click=lambda: st.session_state.update(perf_profile_next=True),
+                  help="Reruns the app under cProfile and shows the hottest calls below.")
 
 # ─────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────
-def get_week_label(date):
-    days_since_thu = (date.weekday() - 3) % 7
-    ws = date - timedelta(days=days_since_thu)
-    we = ws + timedelta(days=6)
-    return f"{ws.strftime('%b %d')} – {we.strftime('%b %d')}", ws
-
-@st.cache_data
-def load_sales(path):
-    xl = pd.ExcelFile(path)
-    rows, slot_rows = [], []
-    for sheet in xl.sheet_names:
-        try:
-            df   = pd.read_excel(path, sheet_name=sheet, header=None)
-            date = pd.to_datetime(sheet)
-            day  = str(df.iloc[1, 1]) if df.shape[0] > 1 else ''
-            m    = {'Date': date, 'Day': day}
-            for _, row in df.iterrows():
-                k = str(row[0]).strip() if pd.notna(row[0]) else ''
-                try:
-                    v = float(row[1])
-                    if k == 'Gross Sales Before Discounts': m['gross_before'] = v
-                    if k == 'Total Discounts':              m['discounts']    = v
-                    if k == 'Sales Net VAT':                m['net_sales']    = v
-                    if k == 'Credit Card':                  m['credit_card']  = v
-                    if k == 'Cash':                         m['cash']         = v
-                except: pass
-            ts_start = None
-            for i, row in df.iterrows():
-                if str(row[0]).strip().lower() == 'time_slots':
-                    ts_start = i; break
-            if ts_start is not None:
-                for _, row in df.iloc[ts_start+1:].iterrows():
-                    slot = str(row[0]).strip()
-                    if not slot or slot.lower() in ['nan','total']: continue
-                    try:
-                        slot_rows.append({'Date': date, 'Day': day, 'Slot': slot,
-                                          'Sales': float(row[1]),
-                                          'Txns':  float(row[2]) if pd.notna(row[2]) else 0})
-                    except: pass
-            rows.append(m)
-        except: pass
-    fin = pd.DataFrame(rows).sort_values('Date')
-    for col in ['gross_before','discounts','net_sales','credit_card','cash']:
-        fin[col] = pd.to_numeric(fin.get(col, 0), errors='coerce').fillna(0)
-    fin['discount_rate'] = (fin['discounts'] / fin['gross_before'].replace(0, np.nan) * 100).fillna(0)
-    fin['week_label'], fin['week_start'] = zip(*fin['Date'].map(get_week_label))
-    slots = pd.DataFrame(slot_rows)
-    if not slots.empty:
-        slots['Avg_Ticket'] = np.where(slots['Txns'] > 0, slots['Sales'] / slots['Txns'], 0)
-    return fin, slots
-
-@st.cache_data
-def load_inventory(path):
-    df = pd.read_excel(path, sheet_name='ALL_DATA')
-    df['Invoice_Date']   = pd.to_datetime(df['Invoice_Date'])
-    df['Category/Class'] = df['Category/Class'].fillna('Uncategorized')
-    df['Subcategory']    = df['Subcategory'].fillna('General')
-    df['Vendor']         = df['Source'].str.strip()
-    df['week_label'], df['week_start'] = zip(*df['Invoice_Date'].map(get_week_label))
-    return df
+SOURCE_LABELS = {'sales': 'Sales data', 'inventory': 'Inventory data'}
+FAILED_STATES = ((), ('inventory',), ('sales',))   # which source(s) a cached rollup was built without
+DERIVED_ENTRIES = 8   # rollup / drilldown cache entries kept (data version × history window); oldest evicted
+
+@st.cache_resource
+def dataset_cache():
+    """Loaded frames shared read-only by every session, LRU within NIKOS_CACHE_MB."""
+    return DatasetCache(DATASET_CACHE_MB)
+
+def load_sales(path, version, days=None):
+    return dataset_cache().get(('sales', path, version, days), lambda: load_sales_source(path, days))
+
+def load_inventory(path, version, days=None):
+    return dataset_cache().get(('inventory', path, version, days), lambda: load_inventory_source(path, days))
+
+def load_sources(jobs):
+    """Run {name: (cached loader, args)} concurrently, one thread per source, behind one
+    progress bar. Threads rather than processes: forking the threaded server can deadlock
+    a child, and a spawned one would re-run this page (Streamlit registers it as __main__).
+    A failing loader only fails its own source: returns ({name: result}, {name: error message})."""
+    ctx = get_script_run_ctx()
+    def run(fn, args):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    results, errors, bar = {}, {}, None
+    with ThreadPoolExecutor(len(jobs)) as pool:
+        futures = {pool.submit(run, fn, args): name for name, (fn, args) in jobs.items()}
+        if wait(futures, timeout=0.25).not_done:         # cache hits finish at once; only cold loads show progress
+            bar = st.progress(0.0, text=f"Loading {' and '.join(SOURCE_LABELS[n].lower() for n in jobs)} …")
+        for i, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = f'{type(e).__name__}: {e}'
+            if bar is not None:
+                bar.progress(i / len(jobs), text=f"Loaded {SOURCE_LABELS[name].lower()} ({i}/{len(jobs)})")
+    if bar is not None:
+        bar.empty()
+    return results, errors
+
+@st.cache_resource(max_entries=DERIVED_ENTRIES)
+def load_aggregates(sales_path, sales_version, inv_path, inv_version, days=None, failed=()):
+    """Settings-independent rollups, computed once per data version and shared read-only
+    across sessions, so a sidebar change reuses them without unpickling a copy.
+    A source in `failed` is built as empty, so the other source's views still work; only
+    full-history loads of both use the persisted incremental rollups."""
+    fin_df, _ = empty_sales_frames() if 'sales' in failed else load_sales(sales_path, sales_version, days)
+    inv_df    = empty_inventory_frame() if 'inventory' in failed else load_inventory(inv_path, inv_version, days)
+    rollups   = None if days or failed else (nikos_rollups.sales_rollups(fin_df, sales_path),
+                                             nikos_rollups.inventory_rollups(inv_df, inv_path))
+    return build_aggregates(fin_df, inv_df, rollups)
+
+@st.cache_resource(max_entries=DERIVED_ENTRIES)
+def load_drilldowns(sales_path, sales_version, inv_path, inv_version, days=None, failed=()):
+    """Per-day slot and per-category frames, shared read-only across sessions (no per-hit copy)."""
+    fin_df, slots_df = empty_sales_frames() if 'sales' in failed else load_sales(sales_path, sales_version, days)
+    return build_drilldowns(fin_df, slots_df,
+                            load_aggregates(sales_path, sales_version, inv_path, inv_version, days, failed))
+
+@st.cache_resource
+def load_invoice_db(inv_path, inv_version):
+    """Indexed SQLite copy of the invoice lines (NIKOS_INVOICE_DB=1); only its path is shared."""
+    return nikos_store.build_invoice_db(inv_path, load_inventory(inv_path, inv_version, None))
+
+@st.cache_resource(max_entries=DERIVED_ENTRIES)
+def load_snapshot(path, version):
+    """Sales frames, rollups and metadata from a nikos_snapshot.py folder (no workbook parsing),
+    shared read-only across sessions."""
+    fin_df, slots_df, agg, _, meta = read_snapshot(path)
+    return fin_df, slots_df, agg, meta
+
+@st.cache_resource(max_entries=DERIVED_ENTRIES)
+def load_snapshot_drilldowns(path, version):
+    fin_df, slots_df, agg, _ = load_snapshot(path, version)
+    return build_drilldowns(fin_df, slots_df, agg)
+
+FIGURE_CACHE_SIZE = 256
+_figure_lock      = threading.Lock()
+
+@st.cache_resource
+def figure_cache():
+    """Built Plotly figures shared by every session, LRU-keyed by (data version, figure id, settings)."""
+    return OrderedDict()
+
+WATCHED_PAIRS = 4   # path pairs watched at once; an evicted watcher's thread is stopped
+
+@st.cache_resource(max_entries=WATCHED_PAIRS, on_release=lambda watcher: watcher.stop())
+def source_watcher(sales_path, inv_path):
+    """One background watcher per pair of workbook paths, shared by every session."""
+    return SourceWatcher({'sales': sales_path, 'inventory': inv_path},
+                         on_change=lambda old, cur: invalidate_sources(sales_path, inv_path, old, cur))
+
+def invalidate_sources(sales_path, inv_path, old, cur):
+    """Drop the cache entries built from the replaced workbook version(s) only;
+    loaders of an unchanged workbook keep serving their entries."""
+    sales_v, inv_v = old.get('sales', cur['sales']), old.get('inventory', cur['inventory'])
+    if 'inventory' in old:
+        load_invoice_db.clear(inv_path, inv_v)
+    stale = set()
+    for days in TREND_WINDOWS.values():
+        if 'sales' in old:
+            dataset_cache().discard(('sales', sales_path, sales_v, days))
+        if 'inventory' in old:
+            dataset_cache().discard(('inventory', inv_path, inv_v, days))
+        for failed in FAILED_STATES:
+            stale.add((sales_path, sales_v, inv_path, inv_v, days, failed))
+            load_aggregates.clear(sales_path, sales_v, inv_path, inv_v, days, failed)
+            load_drilldowns.clear(sales_path, sales_v, inv_path, inv_v, days, failed)
+    with _figure_lock:
+        cache = figure_cache()
+        for key in [k for k in cache if k[0] in stale]:
+            del cache[key]
+
+@st.fragment(run_every=WATCH_INTERVAL)
+def watch_sources(watcher):
+    """Reruns this session once the watcher has seen a workbook change since its last full run."""
+    if watcher.generation != st.session_state.get('source_generation'):
+        st.rerun()
+
+def chart(fig_id, build, *deps):
+    """Show the figure `build()` returns, reusing the built one while the data
+    version and `deps` (every setting / selection the figure reads) are unchanged."""
+    cache, key = figure_cache(), (data_key, fig_id, deps)
+    with _figure_lock:
+        fig = cache.get(key)
+        if fig is not None: cache.move_to_end(key)
+    if fig is None:
+        with timer(f'figure.build.{fig_id}'):
+            fig = build()
+        with _figure_lock:
+            cache[key] = fig
+            while len(cache) > FIGURE_CACHE_SIZE: cache.popitem(last=False)
+    with timer(f'figure.render.{fig_id}'):
+        st.plotly_chart(fig, width='stretch')
+
+WEBGL_POINTS = 500   # line traces longer than this render with WebGL (Scattergl) instead of SVG
+
+def scatter(n_points):
+    return go.Scattergl if n_points > WEBGL_POINTS else go.Scatter
+
+def trend_note(grain, n_days, n_points):
+    """Caption under a trend chart when it isn't showing every day."""
+    if grain != 'D':
+        st.caption(f"{'Weekly' if grain == 'W' else 'Monthly'} averages per day over {n_days:,} days — "
+                   "pick a shorter window or Daily granularity for day-level detail.")
+    elif n_points < n_days:
+        st.caption(f"{n_points:,} of {n_days:,} days shown (shape-preserving LTTB downsampling).")
+
+def table(df, formats=None, **kwargs):
+    """st.dataframe with {column: format} sent as column_config, so the browser formats the
+    cells instead of a pandas Styler rendering each one in Python. Formats are printf
+    ('$%,.0f', '%+.1f%%'); 'date:' prefixes a moment.js date format ('date:MMM DD, YYYY')."""
+    config = {c: st.column_config.DateColumn(format=f[5:]) if f.startswith('date:')
+                 else st.column_config.NumberColumn(format=f) for c, f in (formats or {}).items()}
+    return st.dataframe(df, column_config=config, width='stretch', hide_index=True, **kwargs)
+
+def paged_table(df, formats, key, search_cols=(), default_sort=None):
+    """A long table searched, sorted and paged on the server: only the visible page goes to the browser."""
+    c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+    search = c1.text_input("Search", key=f'{key}_search', placeholder=f"Filter {' / '.join(search_cols)}") \
+             if search_cols else ''
+    cols   = list(df.columns)
+    sort   = c2.selectbox("Sort by", cols, index=cols.index(default_sort) if default_sort in cols else 0, key=f'{key}_sort')
+    desc   = c3.toggle("Descending", value=True, key=f'{key}_desc')
+    size   = c4.selectbox("Rows", [25, PAGE_SIZE, 100, 250], index=1, key=f'{key}_size')
+    page_key = f'{key}_page'
+    rows, n  = table_page(df, st.session_state.get(page_key, 1), size, sort, desc, search, search_cols)
+    pages    = max(-(-n // size), 1)
+    st.session_state[page_key] = page = min(st.session_state.get(page_key, 1), pages)   # a narrower search can drop pages
+    table(rows, formats)
+    p1, p2 = st.columns([1, 3])
+    p1.number_input(f"Page (of {pages:,})", 1, pages, key=page_key)
+    p2.caption(f"Rows {(page - 1) * size + 1 if n else 0:,}–{(page - 1) * size + len(rows):,} of {n:,}"
+               + (f" matching '{search}'" if search else ''))
+
+@st.fragment
+def slot_drilldown():
+    """Time Slot Drill-Down — a date change reruns only this section."""
+    day_choice = st.selectbox("Select Date", drill['days'])
+    day_slots  = slot_frame(drill['slots'], drill['day_pos'][day_choice])
+    if day_slots.empty:
+        return
+    peak_t = day_slots['Sales'].quantile(1 - top_pct)
+    slow_t = day_slots['Sales'].quantile(slow_pct)
+    day_slots = day_slots.assign(color=np.select([day_slots['Sales'] >= peak_t, day_slots['Sales'] > slow_t],
+                                                 ['#C45C3A', '#D4A853'], '#BDC3C7'))
+
+    day_fin = drill['day_fin'][day_choice]
+    m1, m2, m3, m4, m5 = st.columns(5)
+    m1.metric("Gross Sales",  f"${day_fin['gross_before']:,.2f}")
+    m2.metric("Net Sales",    f"${day_fin['net_sales']:,.2f}")
+    m3.metric("Discounts",    f"${day_fin['discounts']:,.2f}", f"-{day_fin['discount_rate']:.1f}%")
+    m4.metric("Total Txns",   f"{day_slots['Txns'].sum():.0f}")
+    avg_t = day_slots['Sales'].sum() / max(day_slots['Txns'].sum(), 1)
+    m5.metric("Avg Ticket",   f"${avg_t:.2f}")
+
+    def build_slots():
+        fig_slots = px.bar(day_slots, x='Slot', y='Sales', color='color',
+                           color_discrete_map='identity',
+                           title=f"Sales by 15-min slot — {day_choice}")
+        fig_slots.update_layout(height=320, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                showlegend=False, xaxis_tickangle=-45, yaxis=dict(tickprefix='$'))
+        return fig_slots
+    chart('slots', build_slots, day_choice, top_pct, slow_pct)
+
+    p1, p2 = st.columns(2)
+    with p1:
+        st.markdown(f"**🔥 Peak Slots (Top {int(top_pct*100)}%)**")
+        peaks = day_slots[day_slots['Sales'] >= peak_t][['Slot','Sales','Txns','Avg_Ticket']].sort_values('Sales', ascending=False)
+        table(peaks, {'Sales':'$%,.2f','Avg_Ticket':'$%.2f','Txns':'%.0f'})
+    with p2:
+        st.markdown(f"**🐌 Slow Slots (Bottom {int(slow_pct*100)}%)**")
+        slows = day_slots[day_slots['Sales'] <= slow_t][['Slot','Sales','Txns','Avg_Ticket']].sort_values('Sales')
+        table(slows, {'Sales':'$%,.2f','Avg_Ticket':'$%.2f','Txns':'%.0f'})
+
+@st.fragment
+def category_drilldown():
+    """Category Drill-Down — a category change reruns only this section."""
+    sel_cat = st.selectbox("Select Category", drill['categories'])
+    col_a, col_b = st.columns(2)
+    with col_a:
+        subcat = nikos_store.subcategory_spend(invoice_db, sel_cat) if invoice_db else drill['cat_subcat'][sel_cat]
+        def build_sub():
+            fig_sub = px.bar(subcat, x='Subcategory', y='Total_Price', title=f'{sel_cat} — by Subcategory',
+                             color='Total_Price', color_continuous_scale=['#E8C4B8','#C45C3A'])
+            fig_sub.update_layout(height=300, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                  coloraxis_showscale=False, yaxis=dict(tickprefix='$'))
+            return fig_sub
+        chart('sub', build_sub, sel_cat)
+    with col_b:
+        items = nikos_store.category_items(invoice_db, sel_cat) if invoice_db else drill['cat_items'][sel_cat]
+        table(items, {'spend':'$%,.2f','qty':'%,.1f'})
+
+LEDGER_LABELS = {'Standard_Item_Name': 'Item', 'Category/Class': 'Category', 'spend': 'Spend', 'qty': 'Qty',
+                 'unit_price': 'Avg Unit Price', 'lines': 'Invoice Lines', 'last_purchase': 'Last Purchase'}
+
+@st.fragment
+def ledger_view():
+    """Item × Vendor Ledger — search, sort and paging rerun only this section."""
+    paged_table(drill['ledger'].rename(columns=LEDGER_LABELS),
+                {'Spend':'$%,.2f','Qty':'%,.1f','Avg Unit Price':'$%,.2f','Invoice Lines':'%,d',
+                 'Last Purchase':'date:MMM DD, YYYY'},
+                key='ledger', search_cols=('Item','Vendor','Category'), default_sort='Spend')
+
+@st.fragment
+def price_creep_view():
+    """Price Creep — filters and row picks rerun only this section."""
+    creep = agg['price_creep']
+    scored = creep[creep['baseline'].notna()]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Item × Vendor Pairs",    f"{len(creep):,}", f"{len(scored):,} with enough history", delta_color='off')
+    c2.metric("🔴 Creeping Now",         f"{(creep['status'] == '🔴 Creep').sum():,}")
+    c3.metric("🟡 Rising (not yet unusual)", f"{(creep['status'] == '🟡 Rising').sum():,}")
+    c4.metric("Median Latest vs Baseline", f"{scored['pct_change'].median():+.1f}%" if len(scored) else "—")
+
+    f1, f2 = st.columns([3, 1])
+    cats  = f1.multiselect("Categories", sorted(creep['Category'].unique()), placeholder="All categories")
+    moved = f2.toggle("Moving prices only", value=True, help="Hide ⚪ Stable and ⚪ Too few pairs")
+    view  = creep[creep['Category'].isin(cats)] if cats else creep
+    if moved:
+        view = view[~view['status'].str.startswith('⚪')]
+    view = view.reset_index(drop=True)
+    creep_table = view.rename(columns={'Standard_Item_Name': 'Item', 'purchases': 'Purchases', 'Invoice_Date': 'Last Purchase',
+                                       'unit_price': 'Last Price', 'baseline': 'Baseline', 'pct_change': 'vs Baseline %',
+                                       'z': 'Z-Score', 'since_first_pct': 'Since First %', 'status': 'Status'})
+    picked = table(creep_table, {'Last Price':'$%,.2f','Baseline':'$%,.2f','vs Baseline %':'%+.1f%%',
+                                 'Z-Score':'%+.2f','Since First %':'%+.1f%%','Last Purchase':'date:MMM DD, YYYY'},
+                   on_select='rerun', selection_mode='single-row', key='creep_table')
+    if view.empty:
+        return
+    rows = [i for i in picked.selection.rows if i < len(view)]   # a pick from before the filters narrowed is dropped
+    row  = view.iloc[rows[0] if rows else 0]
+    pair = (row['Standard_Item_Name'], row['Vendor'])
+    hist = drill['price_history'][pair]
+
+    def build_creep():
+        fig_creep = go.Figure()
+        upper, lower = hist['baseline'] + CREEP_Z * hist['std'], hist['baseline'] - CREEP_Z * hist['std']
+        fig_creep.add_trace(go.Scatter(x=hist['Invoice_Date'], y=upper, mode='lines', line=dict(width=0),
+                                       hoverinfo='skip', showlegend=False))
+        fig_creep.add_trace(go.Scatter(x=hist['Invoice_Date'], y=lower, mode='lines', line=dict(width=0),
+                                       fill='tonexty', fillcolor='rgba(196,146,42,0.15)',
+                                       name=f'Normal range (±{CREEP_Z:g}σ)', hoverinfo='skip'))
+        fig_creep.add_trace(go.Scatter(x=hist['Invoice_Date'], y=hist['baseline'], name='Baseline',
+                                       mode='lines', line=dict(color=GOLD, dash='dash', width=2)))
+        fig_creep.add_trace(scatter(len(hist))(x=hist['Invoice_Date'], y=hist['unit_price'], name='Unit Price',
+                                               mode='lines+markers', line=dict(color=CLAY, width=2), marker=dict(size=7),
+                                               customdata=hist[['pct_change','z']],
+                                               hovertemplate='$%{y:,.2f}  (%{customdata[0]:+.1f}% vs baseline, z %{customdata[1]:+.1f})'))
+        fig_creep.update_layout(height=320, plot_bgcolor=CREAM, paper_bgcolor=CREAM, hovermode='x unified',
+                                title=f'{pair[0]} — {pair[1]}: unit price vs. rolling baseline of last {CREEP_BASELINE} purchases',
+                                yaxis=dict(tickprefix='$', title='Unit Price'), legend=dict(orientation='h', y=1.12))
+        return fig_creep
+    chart('creep', build_creep, pair)
+
+# axis: (label, slider min, max, step, default range, sidebar value → slider units)
+SCENARIO_SLIDERS = {
+    'aramark_rate':     ("Aramark/Sodexo Commission %", 0.0, 50.0, 0.5, (10.0, 30.0), 100),
+    'cc_fee_rate':      ("Credit Card Fee %",           0.0, 10.0, 0.25, (1.0, 5.0),  100),
+    'daily_fixed_cost': ("Daily Fixed Costs ($)",       0.0, 3000.0, 50.0, (500.0, 1200.0), 1),
+    'target_food_cost': ("Target Food Cost %",          10.0, 70.0, 1.0, (30.0, 45.0), 1),
+}
+SCENARIO_METRICS = {
+    'net_after':         ("Net after fees",                 '$%{z:,.0f}'),
+    'net_after_fixed':   ("Net after fees & fixed costs",   '$%{z:,.0f}'),
+    'days_above_be':     ("Days at/above break-even",       '%{z:,.0f} days'),
+    'avg_weekly_margin': ("Avg weekly margin",              '$%{z:,.0f}'),
+    'weeks_positive':    ("Weeks with a positive margin",   '%{z:,.0f} weeks'),
+    'weeks_on_target':   ("Weeks at/under target food cost", '%{z:,.0f} weeks'),
+}
+
+@st.fragment
+def scenario_view():
+    """What-If Scenarios — one broadcast grid over two settings, the other two held at the sidebar values."""
+    current = dict(aramark_rate=aramark_rate, cc_fee_rate=cc_fee_rate,
+                   daily_fixed_cost=daily_fixed_cost, target_food_cost=target_food_cost)
+    c1, c2, c3 = st.columns(3)
+    metric = c1.selectbox("Metric", list(SCENARIO_METRICS), format_func=lambda m: SCENARIO_METRICS[m][0])
+    y_axis = c2.selectbox("Rows", list(SCENARIO_SLIDERS), index=0, format_func=lambda a: SCENARIO_SLIDERS[a][0])
+    x_axis = c3.selectbox("Columns", [a for a in SCENARIO_SLIDERS if a != y_axis], index=1 if y_axis != 'daily_fixed_cost' else 0,
+                          format_func=lambda a: SCENARIO_SLIDERS[a][0])
+    axes = {}
+    for col, a in zip(st.columns(2), (y_axis, x_axis)):
+        label, lo, hi, step, default, unit = SCENARIO_SLIDERS[a]
+        span = col.slider(label, lo, hi, default, step, key=f'scenario_{a}')
+        axes[a] = np.arange(span[0], span[1] + step / 2, step) / (100 if unit == 100 else 1)
+    held = {a: v for a, v in current.items() if a not in axes}
+    grid = scenario_grid(agg, fin_df, **held, **axes)
+    z    = grid[metric].to_numpy().reshape(len(axes[y_axis]), len(axes[x_axis])) \
+           if SCENARIO_AXES.index(y_axis) < SCENARIO_AXES.index(x_axis) else \
+           grid[metric].to_numpy().reshape(len(axes[x_axis]), len(axes[y_axis])).T
+    st.caption(f"{len(grid):,} scenarios • held at sidebar values: " + ", ".join(
+        f"{SCENARIO_SLIDERS[a][0]} {v * SCENARIO_SLIDERS[a][5]:g}" for a, v in held.items()))
+
+    def build_scenarios():
+        ys, xs = axes[y_axis] * SCENARIO_SLIDERS[y_axis][5], axes[x_axis] * SCENARIO_SLIDERS[x_axis][5]
+        signed = metric in ('net_after', 'net_after_fixed', 'avg_weekly_margin')
+        fig_sc = go.Figure(go.Heatmap(z=z, x=xs, y=ys, zmid=0 if signed else None,
+                                      colorscale=[CLAY, CREAM, '#27AE60'] if signed else [CREAM, '#D4A853', '#5A6B3A'],
+                                      hovertemplate=f"{SCENARIO_SLIDERS[y_axis][0]} %{{y:g}}<br>"
+                                                    f"{SCENARIO_SLIDERS[x_axis][0]} %{{x:g}}<br>"
+                                                    f"{SCENARIO_METRICS[metric][1]}<extra></extra>"))
+        fig_sc.add_trace(go.Scatter(x=[current[x_axis] * SCENARIO_SLIDERS[x_axis][5]],
+                                    y=[current[y_axis] * SCENARIO_SLIDERS[y_axis][5]], mode='markers',
+                                    marker=dict(symbol='x', size=12, color=INK), name='Current settings'))
+        fig_sc.update_layout(height=420, plot_bgcolor=CREAM, paper_bgcolor=CREAM, showlegend=False,
+                             title=SCENARIO_METRICS[metric][0], xaxis_title=SCENARIO_SLIDERS[x_axis][0],
+                             yaxis_title=SCENARIO_SLIDERS[y_axis][0])
+        return fig_sc
+    chart('scenarios', build_scenarios, metric, y_axis, x_axis,
+          tuple(tuple(v) for v in axes.values()), tuple(held.items()), tuple(current.items()))
 
 # ─────────────────────────────────────────
 # LOAD DATA
 # ─────────────────────────────────────────
+load_errors = {}   # source -> error message; a failed source renders as empty and its tabs pause
 try:
-    fin_df, slots_df = load_sales(sales_path)
-    inv_df           = load_inventory(inv_path)
+    split            = nikos_perf.stopwatch('load')
+    if snapshot_dir:
+        snap_version = source_version(Path(snapshot_dir) / SNAPSHOT_META)
+        fin_df, slots_df, agg, snap_meta = load_snapshot(snapshot_dir, snap_version)
+        split('snapshot')
+        drill        = load_snapshot_drilldowns(snapshot_dir, snap_version)
+        split('drilldowns')
+        data_key     = ('snapshot', snapshot_dir, snap_version)
+        invoice_db   = None
+        st.sidebar.caption(f"📸 Snapshot generated {snap_meta['generated'].replace('T', ' ')}")
+    else:
+        watcher          = source_watcher(sales_path, inv_path)
+        st.session_state['source_generation'] = watcher.generation
+        sales_version    = watcher.version('sales')
+        inv_version      = watcher.version('inventory')
+        loaded, load_errors = load_sources({
+            'sales':     (load_sales,     (sales_path, sales_version, history_days)),
+            'inventory': (load_inventory, (inv_path,   inv_version,   history_days))})
+        if len(load_errors) == len(SOURCE_LABELS):
+            raise RuntimeError(' · '.join(f'{SOURCE_LABELS[n]}: {e}' for n, e in load_errors.items()))
+        fin_df, slots_df = loaded.get('sales') or empty_sales_frames()
+        failed           = tuple(n for n in SOURCE_LABELS if n in load_errors)
+        split('sources')
+        agg              = load_aggregates(sales_path, sales_version, inv_path, inv_version, history_days, failed)
+        split('aggregates')
+        drill            = load_drilldowns(sales_path, sales_version, inv_path, inv_version, history_days, failed)
+        split('drilldowns')
+        data_key         = (sales_path, sales_version, inv_path, inv_version, history_days, failed)
+        invoice_db       = load_invoice_db(inv_path, inv_version) if nikos_store.ENABLED_BY_ENV \
+                           and not history_days and not failed else None   # the db holds every line
+        split('invoice_db')
+        watch_sources(watcher)
 except Exception as e:
     st.error(f"⚠️ Could not load data: {e}\n\nPlease update the file paths in the sidebar.")
     st.stop()
 
+for name, err in load_errors.items():
+    st.sidebar.error(f"❌ {SOURCE_LABELS[name]} failed to load")
+    st.error(f"⚠️ {SOURCE_LABELS[name]} could not be loaded — {err}. Showing everything that doesn't need it; "
+             "fix the path in the sidebar or the file and the dashboard refreshes on its own.")
+
+def tab_ready(*sources):
+    """Whether every source a tab reads loaded; if not, says which one is missing instead of the tab body."""
+    missing = [n for n in sources if n in load_errors]
+    if missing:
+        st.info(f"⏸️ This tab needs {' and '.join(SOURCE_LABELS[n].lower() for n in missing)}, which failed to load.")
+    return not missing
+
+def shown(text, *sources):
+    """`text`, or a dash when a source it is computed from failed to load."""
+    return '—' if any(n in load_errors for n in sources) else text
+
 # ─────────────────────────────────────────
-# WEEKLY MERGED DATA
+# AGGREGATES (settings-independent, cached per data version)
 # ─────────────────────────────────────────
-weekly_sales = fin_df.groupby(['week_label','week_start']).agg(
-    net_sales    = ('net_sales',   'sum'),
-    gross_before = ('gross_before','sum'),
-    discounts    = ('discounts',   'sum'),
-    credit_card  = ('credit_card', 'sum'),
-    cash         = ('cash',        'sum'),
-).reset_index().sort_values('week_start')
-
-weekly_inv = inv_df.groupby(['week_label','week_start']).agg(
-    inv_spend=('Total_Price','sum')
-).reset_index().sort_values('week_start')
-
-weekly = weekly_sales.merge(weekly_inv, on=['week_label','week_start'], how='left')
-weekly['inv_spend']     = weekly['inv_spend'].fillna(0)
-weekly['food_cost_pct'] = (weekly['inv_spend'] / weekly['net_sales'].replace(0, np.nan) * 100).round(1)
-weekly['gross_profit']  = weekly['net_sales'] - weekly['inv_spend']
-weekly['discount_rate'] = (weekly['discounts'] / weekly['gross_before'].replace(0, np.nan) * 100).round(1)
-weekly['wow_net']       = weekly['net_sales'].pct_change()   * 100
-weekly['wow_gross']     = weekly['gross_before'].pct_change() * 100
-
-# Overall KPIs
-total_sales         = fin_df['net_sales'].sum()
-total_gross         = fin_df['gross_before'].sum()
-total_inv           = inv_df['Total_Price'].sum()
-total_discounts     = fin_df['discounts'].sum()
-overall_fc_pct      = round(total_inv / total_sales * 100, 1)   # vs net — operational view
-overall_fc_pct_gross= round(total_inv / total_gross * 100, 1)   # vs gross — contract view
-contract_disc_pct   = round(total_discounts / total_gross * 100, 1)  # Aramark/Sodexo discount rate
-cc_sales_pct        = round(fin_df['credit_card'].sum() / total_gross * 100, 1)  # full-price CC %
-avg_daily_net       = fin_df['net_sales'].mean()
-avg_daily_gross     = fin_df['gross_before'].mean()
-date_range_str      = f"{fin_df['Date'].min().strftime('%b %d')} – {fin_df['Date'].max().strftime('%b %d, %Y')}"
-
-# Protein data
-protein_df     = inv_df[inv_df['Category/Class'] == 'PROTEIN']
-total_protein  = protein_df['Total_Price'].sum()
-protein_pct    = round(total_protein / total_inv * 100, 1)
-protein_weekly = protein_df.groupby(['week_label','week_start'])['Total_Price'].sum().reset_index().sort_values('week_start')
-prot_inv_merge = protein_weekly.merge(weekly_inv, on=['week_label','week_start'], how='left')
-protein_weekly['pct_of_inv'] = (prot_inv_merge['Total_Price'] / prot_inv_merge['inv_spend'] * 100).round(1).values
-
-# Day of week stats
-dow_order = ['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']
-dow_stats = fin_df.groupby('Day').agg(
-    avg_net   = ('net_sales',    'mean'),
-    avg_gross = ('gross_before', 'mean'),
-    avg_disc  = ('discount_rate','mean'),
-    count     = ('Date',         'count')
-).reindex(dow_order).reset_index()
+weekly              = agg['weekly']
+dow_stats           = agg['dow_stats']
+protein_weekly      = agg['protein_weekly']
+total_sales         = agg['total_sales']
+total_gross         = agg['total_gross']
+total_inv           = agg['total_inv']
+total_discounts     = agg['total_discounts']
+overall_fc_pct      = agg['overall_fc_pct']         # vs net — operational view
+overall_fc_pct_gross= agg['overall_fc_pct_gross']   # vs gross — contract view
+contract_disc_pct   = agg['contract_disc_pct']      # Aramark/Sodexo discount rate
+avg_daily_net       = agg['avg_daily_net']
+date_range_str      = agg['date_range_str']
+total_protein       = agg['total_protein']
+protein_pct         = agg['protein_pct']
+
+# Settings-dependent KPIs (break-even, fees, alerts) — cheap, recomputed every rerun
+kpi = apply_settings(agg, fin_df, dict(aramark_rate=aramark_rate, cc_fee_rate=cc_fee_rate,
+                                       target_food_cost=target_food_cost, daily_fixed_cost=daily_fixed_cost,
+                                       protein_alert_pct=protein_alert_pct))
 
 # ─────────────────────────────────────────
 # LOGO — base64 embed so it renders in st.markdown
@@ -455,10 +792,10 @@ st.markdown(f"""
 <div class="header-banner">
   {banner_left}
   <div style="display:flex;gap:12px;">
-    <div class="header-badge"><b>${total_gross:,.0f}</b>Gross Sales</div>
-    <div class="header-badge"><b>${total_sales:,.0f}</b>Net Sales</div>
-    <div class="header-badge"><b>${total_inv:,.0f}</b>Inv. Spend</div>
-    <div class="header-badge"><b>{overall_fc_pct}%</b>Food Cost</div>
+    <div class="header-badge"><b>{shown(f'${total_gross:,.0f}', 'sales')}</b>Gross Sales</div>
+    <div class="header-badge"><b>{shown(f'${total_sales:,.0f}', 'sales')}</b>Net Sales</div>
+    <div class="header-badge"><b>{shown(f'${total_inv:,.0f}', 'inventory')}</b>Inv. Spend</div>
+    <div class="header-badge"><b>{shown(f'{overall_fc_pct}%', 'sales', 'inventory')}</b>Food Cost</div>
   </div>
 </div>
 """, unsafe_allow_html=True)
@@ -466,6 +803,8 @@ st.markdown(f"""
 # ─────────────────────────────────────────
 # TABS
 # ─────────────────────────────────────────
+# Lazy tabs: switching reruns the script and only the selected tab's body runs,
+# so each interaction builds one tab's figures instead of all six.
 tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "📊 Overview",
     "📈 Sales & Peak Periods",
@@ -473,634 +812,591 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "💰 Food Cost & Margins",
     "⚠️ Overstock & Waste",
     "🔔 Alerts & Recovery"
-])
+], key='active_tab', on_change='rerun')
 
 # ══════════════════════════════════════════
 # TAB 1 — OVERVIEW
 # ══════════════════════════════════════════
-with tab1:
-    st.markdown('<div class="section-header">Key Performance Indicators</div>', unsafe_allow_html=True)
-    c1, c2, c3, c4, c5, c6 = st.columns(6)
-    fc_color = "danger" if overall_fc_pct > target_food_cost else "olive"
-    be_gap   = avg_daily_net - daily_fixed_cost
-    be_color = "olive" if be_gap >= 0 else "danger"
-
-    with c1:
-        st.markdown(f'<div class="kpi-card"><div class="kpi-label">Gross Sales</div><div class="kpi-value">${total_gross:,.0f}</div><div class="kpi-sub">before discounts</div></div>', unsafe_allow_html=True)
-    with c2:
-        st.markdown(f'<div class="kpi-card gold"><div class="kpi-label">Net Sales</div><div class="kpi-value">${total_sales:,.0f}</div><div class="kpi-sub">{fin_df["Date"].nunique()} operating days</div></div>', unsafe_allow_html=True)
-    with c3:
-        st.markdown(f'<div class="kpi-card gold"><div class="kpi-label">Aramark/Sodexo Discounts</div><div class="kpi-value">${total_discounts:,.0f}</div><div class="kpi-sub">{contract_disc_pct}% contract rate — not negotiable</div></div>', unsafe_allow_html=True)
-    with c4:
-        st.markdown(f'<div class="kpi-card olive"><div class="kpi-label">Inv. Spend</div><div class="kpi-value">${total_inv:,.0f}</div><div class="kpi-sub">RD + PFS combined</div></div>', unsafe_allow_html=True)
-    with c5:
-        st.markdown(f'<div class="kpi-card {fc_color}"><div class="kpi-label">Food Cost %</div><div class="kpi-value">{overall_fc_pct}%</div><div class="kpi-sub">Target: {target_food_cost:.0f}%</div></div>', unsafe_allow_html=True)
-    with c6:
-        st.markdown(f'<div class="kpi-card {be_color}"><div class="kpi-label">Avg Daily vs Break-Even</div><div class="kpi-value">{("+" if be_gap>=0 else "")}{be_gap:,.0f}</div><div class="kpi-sub">Break-even: ${daily_fixed_cost:,.0f}/day</div></div>', unsafe_allow_html=True)
-
-    # ── BREAK-EVEN TRACKER ──────────────────────
-    st.markdown('<div class="section-header">🎯 Daily Break-Even Tracker</div>', unsafe_allow_html=True)
-
-    be_df = fin_df[['Date','Day','gross_before','net_sales','discounts']].copy()
-    be_df['gap_gross'] = be_df['gross_before'] - daily_fixed_cost
-    be_df['gap_net']   = be_df['net_sales']    - daily_fixed_cost
-    days_above_gross   = (be_df['gap_gross'] >= 0).sum()
-    days_above_net     = (be_df['gap_net']   >= 0).sum()
-    total_days         = len(be_df)
-
-    bm1, bm2, bm3, bm4 = st.columns(4)
-    bm1.metric("Break-Even Target",   f"${daily_fixed_cost:,.0f}/day")
-    bm2.metric("Days Above (Gross)",  f"{days_above_gross}/{total_days}", f"{days_above_gross/total_days*100:.0f}% of days")
-    bm3.metric("Days Above (Net)",    f"{days_above_net}/{total_days}",   f"{days_above_net/total_days*100:.0f}% of days")
-    bm4.metric("Avg Daily Net vs BE", f"${avg_daily_net - daily_fixed_cost:+,.0f}",
-               "surplus" if avg_daily_net >= daily_fixed_cost else "shortfall",
-               delta_color="normal" if avg_daily_net >= daily_fixed_cost else "inverse")
-
-    fig_be = go.Figure()
-    bar_colors_gross = ['#C45C3A' if v >= daily_fixed_cost else '#E8C4B8' for v in be_df['gross_before']]
-    bar_colors_net   = ['#5A6B3A' if v >= daily_fixed_cost else '#BDC3C7' for v in be_df['net_sales']]
-    fig_be.add_trace(go.Bar(x=be_df['Date'], y=be_df['gross_before'],
-                            name='Gross Sales', marker_color=bar_colors_gross, opacity=0.6))
-    fig_be.add_trace(go.Bar(x=be_df['Date'], y=be_df['net_sales'],
-                            name='Net Sales', marker_color=bar_colors_net))
-    fig_be.add_hline(y=daily_fixed_cost, line_dash='dash', line_color='#C0392B', line_width=2,
-                     annotation_text=f'Break-Even ${daily_fixed_cost:,.0f}',
-                     annotation_font_color='#A93226')
-    fig_be.update_layout(
-        barmode='overlay', height=380, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-        hovermode='x unified', yaxis=dict(tickprefix='$', title='Sales ($)'),
-        legend=dict(orientation='h', y=1.1),
-        title='Daily Gross & Net Sales vs. Break-Even Line (dark = above, light = below)'
-    )
-    ink(fig_be)
-    st.plotly_chart(fig_be, use_container_width=True)
-
-    # ── WEEK-OVER-WEEK GROWTH ────────────────────
-    st.markdown('<div class="section-header">📈 Week-over-Week Sales Growth</div>', unsafe_allow_html=True)
-
-    w1, w2 = st.columns(2)
-    with w1:
-        fig_wow = go.Figure()
-        wow_colors_gross = ['#C45C3A' if (pd.notna(v) and v >= 0) else '#C0392B' for v in weekly['wow_gross']]
-        wow_colors_net   = ['#5A6B3A' if (pd.notna(v) and v >= 0) else '#8B3A22' for v in weekly['wow_net']]
-        fig_wow.add_trace(go.Bar(
-            x=weekly['week_label'], y=weekly['wow_gross'], name='Gross WoW %',
-            marker_color=wow_colors_gross, opacity=0.7,
-            text=weekly['wow_gross'].map(lambda x: f'{x:+.1f}%' if pd.notna(x) else 'Base'),
-            textposition='outside'))
-        fig_wow.add_trace(go.Bar(
-            x=weekly['week_label'], y=weekly['wow_net'], name='Net WoW %',
-            marker_color=wow_colors_net,
-            text=weekly['wow_net'].map(lambda x: f'{x:+.1f}%' if pd.notna(x) else 'Base'),
-            textposition='inside'))
-        fig_wow.add_hline(y=0, line_color=INK, line_width=1)
-        fig_wow.update_layout(
-            barmode='group', height=340, title='Week-over-Week Growth: Gross vs Net Sales',
-            plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-            yaxis=dict(ticksuffix='%'), legend=dict(orientation='h', y=1.1))
-        ink(fig_wow)
-        st.plotly_chart(fig_wow, use_container_width=True)
-
-    with w2:
-        st.markdown("**Weekly Growth Summary**")
-        wow_table = weekly[['week_label','gross_before','net_sales','wow_gross','wow_net','discounts','discount_rate']].copy()
-        wow_table.columns = ['Week','Gross Sales','Net Sales','Gross WoW %','Net WoW %','Aramark/Sodexo Disc.','Contract Disc. %']
-        st.dataframe(
-            wow_table.style
-                .format({
-                    'Gross Sales': '${:,.0f}', 'Net Sales': '${:,.0f}',
-                    'Gross WoW %': lambda x: f'{x:+.1f}%' if pd.notna(x) else 'Base',
-                    'Net WoW %':   lambda x: f'{x:+.1f}%' if pd.notna(x) else 'Base',
-                    'Aramark/Sodexo Disc.': '${:,.0f}', 'Contract Disc. %': '{:.1f}%'
-                }),
-            use_container_width=True, hide_index=True)
-
-    st.markdown('<div class="section-header">Weekly Summary Table</div>', unsafe_allow_html=True)
-    display_w = weekly[['week_label','gross_before','net_sales','discounts','discount_rate','inv_spend','food_cost_pct','gross_profit']].copy()
-    display_w.columns = ['Week','Gross Sales','Net Sales','Aramark/Sodexo Disc.','Contract Disc. %','Inv. Spend','Food Cost % (Net)','Gross Profit']
-    st.dataframe(
-        display_w.style
-            .format({'Gross Sales':'${:,.2f}','Net Sales':'${:,.2f}','Aramark/Sodexo Disc.':'${:,.2f}',
-                     'Contract Disc. %':'{:.1f}%','Inv. Spend':'${:,.2f}','Food Cost % (Net)':'{:.1f}%','Gross Profit':'${:,.2f}'}),
-        use_container_width=True, hide_index=True)
+with tab1, timer('tab.overview', tab1.open):
+    if tab1.open and tab_ready('sales', 'inventory'):
+        st.markdown('<div class="section-header">Key Performance Indicators</div>', unsafe_allow_html=True)
+        c1, c2, c3, c4, c5, c6 = st.columns(6)
+        fc_color = "danger" if overall_fc_pct > target_food_cost else "olive"
+        be_gap   = kpi['be_gap']
+        be_color = "olive" if be_gap >= 0 else "danger"
+
+        with c1:
+            st.markdown(f'<div class="kpi-card"><div class="kpi-label">Gross Sales</div><div class="kpi-value">${total_gross:,.0f}</div><div class="kpi-sub">before discounts</div></div>', unsafe_allow_html=True)
+        with c2:
+            st.markdown(f'<div class="kpi-card gold"><div class="kpi-label">Net Sales</div><div class="kpi-value">${total_sales:,.0f}</div><div class="kpi-sub">{agg["n_days"]} operating days</div></div>', unsafe_allow_html=True)
+        with c3:
+            st.markdown(f'<div class="kpi-card gold"><div class="kpi-label">Aramark/Sodexo Discounts</div><div class="kpi-value">${total_discounts:,.0f}</div><div class="kpi-sub">{contract_disc_pct}% contract rate — not negotiable</div></div>', unsafe_allow_html=True)
+        with c4:
+            st.markdown(f'<div class="kpi-card olive"><div class="kpi-label">Inv. Spend</div><div class="kpi-value">${total_inv:,.0f}</div><div class="kpi-sub">RD + PFS combined</div></div>', unsafe_allow_html=True)
+        with c5:
+            st.markdown(f'<div class="kpi-card {fc_color}"><div class="kpi-label">Food Cost %</div><div class="kpi-value">{overall_fc_pct}%</div><div class="kpi-sub">Target: {target_food_cost:.0f}%</div></div>', unsafe_allow_html=True)
+        with c6:
+            st.markdown(f'<div class="kpi-card {be_color}"><div class="kpi-label">Avg Daily vs Break-Even</div><div class="kpi-value">{("+" if be_gap>=0 else "")}{be_gap:,.0f}</div><div class="kpi-sub">Break-even: ${daily_fixed_cost:,.0f}/day</div></div>', unsafe_allow_html=True)
+
+        # ── BREAK-EVEN TRACKER ──────────────────────
+        st.markdown('<div class="section-header">🎯 Daily Break-Even Tracker</div>', unsafe_allow_html=True)
+
+        be_df, be_grain, be_days = trend_frame(fin_df, 'Date', ['net_sales','gross_before'], trend_days, trend_grain)
+        days_above_gross   = kpi['days_above_gross']
+        days_above_net     = kpi['days_above_net']
+        total_days         = len(fin_df)
+
+        bm1, bm2, bm3, bm4 = st.columns(4)
+        bm1.metric("Break-Even Target",   f"${daily_fixed_cost:,.0f}/day")
+        bm2.metric("Days Above (Gross)",  f"{days_above_gross}/{total_days}", f"{days_above_gross/total_days*100:.0f}% of days")
+        bm3.metric("Days Above (Net)",    f"{days_above_net}/{total_days}",   f"{days_above_net/total_days*100:.0f}% of days")
+        bm4.metric("Avg Daily Net vs BE", f"${avg_daily_net - daily_fixed_cost:+,.0f}",
+                   "surplus" if avg_daily_net >= daily_fixed_cost else "shortfall",
+                   delta_color="normal" if avg_daily_net >= daily_fixed_cost else "inverse")
+
+        def build_be():
+            fig_be = go.Figure()
+            bar_colors_gross = np.where(be_df['gross_before'] >= daily_fixed_cost, '#C45C3A', '#E8C4B8')
+            bar_colors_net   = np.where(be_df['net_sales']    >= daily_fixed_cost, '#5A6B3A', '#BDC3C7')
+            fig_be.add_trace(go.Bar(x=be_df['Date'], y=be_df['gross_before'],
+                                    name='Gross Sales', marker_color=bar_colors_gross, opacity=0.6))
+            fig_be.add_trace(go.Bar(x=be_df['Date'], y=be_df['net_sales'],
+                                    name='Net Sales', marker_color=bar_colors_net))
+            fig_be.add_hline(y=daily_fixed_cost, line_dash='dash', line_color='#C0392B', line_width=2,
+                             annotation_text=f'Break-Even ${daily_fixed_cost:,.0f}',
+                             annotation_font_color='#A93226')
+            fig_be.update_layout(
+                barmode='overlay', height=380, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                hovermode='x unified', yaxis=dict(tickprefix='$', title='Sales ($)'),
+                legend=dict(orientation='h', y=1.1),
+                title='Daily Gross & Net Sales vs. Break-Even Line (dark = above, light = below)'
+            )
+            return fig_be
+        chart('be', build_be, daily_fixed_cost, trend_days, trend_grain)
+        trend_note(be_grain, be_days, len(be_df))
+
+        # ── WEEK-OVER-WEEK GROWTH ────────────────────
+        st.markdown('<div class="section-header">📈 Week-over-Week Sales Growth</div>', unsafe_allow_html=True)
+
+        w1, w2 = st.columns(2)
+        with w1:
+            def build_wow():
+                fig_wow = go.Figure()
+                wow_colors_gross = np.where(weekly['wow_gross'] >= 0, '#C45C3A', '#C0392B')
+                wow_colors_net   = np.where(weekly['wow_net']   >= 0, '#5A6B3A', '#8B3A22')
+                fig_wow.add_trace(go.Bar(
+                    x=weekly['week_label'], y=weekly['wow_gross'], name='Gross WoW %',
+                    marker_color=wow_colors_gross, opacity=0.7,
+                    text=weekly['wow_gross'].map(lambda x: f'{x:+.1f}%' if pd.notna(x) else 'Base'),
+                    textposition='outside'))
+                fig_wow.add_trace(go.Bar(
+                    x=weekly['week_label'], y=weekly['wow_net'], name='Net WoW %',
+                    marker_color=wow_colors_net,
+                    text=weekly['wow_net'].map(lambda x: f'{x:+.1f}%' if pd.notna(x) else 'Base'),
+                    textposition='inside'))
+                fig_wow.add_hline(y=0, line_color=INK, line_width=1)
+                fig_wow.update_layout(
+                    barmode='group', height=340, title='Week-over-Week Growth: Gross vs Net Sales',
+                    plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                    yaxis=dict(ticksuffix='%'), legend=dict(orientation='h', y=1.1))
+                return fig_wow
+            chart('wow', build_wow)
+
+        with w2:
+            st.markdown("**Weekly Growth Summary**")
+            wow_table = weekly[['week_label','gross_before','net_sales','wow_gross','wow_net','discounts','discount_rate']].copy()
+            wow_table.columns = ['Week','Gross Sales','Net Sales','Gross WoW %','Net WoW %','Aramark/Sodexo Disc.','Contract Disc. %']
+            table(wow_table, {'Gross Sales':'$%,.0f','Net Sales':'$%,.0f','Gross WoW %':'%+.1f%%','Net WoW %':'%+.1f%%',
+                              'Aramark/Sodexo Disc.':'$%,.0f','Contract Disc. %':'%.1f%%'})
+            st.caption("WoW % is blank for the first (base) week.")
+
+        st.markdown('<div class="section-header">Weekly Summary Table</div>', unsafe_allow_html=True)
+        display_w = weekly[['week_label','gross_before','net_sales','discounts','discount_rate','inv_spend','food_cost_pct','gross_profit']].copy()
+        display_w.columns = ['Week','Gross Sales','Net Sales','Aramark/Sodexo Disc.','Contract Disc. %','Inv. Spend','Food Cost % (Net)','Gross Profit']
+        table(display_w, {'Gross Sales':'$%,.2f','Net Sales':'$%,.2f','Aramark/Sodexo Disc.':'$%,.2f',
+                          'Contract Disc. %':'%.1f%%','Inv. Spend':'$%,.2f','Food Cost % (Net)':'%.1f%%','Gross Profit':'$%,.2f'})
 
 # ══════════════════════════════════════════
 # TAB 2 — SALES & PEAK PERIODS
 # ══════════════════════════════════════════
-with tab2:
-    st.markdown('<div class="section-header">Daily Sales Trend</div>', unsafe_allow_html=True)
-
-    fig_daily = go.Figure()
-    fig_daily.add_trace(go.Scatter(x=fin_df['Date'], y=fin_df['gross_before'],
-                                   name='Gross Sales', mode='lines',
-                                   line=dict(color='#E8C4B8', width=1.5),
-                                   fill='tozeroy', fillcolor='rgba(196,92,58,0.06)'))
-    fig_daily.add_trace(go.Scatter(x=fin_df['Date'], y=fin_df['net_sales'],
-                                   name='Net Sales', mode='lines+markers',
-                                   line=dict(color='#C45C3A', width=2.5), marker=dict(size=5)))
-    fig_daily.add_trace(go.Bar(x=fin_df['Date'], y=fin_df['discounts'],
-                               name='Discounts', marker_color='rgba(212,168,83,0.6)', yaxis='y2'))
-    fig_daily.add_hline(y=daily_fixed_cost, line_dash='dot', line_color='#8E44AD',
-                        annotation_text=f'Break-Even ${daily_fixed_cost:,.0f}',
-                        annotation_font_color='#6C3483')
-    fig_daily.update_layout(
-        height=400, plot_bgcolor=CREAM, paper_bgcolor=CREAM, hovermode='x unified',
-        yaxis=dict(tickprefix='$', title='Sales ($)'),
-        yaxis2=dict(title='Discounts ($)', overlaying='y', side='right', tickprefix='$', showgrid=False),
-        legend=dict(orientation='h', y=1.12))
-    ink(fig_daily)
-    st.plotly_chart(fig_daily, use_container_width=True)
-
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown('<div class="section-header">Gross & Net Sales by Day of Week</div>', unsafe_allow_html=True)
-        fig_dow = go.Figure()
-        fig_dow.add_trace(go.Bar(x=dow_stats['Day'], y=dow_stats['avg_gross'], name='Avg Gross',
-                                 marker_color='#E8C4B8',
-                                 text=dow_stats['avg_gross'].map(lambda x: f'${x:,.0f}'), textposition='outside'))
-        fig_dow.add_trace(go.Bar(x=dow_stats['Day'], y=dow_stats['avg_net'], name='Avg Net',
-                                 marker_color='#C45C3A',
-                                 text=dow_stats['avg_net'].map(lambda x: f'${x:,.0f}'), textposition='inside'))
-        fig_dow.update_layout(barmode='overlay', height=340, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                              yaxis=dict(tickprefix='$'), legend=dict(orientation='h', y=1.1))
-        ink(fig_dow)
-        st.plotly_chart(fig_dow, use_container_width=True)
-
-        best_day  = dow_stats.loc[dow_stats['avg_net'].idxmax(), 'Day']
-        worst_day = dow_stats.loc[dow_stats['avg_net'].idxmin(), 'Day']
-        best_row  = dow_stats[dow_stats['Day'] == best_day].iloc[0]
-        worst_row = dow_stats[dow_stats['Day'] == worst_day].iloc[0]
-        st.markdown(f'<div class="alert-box alert-good">🔥 <b>Best day: {best_day}</b> — avg gross ${best_row["avg_gross"]:,.0f} / net ${best_row["avg_net"]:,.0f}</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="alert-box alert-warn">🐌 <b>Slowest day: {worst_day}</b> — avg gross ${worst_row["avg_gross"]:,.0f} / net ${worst_row["avg_net"]:,.0f}</div>', unsafe_allow_html=True)
-
-    with col2:
-        st.markdown('<div class="section-header">Aramark/Sodexo Contract Discount Rate by Day</div>', unsafe_allow_html=True)
-        fig_disc = go.Figure()
-        fig_disc.add_trace(go.Bar(x=dow_stats['Day'], y=dow_stats['avg_disc'], marker_color='#2980B9',
-                                  text=dow_stats['avg_disc'].map(lambda x: f'{x:.1f}%'), textposition='outside'))
-        fig_disc.update_layout(height=340, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                               yaxis=dict(ticksuffix='%', title='Avg Contract Discount Rate'))
-        ink(fig_disc)
-        st.plotly_chart(fig_disc, use_container_width=True)
-        high_disc_day = dow_stats.loc[dow_stats['avg_disc'].idxmax(), 'Day']
-        st.markdown(f'<div class="alert-box alert-warn">ℹ️ <b>{high_disc_day} has the highest Aramark/Sodexo discount rate ({dow_stats["avg_disc"].max():.1f}%)</b> — this reflects your university contract (meal plans, faculty IDs). It is not controllable but is important context when reading food cost % on this day.</div>', unsafe_allow_html=True)
-
-    st.markdown('<div class="section-header">⏰ Time Slot Drill-Down</div>', unsafe_allow_html=True)
-    if not slots_df.empty:
-        day_choice = st.selectbox("Select Date", fin_df['Date'].dt.strftime('%Y-%m-%d').tolist())
-        day_slots  = slots_df[slots_df['Date'] == pd.to_datetime(day_choice)].copy()
-        if not day_slots.empty:
-            def sort_slot(s):
-                try: return datetime.strptime(s.split(' - ')[0].strip(), '%I:%M %p')
-                except: return datetime(2000,1,1)
-            day_slots['_sort'] = day_slots['Slot'].apply(sort_slot)
-            day_slots = day_slots.sort_values('_sort')
-            peak_t = day_slots['Sales'].quantile(1 - top_pct)
-            slow_t = day_slots['Sales'].quantile(slow_pct)
-            day_slots['color'] = day_slots['Sales'].apply(
-                lambda x: '#C45C3A' if x >= peak_t else ('#D4A853' if x > slow_t else '#BDC3C7'))
-
-            day_fin = fin_df[fin_df['Date'] == pd.to_datetime(day_choice)].iloc[0]
-            m1, m2, m3, m4, m5 = st.columns(5)
-            m1.metric("Gross Sales",  f"${day_fin['gross_before']:,.2f}")
-            m2.metric("Net Sales",    f"${day_fin['net_sales']:,.2f}")
-            m3.metric("Discounts",    f"${day_fin['discounts']:,.2f}", f"-{day_fin['discount_rate']:.1f}%")
-            m4.metric("Total Txns",   f"{day_slots['Txns'].sum():.0f}")
-            avg_t = day_slots['Sales'].sum() / max(day_slots['Txns'].sum(), 1)
-            m5.metric("Avg Ticket",   f"${avg_t:.2f}")
-
-            fig_slots = px.bar(day_slots, x='Slot', y='Sales', color='color',
-                               color_discrete_map='identity',
-                               title=f"Sales by 15-min slot — {day_choice}")
-            fig_slots.update_layout(height=320, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                                    showlegend=False, xaxis_tickangle=-45, yaxis=dict(tickprefix='$'))
-            ink(fig_slots)
-            st.plotly_chart(fig_slots, use_container_width=True)
-
-            p1, p2 = st.columns(2)
-            with p1:
-                st.markdown(f"**🔥 Peak Slots (Top {int(top_pct*100)}%)**")
-                peaks = day_slots[day_slots['Sales'] >= peak_t][['Slot','Sales','Txns','Avg_Ticket']].sort_values('Sales', ascending=False)
-                st.dataframe(peaks.style.format({'Sales':'${:,.2f}','Avg_Ticket':'${:.2f}','Txns':'{:.0f}'}),
-                             hide_index=True, use_container_width=True)
-            with p2:
-                st.markdown(f"**🐌 Slow Slots (Bottom {int(slow_pct*100)}%)**")
-                slows = day_slots[day_slots['Sales'] <= slow_t][['Slot','Sales','Txns','Avg_Ticket']].sort_values('Sales')
-                st.dataframe(slows.style.format({'Sales':'${:,.2f}','Avg_Ticket':'${:.2f}','Txns':'{:.0f}'}),
-                             hide_index=True, use_container_width=True)
+with tab2, timer('tab.sales', tab2.open):
+    if tab2.open and tab_ready('sales'):
+        st.markdown('<div class="section-header">Daily Sales Trend</div>', unsafe_allow_html=True)
+
+        daily, daily_grain, daily_days = trend_frame(fin_df, 'Date', ['net_sales','gross_before','discounts'],
+                                                     trend_days, trend_grain)
+        def build_daily():
+            fig_daily = go.Figure()
+            line_trace = scatter(len(daily))
+            fig_daily.add_trace(line_trace(x=daily['Date'], y=daily['gross_before'],
+                                     name='Gross Sales', mode='lines',
+                                     line=dict(color='#E8C4B8', width=1.5),
+                                     fill='tozeroy', fillcolor='rgba(196,92,58,0.06)'))
+            fig_daily.add_trace(line_trace(x=daily['Date'], y=daily['net_sales'],
+                                     name='Net Sales', mode='lines+markers',
+                                     line=dict(color='#C45C3A', width=2.5), marker=dict(size=5)))
+            fig_daily.add_trace(go.Bar(x=daily['Date'], y=daily['discounts'],
+                                       name='Discounts', marker_color='rgba(212,168,83,0.6)', yaxis='y2'))
+            fig_daily.add_hline(y=daily_fixed_cost, line_dash='dot', line_color='#8E44AD',
+                                annotation_text=f'Break-Even ${daily_fixed_cost:,.0f}',
+                                annotation_font_color='#6C3483')
+            fig_daily.update_layout(
+                height=400, plot_bgcolor=CREAM, paper_bgcolor=CREAM, hovermode='x unified',
+                yaxis=dict(tickprefix='$', title='Sales ($)'),
+                yaxis2=dict(title='Discounts ($)', overlaying='y', side='right', tickprefix='$', showgrid=False),
+                legend=dict(orientation='h', y=1.12))
+            return fig_daily
+        chart('daily', build_daily, daily_fixed_cost, trend_days, trend_grain)
+        trend_note(daily_grain, daily_days, len(daily))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown('<div class="section-header">Gross & Net Sales by Day of Week</div>', unsafe_allow_html=True)
+            def build_dow():
+                fig_dow = go.Figure()
+                fig_dow.add_trace(go.Bar(x=dow_stats['Day'], y=dow_stats['avg_gross'], name='Avg Gross',
+                                         marker_color='#E8C4B8',
+                                         text=dow_stats['avg_gross'].map(lambda x: f'${x:,.0f}'), textposition='outside'))
+                fig_dow.add_trace(go.Bar(x=dow_stats['Day'], y=dow_stats['avg_net'], name='Avg Net',
+                                         marker_color='#C45C3A',
+                                         text=dow_stats['avg_net'].map(lambda x: f'${x:,.0f}'), textposition='inside'))
+                fig_dow.update_layout(barmode='overlay', height=340, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                      yaxis=dict(tickprefix='$'), legend=dict(orientation='h', y=1.1))
+                return fig_dow
+            chart('dow', build_dow)
+
+            best_day  = dow_stats.loc[dow_stats['avg_net'].idxmax(), 'Day']
+            worst_day = dow_stats.loc[dow_stats['avg_net'].idxmin(), 'Day']
+            best_row  = dow_stats[dow_stats['Day'] == best_day].iloc[0]
+            worst_row = dow_stats[dow_stats['Day'] == worst_day].iloc[0]
+            st.markdown(f'<div class="alert-box alert-good">🔥 <b>Best day: {best_day}</b> — avg gross ${best_row["avg_gross"]:,.0f} / net ${best_row["avg_net"]:,.0f}</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="alert-box alert-warn">🐌 <b>Slowest day: {worst_day}</b> — avg gross ${worst_row["avg_gross"]:,.0f} / net ${worst_row["avg_net"]:,.0f}</div>', unsafe_allow_html=True)
+
+        with col2:
+            st.markdown('<div class="section-header">Aramark/Sodexo Contract Discount Rate by Day</div>', unsafe_allow_html=True)
+            def build_disc():
+                fig_disc = go.Figure()
+                fig_disc.add_trace(go.Bar(x=dow_stats['Day'], y=dow_stats['avg_disc'], marker_color='#2980B9',
+                                          text=dow_stats['avg_disc'].map(lambda x: f'{x:.1f}%'), textposition='outside'))
+                fig_disc.update_layout(height=340, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                       yaxis=dict(ticksuffix='%', title='Avg Contract Discount Rate'))
+                return fig_disc
+            chart('disc', build_disc)
+            high_disc_day = dow_stats.loc[dow_stats['avg_disc'].idxmax(), 'Day']
+            st.markdown(f'<div class="alert-box alert-warn">ℹ️ <b>{high_disc_day} has the highest Aramark/Sodexo discount rate ({dow_stats["avg_disc"].max():.1f}%)</b> — this reflects your university contract (meal plans, faculty IDs). It is not controllable but is important context when reading food cost % on this day.</div>', unsafe_allow_html=True)
+
+        st.markdown('<div class="section-header">⏰ Time Slot Drill-Down</div>', unsafe_allow_html=True)
+        if not slots_df.empty:
+            slot_drilldown()
+
+        st.markdown('<div class="section-header">🗓️ Weekday × Time Slot — All History</div>', unsafe_allow_html=True)
+        if not slots_df.empty:
+            hm_sales, hm_ticket, hm_slots = slot_heatmaps(drill['slots'])
+            hm_x = [lab.split(' - ')[0] for lab in hm_slots]
+            col1, col2 = st.columns(2)
+            with col1:
+                def build_hm():
+                    fig_hm = go.Figure(go.Heatmap(z=hm_sales, x=hm_x, y=DOW_ORDER, colorscale=[CREAM,'#D4A853',CLAY],
+                                                  hovertemplate='%{y} %{x}<br>Avg sales $%{z:,.2f}<extra></extra>'))
+                    fig_hm.update_layout(title='Avg Sales per Slot', height=340, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                         xaxis_tickangle=-45, yaxis=dict(autorange='reversed'))
+                    return fig_hm
+                chart('hm', build_hm)
+            with col2:
+                def build_ht():
+                    fig_ht = go.Figure(go.Heatmap(z=hm_ticket, x=hm_x, y=DOW_ORDER, colorscale=[CREAM,'#5A6B3A'],
+                                                  hovertemplate='%{y} %{x}<br>Avg ticket $%{z:.2f}<extra></extra>'))
+                    fig_ht.update_layout(title='Avg Ticket per Slot', height=340, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                         xaxis_tickangle=-45, yaxis=dict(autorange='reversed'))
+                    return fig_ht
+                chart('ht', build_ht)
 
 # ══════════════════════════════════════════
 # TAB 3 — INVENTORY SPENDING
 # ══════════════════════════════════════════
-with tab3:
-    st.markdown('<div class="section-header">Inventory Spend Overview</div>', unsafe_allow_html=True)
-    rd_spend  = inv_df[inv_df['Vendor'] == 'Restaurant Depot']['Total_Price'].sum()
-    pfs_spend = inv_df[inv_df['Vendor'] == 'Performance Food Service']['Total_Price'].sum()
-
-    k1, k2, k3, k4, k5 = st.columns(5)
-    with k1:
-        st.markdown(f'<div class="kpi-card"><div class="kpi-label">Total Inv. Spend</div><div class="kpi-value">${total_inv:,.0f}</div><div class="kpi-sub">{inv_df["Category/Class"].nunique()} categories</div></div>', unsafe_allow_html=True)
-    with k2:
-        st.markdown(f'<div class="kpi-card gold"><div class="kpi-label">Restaurant Depot</div><div class="kpi-value">${rd_spend:,.0f}</div><div class="kpi-sub">{rd_spend/total_inv*100:.1f}% of total</div></div>', unsafe_allow_html=True)
-    with k3:
-        st.markdown(f'<div class="kpi-card olive"><div class="kpi-label">Perf. Food Service</div><div class="kpi-value">${pfs_spend:,.0f}</div><div class="kpi-sub">{pfs_spend/total_inv*100:.1f}% of total</div></div>', unsafe_allow_html=True)
-    with k4:
-        st.markdown(f'<div class="kpi-card danger"><div class="kpi-label">Protein Spend</div><div class="kpi-value">${total_protein:,.0f}</div><div class="kpi-sub">{protein_pct}% of inv. spend</div></div>', unsafe_allow_html=True)
-    with k5:
-        st.markdown(f'<div class="kpi-card"><div class="kpi-label">Unique Items</div><div class="kpi-value">{inv_df["Standard_Item_Name"].nunique()}</div></div>', unsafe_allow_html=True)
-
-    col1, col2 = st.columns(2)
-    with col1:
-        cat_spend = inv_df.groupby('Category/Class')['Total_Price'].sum().sort_values(ascending=False).reset_index()
-        fig_cat = px.pie(cat_spend, names='Category/Class', values='Total_Price',
-                         title='Spend by Category', hole=0.4,
-                         color_discrete_sequence=px.colors.sequential.Redor)
-        fig_cat.update_layout(height=380, paper_bgcolor=CREAM)
-        ink(fig_cat)
-        st.plotly_chart(fig_cat, use_container_width=True)
-    with col2:
-        top_items = inv_df.groupby('Standard_Item_Name')['Total_Price'].sum().sort_values(ascending=False).head(12).reset_index()
-        fig_items = px.bar(top_items, x='Total_Price', y='Standard_Item_Name', orientation='h',
-                           title='Top 12 Items by Spend',
-                           color='Total_Price', color_continuous_scale=['#E8C4B8','#C45C3A'])
-        fig_items.update_layout(height=380, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                                coloraxis_showscale=False, yaxis=dict(autorange='reversed'),
-                                xaxis=dict(tickprefix='$'))
-        ink(fig_items)
-        st.plotly_chart(fig_items, use_container_width=True)
-
-    st.markdown('<div class="section-header">Weekly Inventory Trend by Vendor</div>', unsafe_allow_html=True)
-    fig_wk = go.Figure()
-    for vendor, color in [('Restaurant Depot','#C45C3A'),('Performance Food Service','#D4A853')]:
-        vd = inv_df[inv_df['Vendor']==vendor].groupby(['week_label','week_start'])['Total_Price'].sum().reset_index().sort_values('week_start')
-        fig_wk.add_trace(go.Bar(x=vd['week_label'], y=vd['Total_Price'], name=vendor, marker_color=color))
-    fig_wk.update_layout(barmode='stack', height=320, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                         yaxis=dict(tickprefix='$'), legend=dict(orientation='h', y=1.1))
-    ink(fig_wk)
-    st.plotly_chart(fig_wk, use_container_width=True)
-
-    st.markdown('<div class="section-header">Category Drill-Down</div>', unsafe_allow_html=True)
-    sel_cat = st.selectbox("Select Category", sorted(inv_df['Category/Class'].unique()))
-    cat_df  = inv_df[inv_df['Category/Class'] == sel_cat]
-    col_a, col_b = st.columns(2)
-    with col_a:
-        subcat = cat_df.groupby('Subcategory')['Total_Price'].sum().sort_values(ascending=False).reset_index()
-        fig_sub = px.bar(subcat, x='Subcategory', y='Total_Price', title=f'{sel_cat} — by Subcategory',
-                         color='Total_Price', color_continuous_scale=['#E8C4B8','#C45C3A'])
-        fig_sub.update_layout(height=300, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                              coloraxis_showscale=False, yaxis=dict(tickprefix='$'))
-        ink(fig_sub)
-        st.plotly_chart(fig_sub, use_container_width=True)
-    with col_b:
-        items_cat = cat_df.groupby(['Standard_Item_Name','Vendor']).agg(
-            spend=('Total_Price','sum'), qty=('Qty','sum')
-        ).reset_index().sort_values('spend', ascending=False).head(10)
-        st.dataframe(items_cat.style.format({'spend':'${:,.2f}','qty':'{:,.1f}'}),
-                     use_container_width=True, hide_index=True)
+with tab3, timer('tab.inventory', tab3.open):
+    if tab3.open and tab_ready('inventory'):
+        st.markdown('<div class="section-header">Inventory Spend Overview</div>', unsafe_allow_html=True)
+        rd_spend, pfs_spend = agg['rd_spend'], agg['pfs_spend']
+
+        k1, k2, k3, k4, k5 = st.columns(5)
+        with k1:
+            st.markdown(f'<div class="kpi-card"><div class="kpi-label">Total Inv. Spend</div><div class="kpi-value">${total_inv:,.0f}</div><div class="kpi-sub">{agg["n_categories"]} categories</div></div>', unsafe_allow_html=True)
+        with k2:
+            st.markdown(f'<div class="kpi-card gold"><div class="kpi-label">Restaurant Depot</div><div class="kpi-value">${rd_spend:,.0f}</div><div class="kpi-sub">{rd_spend/total_inv*100:.1f}% of total</div></div>', unsafe_allow_html=True)
+        with k3:
+            st.markdown(f'<div class="kpi-card olive"><div class="kpi-label">Perf. Food Service</div><div class="kpi-value">${pfs_spend:,.0f}</div><div class="kpi-sub">{pfs_spend/total_inv*100:.1f}% of total</div></div>', unsafe_allow_html=True)
+        with k4:
+            st.markdown(f'<div class="kpi-card danger"><div class="kpi-label">Protein Spend</div><div class="kpi-value">${total_protein:,.0f}</div><div class="kpi-sub">{protein_pct}% of inv. spend</div></div>', unsafe_allow_html=True)
+        with k5:
+            st.markdown(f'<div class="kpi-card"><div class="kpi-label">Unique Items</div><div class="kpi-value">{agg["n_items"]}</div></div>', unsafe_allow_html=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            def build_cat():
+                fig_cat = px.pie(agg['cat_spend'], names='Category/Class', values='Total_Price',
+                                 title='Spend by Category', hole=0.4,
+                                 color_discrete_sequence=px.colors.sequential.Redor)
+                fig_cat.update_layout(height=380, paper_bgcolor=CREAM)
+                return fig_cat
+            chart('cat', build_cat)
+        with col2:
+            def build_items():
+                fig_items = px.bar(agg['top_items'], x='Total_Price', y='Standard_Item_Name', orientation='h',
+                                   title='Top 12 Items by Spend',
+                                   color='Total_Price', color_continuous_scale=['#E8C4B8','#C45C3A'])
+                fig_items.update_layout(height=380, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                        coloraxis_showscale=False, yaxis=dict(autorange='reversed'),
+                                        xaxis=dict(tickprefix='$'))
+                return fig_items
+            chart('items', build_items)
+
+        st.markdown('<div class="section-header">Weekly Inventory Trend by Vendor</div>', unsafe_allow_html=True)
+        def build_wk():
+            fig_wk  = go.Figure()
+            vendors = [('Restaurant Depot','#C45C3A'),('Performance Food Service','#D4A853')]
+            weekly  = nikos_store.vendor_weekly(invoice_db, [v for v, _ in vendors]) if invoice_db \
+                      else agg['vendor_weekly']
+            for vendor, color in vendors:
+                vd = weekly[weekly['Vendor'] == vendor]
+                fig_wk.add_trace(go.Bar(x=vd['week_label'], y=vd['Total_Price'], name=vendor, marker_color=color))
+            fig_wk.update_layout(barmode='stack', height=320, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                 yaxis=dict(tickprefix='$'), legend=dict(orientation='h', y=1.1))
+            return fig_wk
+        chart('wk', build_wk)
+
+        st.markdown('<div class="section-header">Category Drill-Down</div>', unsafe_allow_html=True)
+        category_drilldown()
+
+        st.markdown('<div class="section-header">📒 Item × Vendor Ledger</div>', unsafe_allow_html=True)
+        ledger_view()
 
 # ══════════════════════════════════════════
 # TAB 4 — FOOD COST & MARGINS
 # ══════════════════════════════════════════
-with tab4:
-    st.markdown('<div class="section-header">Food Cost % by Week</div>', unsafe_allow_html=True)
-    latest_fc = weekly['food_cost_pct'].iloc[-1]
-    # University contract dining benchmark is 35-42%, not 28-34% like independent restaurants
-    UNIV_BENCHMARK_LOW, UNIV_BENCHMARK_HIGH = 35, 42
-    if latest_fc > target_food_cost + 8:
-        st.markdown(f'<div class="alert-box alert-bad">🚨 <b>Latest week food cost is {latest_fc}% (vs net sales)</b> — {latest_fc - target_food_cost:.1f}pp above your {target_food_cost:.0f}% target. Note: your net sales are structurally compressed by Aramark/Sodexo contract discounts ({contract_disc_pct}% of gross). Review protein spend and portion sizes.</div>', unsafe_allow_html=True)
-    elif latest_fc > target_food_cost:
-        st.markdown(f'<div class="alert-box alert-warn">⚠️ <b>Food cost at {latest_fc}% (vs net sales)</b> — slightly above your {target_food_cost:.0f}% target. University contract benchmark is {UNIV_BENCHMARK_LOW}–{UNIV_BENCHMARK_HIGH}%.</div>', unsafe_allow_html=True)
-    else:
-        st.markdown(f'<div class="alert-box alert-good">✅ <b>Food cost at {latest_fc}% (vs net sales)</b> — within your {target_food_cost:.0f}% target. University contract dining benchmark: {UNIV_BENCHMARK_LOW}–{UNIV_BENCHMARK_HIGH}%.</div>', unsafe_allow_html=True)
-
-    col1, col2 = st.columns([3,2])
-    with col1:
-        fig_fc = go.Figure()
-        fig_fc.add_trace(go.Bar(x=weekly['week_label'], y=weekly['gross_before'],
-                                name='Gross Sales', marker_color='rgba(196,92,58,0.15)'))
-        fig_fc.add_trace(go.Bar(x=weekly['week_label'], y=weekly['net_sales'],
-                                name='Net Sales', marker_color='rgba(196,92,58,0.35)'))
-        fig_fc.add_trace(go.Bar(x=weekly['week_label'], y=weekly['inv_spend'],
-                                name='Inv. Spend', marker_color='#C45C3A'))
-        fig_fc.add_trace(go.Scatter(x=weekly['week_label'], y=weekly['food_cost_pct'],
-                                    name='Food Cost %', mode='lines+markers+text',
-                                    line=dict(color='#2B2420', width=2.5), marker=dict(size=10),
-                                    text=weekly['food_cost_pct'].map(lambda x: f'{x:.1f}%'),
-                                    textposition='top center', yaxis='y2'))
-        fig_fc.add_hline(y=target_food_cost, line_dash='dash', line_color='#27AE60',
-                         annotation_text=f'Target {target_food_cost:.0f}%',
-                         annotation_position='right', yref='y2')
-        fig_fc.update_layout(
-            barmode='overlay', height=400, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-            yaxis=dict(tickprefix='$', title='Dollars'),
-            yaxis2=dict(title='Food Cost %', overlaying='y', side='right',
-                        ticksuffix='%', showgrid=False, range=[0, weekly['food_cost_pct'].max()*1.3]),
-            legend=dict(orientation='h', y=1.12))
-        ink(fig_fc)
-        st.plotly_chart(fig_fc, use_container_width=True)
-    with col2:
-        st.markdown("**Weekly Margin Detail**")
-        margin_table = weekly[['week_label','gross_before','net_sales','discounts','inv_spend','food_cost_pct','gross_profit']].copy()
-        margin_table['fc_pct_gross'] = (margin_table['inv_spend'] / margin_table['gross_before'] * 100).round(1)
-        margin_table.columns = ['Week','Gross Sales','Net Sales','Aramark/Sodexo Disc.','Inv. Cost','FC% (Net)','Gross Profit','FC% (Gross)']
-        st.dataframe(
-            margin_table.style
-                .format({'Gross Sales':'${:,.0f}','Net Sales':'${:,.0f}','Aramark/Sodexo Disc.':'${:,.0f}',
-                         'Inv. Cost':'${:,.0f}','FC% (Net)':'{:.1f}%','Gross Profit':'${:,.0f}','FC% (Gross)':'{:.1f}%'}),
-            use_container_width=True, hide_index=True)
-
-    st.markdown('<div class="section-header">Net Profitability After All Fees</div>', unsafe_allow_html=True)
-    aramark_fee = total_sales * aramark_rate
-    cc_fee      = fin_df['credit_card'].sum() * cc_fee_rate
-    net_after   = total_sales - total_inv - aramark_fee - cc_fee
-    f1, f2, f3, f4, f5 = st.columns(5)
-    f1.metric("Gross Sales",              f"${total_gross:,.0f}")
-    f2.metric("Net Sales (after Aramark disc.)", f"${total_sales:,.0f}", f"-${total_discounts:,.0f} contract disc.", delta_color='inverse')
-    f3.metric("Aramark/Sodexo Commission",f"-${aramark_fee:,.0f}", f"{aramark_rate*100:.1f}% of net sales", delta_color='inverse')
-    f4.metric("CC Processing Fee",        f"-${cc_fee:,.0f}",      f"{cc_fee_rate*100:.1f}% of CC sales", delta_color='inverse')
-    f5.metric("Est. Net After All Fees",  f"${net_after:,.0f}",    f"{net_after/total_sales*100:.1f}% net margin")
-
-    st.markdown('<div class="section-header">🏛️ Contract Economics — Two Ways to Read Food Cost</div>', unsafe_allow_html=True)
-    st.markdown("""
-    <div class="alert-box alert-warn">
-    ℹ️ <b>University contract context:</b> Aramark/Sodexo sets your discount rate as part of the campus dining contract (meal plans, faculty/staff IDs, student discounts).
-    These are <b>not promotional discounts you control</b> — they are contract obligations. This means food cost % looks very different depending on which revenue base you use.
-    </div>
-    """, unsafe_allow_html=True)
-
-    ec1, ec2, ec3, ec4 = st.columns(4)
-    ec1.metric("Gross Sales",         f"${total_gross:,.0f}", "before contract discounts")
-    ec2.metric("Aramark/Sodexo Disc.",f"${total_discounts:,.0f}", f"{contract_disc_pct}% of gross — contract rate")
-    ec3.metric("FC% vs Net Sales",    f"{overall_fc_pct}%",  "kitchen operations view")
-    ec4.metric("FC% vs Gross Sales",  f"{overall_fc_pct_gross}%", "contract economics view")
-
-    # Side-by-side comparison chart
-    comparison_data = {
-        'View': ['FC% vs Net Sales\n(Operational)', 'FC% vs Gross Sales\n(Contract)'],
-        'FC%':  [overall_fc_pct, overall_fc_pct_gross],
-        'Color':['#C45C3A', '#2980B9']
-    }
-    fig_compare = go.Figure()
-    fig_compare.add_trace(go.Bar(
-        x=comparison_data['View'], y=comparison_data['FC%'],
-        marker_color=comparison_data['Color'],
-        text=[f"{v}%" for v in comparison_data['FC%']],
-        textposition='outside', width=0.4
-    ))
-    fig_compare.add_hline(y=38, line_dash='dash', line_color=CLAY,
-                          annotation_text='Univ. contract target ~38% (net view)')
-    fig_compare.add_hline(y=27, line_dash='dash', line_color='#2980B9',
-                          annotation_text='Univ. contract target ~27% (gross view)')
-    fig_compare.update_layout(
-        height=320, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-        yaxis=dict(ticksuffix='%', title='Food Cost %', range=[0, 70]),
-        title='Food Cost % — Operational View vs. Contract Economics View',
-        showlegend=False
-    )
-    ink(fig_compare)
-    st.plotly_chart(fig_compare, use_container_width=True)
-
-    st.markdown("""
-    <div style="background:#F0F4F8;border-radius:10px;padding:16px 20px;font-size:0.88rem;color:#2B2420;">
-    <b>Which number to use when:</b><br><br>
-    🔴 <b>FC% vs Net Sales ({fc_net}%)</b> — Use this for <b>kitchen management</b>: portion control, protein cost, waste reduction, ordering decisions. This is the true cost of running your kitchen against money actually received.<br><br>
-    🔵 <b>FC% vs Gross Sales ({fc_gross}%)</b> — Use this when <b>reporting to Aramark/Sodexo or the university</b> or evaluating your contract value. This shows performance against the full transaction volume before contract discounts are applied.<br><br>
-    ⚠️ <b>Never compare your FC% directly to an independent restaurant's benchmark</b> — their net and gross sales are nearly identical. Yours differ by {disc_pct}% due to the contract.
-    </div>
-    """.format(fc_net=overall_fc_pct, fc_gross=overall_fc_pct_gross, disc_pct=contract_disc_pct),
-    unsafe_allow_html=True)
-    cat_spend2 = inv_df.groupby('Category/Class')['Total_Price'].sum().sort_values(ascending=False).reset_index()
-    cat_spend2['% of Inv']       = (cat_spend2['Total_Price'] / total_inv    * 100).round(1)
-    cat_spend2['% of Net Sales'] = (cat_spend2['Total_Price'] / total_sales  * 100).round(1)
-    cat_spend2['% of Gross']     = (cat_spend2['Total_Price'] / total_gross  * 100).round(1)
-    fig_cat3 = go.Figure()
-    fig_cat3.add_trace(go.Bar(x=cat_spend2['Category/Class'], y=cat_spend2['% of Inv'],
-                              name='% of Inv. Spend', marker_color='#C45C3A'))
-    fig_cat3.add_trace(go.Bar(x=cat_spend2['Category/Class'], y=cat_spend2['% of Net Sales'],
-                              name='% of Net Sales', marker_color='#D4A853'))
-    fig_cat3.add_trace(go.Bar(x=cat_spend2['Category/Class'], y=cat_spend2['% of Gross'],
-                              name='% of Gross Sales', marker_color='#5A6B3A'))
-    fig_cat3.update_layout(barmode='group', height=360, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                           yaxis=dict(ticksuffix='%'), legend=dict(orientation='h', y=1.1))
-    ink(fig_cat3)
-    st.plotly_chart(fig_cat3, use_container_width=True)
+with tab4, timer('tab.food_cost', tab4.open):
+    if tab4.open and tab_ready('sales', 'inventory'):
+        st.markdown('<div class="section-header">Food Cost % by Week</div>', unsafe_allow_html=True)
+        latest_fc = kpi['latest_fc']
+        # University contract dining benchmark is 35-42%, not 28-34% like independent restaurants
+        UNIV_BENCHMARK_LOW, UNIV_BENCHMARK_HIGH = 35, 42
+        if kpi['fc_status'] == 'bad':
+            st.markdown(f'<div class="alert-box alert-bad">🚨 <b>Latest week food cost is {latest_fc}% (vs net sales)</b> — {latest_fc - target_food_cost:.1f}pp above your {target_food_cost:.0f}% target. Note: your net sales are structurally compressed by Aramark/Sodexo contract discounts ({contract_disc_pct}% of gross). Review protein spend and portion sizes.</div>', unsafe_allow_html=True)
+        elif kpi['fc_status'] == 'warn':
+            st.markdown(f'<div class="alert-box alert-warn">⚠️ <b>Food cost at {latest_fc}% (vs net sales)</b> — slightly above your {target_food_cost:.0f}% target. University contract benchmark is {UNIV_BENCHMARK_LOW}–{UNIV_BENCHMARK_HIGH}%.</div>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="alert-box alert-good">✅ <b>Food cost at {latest_fc}% (vs net sales)</b> — within your {target_food_cost:.0f}% target. University contract dining benchmark: {UNIV_BENCHMARK_LOW}–{UNIV_BENCHMARK_HIGH}%.</div>', unsafe_allow_html=True)
+
+        col1, col2 = st.columns([3,2])
+        with col1:
+            def build_fc():
+                fig_fc = go.Figure()
+                fig_fc.add_trace(go.Bar(x=weekly['week_label'], y=weekly['gross_before'],
+                                        name='Gross Sales', marker_color='rgba(196,92,58,0.15)'))
+                fig_fc.add_trace(go.Bar(x=weekly['week_label'], y=weekly['net_sales'],
+                                        name='Net Sales', marker_color='rgba(196,92,58,0.35)'))
+                fig_fc.add_trace(go.Bar(x=weekly['week_label'], y=weekly['inv_spend'],
+                                        name='Inv. Spend', marker_color='#C45C3A'))
+                fig_fc.add_trace(go.Scatter(x=weekly['week_label'], y=weekly['food_cost_pct'],
+                                            name='Food Cost %', mode='lines+markers+text',
+                                            line=dict(color='#2B2420', width=2.5), marker=dict(size=10),
+                                            text=weekly['food_cost_pct'].map(lambda x: f'{x:.1f}%'),
+                                            textposition='top center', yaxis='y2'))
+                fig_fc.add_hline(y=target_food_cost, line_dash='dash', line_color='#27AE60',
+                                 annotation_text=f'Target {target_food_cost:.0f}%',
+                                 annotation_position='right', yref='y2')
+                fig_fc.update_layout(
+                    barmode='overlay', height=400, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                    yaxis=dict(tickprefix='$', title='Dollars'),
+                    yaxis2=dict(title='Food Cost %', overlaying='y', side='right',
+                                ticksuffix='%', showgrid=False, range=[0, weekly['food_cost_pct'].max()*1.3]),
+                    legend=dict(orientation='h', y=1.12))
+                return fig_fc
+            chart('fc', build_fc, target_food_cost)
+        with col2:
+            st.markdown("**Weekly Margin Detail**")
+            margin_table = weekly[['week_label','gross_before','net_sales','discounts','inv_spend','food_cost_pct','gross_profit','fc_pct_gross']].copy()
+            margin_table.columns = ['Week','Gross Sales','Net Sales','Aramark/Sodexo Disc.','Inv. Cost','FC% (Net)','Gross Profit','FC% (Gross)']
+            table(margin_table, {'Gross Sales':'$%,.0f','Net Sales':'$%,.0f','Aramark/Sodexo Disc.':'$%,.0f',
+                                 'Inv. Cost':'$%,.0f','FC% (Net)':'%.1f%%','Gross Profit':'$%,.0f','FC% (Gross)':'%.1f%%'})
+
+        st.markdown('<div class="section-header">Net Profitability After All Fees</div>', unsafe_allow_html=True)
+        aramark_fee, cc_fee, net_after = kpi['aramark_fee'], kpi['cc_fee'], kpi['net_after']
+        f1, f2, f3, f4, f5 = st.columns(5)
+        f1.metric("Gross Sales",              f"${total_gross:,.0f}")
+        f2.metric("Net Sales (after Aramark disc.)", f"${total_sales:,.0f}", f"-${total_discounts:,.0f} contract disc.", delta_color='inverse')
+        f3.metric("Aramark/Sodexo Commission",f"-${aramark_fee:,.0f}", f"{aramark_rate*100:.1f}% of net sales", delta_color='inverse')
+        f4.metric("CC Processing Fee",        f"-${cc_fee:,.0f}",      f"{cc_fee_rate*100:.1f}% of CC sales", delta_color='inverse')
+        f5.metric("Est. Net After All Fees",  f"${net_after:,.0f}",    f"{net_after/total_sales*100:.1f}% net margin")
+
+        st.markdown('<div class="section-header">🏛️ Contract Economics — Two Ways to Read Food Cost</div>', unsafe_allow_html=True)
+        st.markdown("""
+        <div class="alert-box alert-warn">
+        ℹ️ <b>University contract context:</b> Aramark/Sodexo sets your discount rate as part of the campus dining contract (meal plans, faculty/staff IDs, student discounts).
+        These are <b>not promotional discounts you control</b> — they are contract obligations. This means food cost % looks very different depending on which revenue base you use.
+        </div>
+        """, unsafe_allow_html=True)
+
+        ec1, ec2, ec3, ec4 = st.columns(4)
+        ec1.metric("Gross Sales",         f"${total_gross:,.0f}", "before contract discounts")
+        ec2.metric("Aramark/Sodexo Disc.",f"${total_discounts:,.0f}", f"{contract_disc_pct}% of gross — contract rate")
+        ec3.metric("FC% vs Net Sales",    f"{overall_fc_pct}%",  "kitchen operations view")
+        ec4.metric("FC% vs Gross Sales",  f"{overall_fc_pct_gross}%", "contract economics view")
+
+        # Side-by-side comparison chart
+        comparison_data = {
+            'View': ['FC% vs Net Sales\n(Operational)', 'FC% vs Gross Sales\n(Contract)'],
+            'FC%':  [overall_fc_pct, overall_fc_pct_gross],
+            'Color':['#C45C3A', '#2980B9']
+        }
+        def build_compare():
+            fig_compare = go.Figure()
+            fig_compare.add_trace(go.Bar(
+                x=comparison_data['View'], y=comparison_data['FC%'],
+                marker_color=comparison_data['Color'],
+                text=[f"{v}%" for v in comparison_data['FC%']],
+                textposition='outside', width=0.4
+            ))
+            fig_compare.add_hline(y=38, line_dash='dash', line_color=CLAY,
+                                  annotation_text='Univ. contract target ~38% (net view)')
+            fig_compare.add_hline(y=27, line_dash='dash', line_color='#2980B9',
+                                  annotation_text='Univ. contract target ~27% (gross view)')
+            fig_compare.update_layout(
+                height=320, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                yaxis=dict(ticksuffix='%', title='Food Cost %', range=[0, 70]),
+                title='Food Cost % — Operational View vs. Contract Economics View',
+                showlegend=False
+            )
+            return fig_compare
+        chart('compare', build_compare)
+
+        st.markdown("""
+        <div style="background:#F0F4F8;border-radius:10px;padding:16px 20px;font-size:0.88rem;color:#2B2420;">
+        <b>Which number to use when:</b><br><br>
+        🔴 <b>FC% vs Net Sales ({fc_net}%)</b> — Use this for <b>kitchen management</b>: portion control, protein cost, waste reduction, ordering decisions. This is the true cost of running your kitchen against money actually received.<br><br>
+        🔵 <b>FC% vs Gross Sales ({fc_gross}%)</b> — Use this when <b>reporting to Aramark/Sodexo or the university</b> or evaluating your contract value. This shows performance against the full transaction volume before contract discounts are applied.<br><br>
+        ⚠️ <b>Never compare your FC% directly to an independent restaurant's benchmark</b> — their net and gross sales are nearly identical. Yours differ by {disc_pct}% due to the contract.
+        </div>
+        """.format(fc_net=overall_fc_pct, fc_gross=overall_fc_pct_gross, disc_pct=contract_disc_pct),
+        unsafe_allow_html=True)
+        cat_spend2 = agg['cat_spend']
+        def build_cat3():
+            fig_cat3 = go.Figure()
+            fig_cat3.add_trace(go.Bar(x=cat_spend2['Category/Class'], y=cat_spend2['% of Inv'],
+                                      name='% of Inv. Spend', marker_color='#C45C3A'))
+            fig_cat3.add_trace(go.Bar(x=cat_spend2['Category/Class'], y=cat_spend2['% of Net Sales'],
+                                      name='% of Net Sales', marker_color='#D4A853'))
+            fig_cat3.add_trace(go.Bar(x=cat_spend2['Category/Class'], y=cat_spend2['% of Gross'],
+                                      name='% of Gross Sales', marker_color='#5A6B3A'))
+            fig_cat3.update_layout(barmode='group', height=360, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                   yaxis=dict(ticksuffix='%'), legend=dict(orientation='h', y=1.1))
+            return fig_cat3
+        chart('cat3', build_cat3)
+
+        st.markdown('<div class="section-header">🧮 What-If Scenarios</div>', unsafe_allow_html=True)
+        st.caption("Every combination of two contract / cost settings at once — the ✕ marks the sidebar values.")
+        scenario_view()
 
 # ══════════════════════════════════════════
 # TAB 5 — OVERSTOCK & WASTE
 # ══════════════════════════════════════════
-with tab5:
-    st.markdown('<div class="section-header">Overstock & Understock Analysis</div>', unsafe_allow_html=True)
-    st.info("💡 Compares what you bought each week vs. a consistent ordering baseline. Weeks far above average signal overstock / waste risk.")
-
-    avg_wk_spend = weekly['inv_spend'].mean()
-    weekly['spend_vs_avg'] = ((weekly['inv_spend'] - avg_wk_spend) / avg_wk_spend * 100).round(1)
-    weekly['status'] = weekly['spend_vs_avg'].apply(
-        lambda x: '🔴 Over' if x > 20 else ('🟢 Normal' if x > -20 else '🟡 Under'))
-
-    fig_os = go.Figure()
-    os_colors = weekly['spend_vs_avg'].apply(lambda x: '#C0392B' if x > 20 else ('#27AE60' if x > -20 else '#D4A853'))
-    fig_os.add_trace(go.Bar(x=weekly['week_label'], y=weekly['spend_vs_avg'],
-                            marker_color=os_colors.tolist(),
-                            text=weekly['spend_vs_avg'].map(lambda x: f'{x:+.1f}%'),
-                            textposition='outside'))
-    fig_os.add_hline(y=0,   line_color=INK, line_width=1)
-    fig_os.add_hline(y=20,  line_dash='dash', line_color='#C0392B',  annotation_text='Overstock threshold')
-    fig_os.add_hline(y=-20, line_dash='dash', line_color='#D4A853', annotation_text='Understock threshold')
-    fig_os.update_layout(title='Weekly Spend vs. Average', height=320,
-                         plot_bgcolor=CREAM, paper_bgcolor=CREAM, yaxis=dict(ticksuffix='%'))
-    ink(fig_os)
-    st.plotly_chart(fig_os, use_container_width=True)
-
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown("**Weekly Purchasing Status**")
-        status_table = weekly[['week_label','inv_spend','spend_vs_avg','status','gross_before','net_sales']].copy()
-        status_table.columns = ['Week','Inv. Spend','vs Avg %','Status','Gross Sales','Net Sales']
-        st.dataframe(status_table.style.format(
-            {'Inv. Spend':'${:,.0f}','vs Avg %':'{:+.1f}%','Gross Sales':'${:,.0f}','Net Sales':'${:,.0f}'}),
-            use_container_width=True, hide_index=True)
-    with col2:
-        st.markdown("**Waste Risk by Week**")
-        weekly['spend_per_sales'] = (weekly['inv_spend'] / weekly['net_sales'] * 100).round(1)
-        for _, row in weekly.iterrows():
-            ratio = row['spend_per_sales']
-            color = 'alert-bad' if ratio > target_food_cost+15 else ('alert-warn' if ratio > target_food_cost else 'alert-good')
-            icon  = '🚨' if ratio > target_food_cost+15 else ('⚠️' if ratio > target_food_cost else '✅')
-            st.markdown(
-                f'<div class="alert-box {color}">{icon} <b>{row["week_label"]}:</b> {ratio}% food cost '
-                f'— gross ${row["gross_before"]:,.0f} / net ${row["net_sales"]:,.0f} / inv ${row["inv_spend"]:,.0f}</div>',
-                unsafe_allow_html=True)
-
-    st.markdown('<div class="section-header">Purchasing Consistency by Category</div>', unsafe_allow_html=True)
-    cat_weekly2 = inv_df.groupby(['week_label','week_start','Category/Class'])['Total_Price'].sum().reset_index()
-    cat_avg2    = cat_weekly2.groupby('Category/Class')['Total_Price'].mean().reset_index(); cat_avg2.columns = ['Category','Avg Weekly Spend']
-    cat_std2    = cat_weekly2.groupby('Category/Class')['Total_Price'].std().fillna(0).reset_index(); cat_std2.columns = ['Category','Std Dev']
-    cat_stats   = cat_avg2.merge(cat_std2, on='Category')
-    cat_stats['CV %'] = (cat_stats['Std Dev'] / cat_stats['Avg Weekly Spend'] * 100).round(1)
-    cat_stats['Risk'] = cat_stats['CV %'].apply(lambda x: '🔴 High' if x > 50 else ('🟡 Moderate' if x > 25 else '🟢 Consistent'))
-    st.dataframe(
-        cat_stats.sort_values('CV %', ascending=False)
-            .style.format({'Avg Weekly Spend':'${:,.0f}','Std Dev':'${:,.0f}','CV %':'{:.1f}%'}),
-        use_container_width=True, hide_index=True)
-
-    st.markdown('<div class="section-header">High-Volume Perishables — Spoilage Watch</div>', unsafe_allow_html=True)
-    perishable_cats = ['PRODUCE','DAIRY PROD & SUBS','PROTEIN','SEAFOOD','GROCERY REFRIGERATED']
-    p_items = inv_df[inv_df['Category/Class'].isin(perishable_cats)].groupby(
-        ['Standard_Item_Name','Category/Class']
-    ).agg(total_spend=('Total_Price','sum'), total_qty=('Qty','sum'), orders=('Invoice_No','nunique')).reset_index()
-    p_items = p_items.sort_values('total_spend', ascending=False).head(15)
-    fig_perish = px.scatter(p_items, x='total_qty', y='total_spend', size='orders',
-                            color='Category/Class', hover_name='Standard_Item_Name',
-                            title='Perishable Items — Spend vs. Quantity (bubble = # of orders)',
-                            color_discrete_sequence=['#C45C3A','#D4A853','#5A6B3A','#8B3A22','#2B2420'])
-    fig_perish.update_layout(height=380, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                             xaxis_title='Total Qty Ordered', yaxis=dict(tickprefix='$'))
-    ink(fig_perish)
-    st.plotly_chart(fig_perish, use_container_width=True)
+with tab5, timer('tab.overstock', tab5.open):
+    if tab5.open and tab_ready('sales', 'inventory'):
+        st.markdown('<div class="section-header">Overstock & Understock Analysis</div>', unsafe_allow_html=True)
+        st.info("💡 Compares what you bought each week vs. a consistent ordering baseline. Weeks far above average signal overstock / waste risk.")
+
+        def build_os():
+            fig_os = go.Figure()
+            os_colors = np.select([weekly['spend_vs_avg'] > 20, weekly['spend_vs_avg'] > -20], ['#C0392B', '#27AE60'], '#D4A853')
+            fig_os.add_trace(go.Bar(x=weekly['week_label'], y=weekly['spend_vs_avg'],
+                                    marker_color=os_colors,
+                                    text=weekly['spend_vs_avg'].map(lambda x: f'{x:+.1f}%'),
+                                    textposition='outside'))
+            fig_os.add_hline(y=0,   line_color=INK, line_width=1)
+            fig_os.add_hline(y=20,  line_dash='dash', line_color='#C0392B',  annotation_text='Overstock threshold')
+            fig_os.add_hline(y=-20, line_dash='dash', line_color='#D4A853', annotation_text='Understock threshold')
+            fig_os.update_layout(title='Weekly Spend vs. Average', height=320,
+                                 plot_bgcolor=CREAM, paper_bgcolor=CREAM, yaxis=dict(ticksuffix='%'))
+            return fig_os
+        chart('os', build_os)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Weekly Purchasing Status**")
+            status_table = weekly[['week_label','inv_spend','spend_vs_avg','status','gross_before','net_sales']].copy()
+            status_table.columns = ['Week','Inv. Spend','vs Avg %','Status','Gross Sales','Net Sales']
+            table(status_table, {'Inv. Spend':'$%,.0f','vs Avg %':'%+.1f%%','Gross Sales':'$%,.0f','Net Sales':'$%,.0f'})
+        with col2:
+            st.markdown("**Waste Risk by Week**")
+            for _, row in weekly.iterrows():
+                ratio = row['spend_per_sales']
+                color = 'alert-bad' if ratio > target_food_cost+15 else ('alert-warn' if ratio > target_food_cost else 'alert-good')
+                icon  = '🚨' if ratio > target_food_cost+15 else ('⚠️' if ratio > target_food_cost else '✅')
+                st.markdown(
+                    f'<div class="alert-box {color}">{icon} <b>{row["week_label"]}:</b> {ratio}% food cost '
+                    f'— gross ${row["gross_before"]:,.0f} / net ${row["net_sales"]:,.0f} / inv ${row["inv_spend"]:,.0f}</div>',
+                    unsafe_allow_html=True)
+
+        st.markdown('<div class="section-header">Purchasing Consistency by Category</div>', unsafe_allow_html=True)
+        table(agg['cat_stats'], {'Avg Weekly Spend':'$%,.0f','Std Dev':'$%,.0f','CV %':'%.1f%%'})
+
+        st.markdown('<div class="section-header">High-Volume Perishables — Spoilage Watch</div>', unsafe_allow_html=True)
+        def build_perish():
+            fig_perish = px.scatter(agg['perishables'], x='total_qty', y='total_spend', size='orders',
+                                    color='Category/Class', hover_name='Standard_Item_Name',
+                                    title='Perishable Items — Spend vs. Quantity (bubble = # of orders)',
+                                    color_discrete_sequence=['#C45C3A','#D4A853','#5A6B3A','#8B3A22','#2B2420'])
+            fig_perish.update_layout(height=380, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                     xaxis_title='Total Qty Ordered', yaxis=dict(tickprefix='$'))
+            return fig_perish
+        chart('perish', build_perish)
 
 # ══════════════════════════════════════════
 # TAB 6 — ALERTS & RECOVERY
 # ══════════════════════════════════════════
-with tab6:
-
-    # ── PROTEIN COST ALERT ───────────────────────
-    st.markdown('<div class="section-header">🥩 Protein Cost Alert</div>', unsafe_allow_html=True)
-
-    beef_spend = inv_df[inv_df['Standard_Item_Name']=='Beef']['Total_Price'].sum()
-    lamb_spend = inv_df[inv_df['Standard_Item_Name']=='Lamb']['Total_Price'].sum()
-    avg_protein_weekly = protein_weekly['Total_Price'].mean()
-    latest_protein_pct = protein_weekly['pct_of_inv'].iloc[-1] if not protein_weekly.empty else 0
-
-    p1, p2, p3, p4 = st.columns(4)
-    with p1:
-        st.markdown(f'<div class="protein-card"><div class="kpi-label">Total Protein Spend</div><div class="kpi-value">${total_protein:,.0f}</div><div class="kpi-sub">{protein_pct}% of all inventory</div></div>', unsafe_allow_html=True)
-    with p2:
-        st.markdown(f'<div class="protein-card"><div class="kpi-label">Avg Weekly Protein</div><div class="kpi-value">${avg_protein_weekly:,.0f}</div><div class="kpi-sub">per week</div></div>', unsafe_allow_html=True)
-    with p3:
-        alert_color = "danger" if protein_pct > protein_alert_pct else "olive"
-        st.markdown(f'<div class="kpi-card {alert_color}"><div class="kpi-label">Latest Week Protein %</div><div class="kpi-value">{latest_protein_pct:.1f}%</div><div class="kpi-sub">Alert threshold: {protein_alert_pct:.0f}%</div></div>', unsafe_allow_html=True)
-    with p4:
-        st.markdown(f'<div class="kpi-card danger"><div class="kpi-label">Beef + Lamb Alone</div><div class="kpi-value">${beef_spend+lamb_spend:,.0f}</div><div class="kpi-sub">{(beef_spend+lamb_spend)/total_protein*100:.0f}% of protein budget</div></div>', unsafe_allow_html=True)
-
-    if protein_pct > protein_alert_pct:
-        st.markdown(f'<div class="alert-box alert-bad">🚨 <b>Protein is {protein_pct}% of total inventory spend</b> — above your {protein_alert_pct:.0f}% alert threshold. Beef (${beef_spend:,.0f}) and Lamb (${lamb_spend:,.0f}) are the top drivers. Consider menu pricing review or supplier negotiation.</div>', unsafe_allow_html=True)
-    else:
-        st.markdown(f'<div class="alert-box alert-good">✅ <b>Protein at {protein_pct}% of inventory spend</b> — within your {protein_alert_pct:.0f}% threshold.</div>', unsafe_allow_html=True)
-
-    col1, col2 = st.columns(2)
-    with col1:
-        fig_prot = go.Figure()
-        fig_prot.add_trace(go.Bar(x=protein_weekly['week_label'], y=protein_weekly['Total_Price'],
-                                  name='Protein Spend', marker_color='#8B3A22'))
-        fig_prot.add_hline(y=avg_protein_weekly, line_dash='dash', line_color=CLAY,
-                           annotation_text=f'Avg ${avg_protein_weekly:,.0f}')
-        fig_prot.update_layout(title='Weekly Protein Spend', height=300,
-                               plot_bgcolor=CREAM, paper_bgcolor=CREAM, yaxis=dict(tickprefix='$'))
-        ink(fig_prot)
-        st.plotly_chart(fig_prot, use_container_width=True)
-    with col2:
-        prot_items = protein_df.groupby('Standard_Item_Name')['Total_Price'].sum().sort_values(ascending=False).reset_index()
-        fig_pi = px.pie(prot_items, names='Standard_Item_Name', values='Total_Price',
-                        title='Protein Spend by Item', hole=0.35,
-                        color_discrete_sequence=['#8B3A22','#C45C3A','#D4A853','#E8C4B8','#5A6B3A','#2B2420','#8C7B72','#BDC3C7'])
-        fig_pi.update_layout(height=300, paper_bgcolor=CREAM)
-        ink(fig_pi)
-        st.plotly_chart(fig_pi, use_container_width=True)
-
-    # Price trend for top proteins
-    prot_price   = protein_df.groupby(['Standard_Item_Name','Invoice_Date']).agg(unit_price=('Unit_Price','mean')).reset_index().sort_values('Invoice_Date')
-    top_proteins = prot_items['Standard_Item_Name'].head(4).tolist()
-    if top_proteins:
-        st.markdown("**Unit Price Trend — Top Protein Items** (watch for supplier price creep)")
-        fig_pp = go.Figure()
-        for i, item in enumerate(['#8B3A22','#C45C3A','#D4A853','#5A6B3A']):
-            if i >= len(top_proteins): break
-            name = top_proteins[i]
-            d = prot_price[prot_price['Standard_Item_Name'] == name]
-            if len(d) > 1:
-                fig_pp.add_trace(go.Scatter(x=d['Invoice_Date'], y=d['unit_price'],
-                                            name=name, mode='lines+markers',
-                                            line=dict(color=item, width=2), marker=dict(size=7)))
-        fig_pp.update_layout(height=280, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
-                             yaxis=dict(tickprefix='$', title='Unit Price'),
-                             legend=dict(orientation='h', y=1.1))
-        ink(fig_pp)
-        st.plotly_chart(fig_pp, use_container_width=True)
-
-    st.markdown("---")
-
-    # ── SLOW DAY RECOVERY SUGGESTIONS ───────────────
-    st.markdown('<div class="section-header">🐌 Slow Day Recovery Suggestions</div>', unsafe_allow_html=True)
-    st.markdown("Data-driven strategies for your 3 slowest days. Note: discount rates reflect Aramark/Sodexo contract terms and are not levers you can pull.")
-
-    slow_days_ranked = dow_stats.dropna(subset=['avg_net']).sort_values('avg_net')
-
-    for _, day_row in slow_days_ranked.head(3).iterrows():
-        day         = day_row['Day']
-        avg_net     = day_row['avg_net']
-        avg_gross   = day_row['avg_gross']
-        avg_disc    = day_row['avg_disc']
-        gap_to_be   = avg_net - daily_fixed_cost
-        gap_to_best = dow_stats['avg_net'].max() - avg_net
-
-        suggestions = []
-
-        # Contract context — don't suggest changing discounts
-        suggestions.append(f"ℹ️ The {avg_disc:.1f}% discount rate on {day}s is set by your Aramark/Sodexo contract — focus on increasing <b>transaction volume</b>, not discount depth.")
-
-        # University-specific traffic levers
-        if day in ['Sunday','Saturday']:
-            suggestions.append("📣 Weekend foot traffic on a university campus drops when students leave. Consider promoting to local community, faculty families, or campus event attendees.")
-            suggestions.append("🍽️ Offer a weekend-only menu item or combo exclusive to Saturday/Sunday — creates a reason to visit even with a lighter campus population.")
-        if day in ['Monday']:
-            suggestions.append("📚 Monday is often a recovery day after the weekend. Target early lunch through campus digital boards or email blasts before 10am.")
-        if day in ['Tuesday']:
-            suggestions.append("🎯 Tuesday tends to be mid-week low — consider coordinating with campus student orgs or clubs for group orders or catering pickups on this day.")
-        if day == 'Friday':
-            suggestions.append("🕐 Fridays often see a lunch rush then a sharp afternoon drop as students leave campus. Maximize the lunch window — fast service and visible specials board matter most.")
-            suggestions.append("📦 Consider a 'grab and go for the weekend' bundle on Fridays — students leaving for the weekend may buy extra if prompted.")
-
-        # Credit card vs meal plan context
-        suggestions.append(f"💳 Credit card transactions (full price, no Aramark discount) are your highest-margin sales. Find ways to attract off-campus visitors or faculty on {day}s who pay by card.")
-
-        # Break-even and inventory sizing
-        if gap_to_be < 0:
-            suggestions.append(f"🚨 This day averages ${abs(gap_to_be):,.0f} <b>below break-even</b>. Right-sizing staffing and prep quantities on {day}s is the most direct lever you have.")
+with tab6, timer('tab.alerts', tab6.open):
+    if tab6.open and tab_ready('sales', 'inventory'):
+
+        # ── PROTEIN COST ALERT ───────────────────────
+        st.markdown('<div class="section-header">🥩 Protein Cost Alert</div>', unsafe_allow_html=True)
+
+        beef_spend, lamb_spend = agg['beef_spend'], agg['lamb_spend']
+        avg_protein_weekly     = agg['avg_protein_weekly']
+        latest_protein_pct     = agg['latest_protein_pct']
+
+        p1, p2, p3, p4 = st.columns(4)
+        with p1:
+            st.markdown(f'<div class="protein-card"><div class="kpi-label">Total Protein Spend</div><div class="kpi-value">${total_protein:,.0f}</div><div class="kpi-sub">{protein_pct}% of all inventory</div></div>', unsafe_allow_html=True)
+        with p2:
+            st.markdown(f'<div class="protein-card"><div class="kpi-label">Avg Weekly Protein</div><div class="kpi-value">${avg_protein_weekly:,.0f}</div><div class="kpi-sub">per week</div></div>', unsafe_allow_html=True)
+        with p3:
+            alert_color = "danger" if kpi['protein_alert'] else "olive"
+            st.markdown(f'<div class="kpi-card {alert_color}"><div class="kpi-label">Latest Week Protein %</div><div class="kpi-value">{latest_protein_pct:.1f}%</div><div class="kpi-sub">Alert threshold: {protein_alert_pct:.0f}%</div></div>', unsafe_allow_html=True)
+        with p4:
+            st.markdown(f'<div class="kpi-card danger"><div class="kpi-label">Beef + Lamb Alone</div><div class="kpi-value">${beef_spend+lamb_spend:,.0f}</div><div class="kpi-sub">{(beef_spend+lamb_spend)/total_protein*100:.0f}% of protein budget</div></div>', unsafe_allow_html=True)
+
+        if kpi['protein_alert']:
+            st.markdown(f'<div class="alert-box alert-bad">🚨 <b>Protein is {protein_pct}% of total inventory spend</b> — above your {protein_alert_pct:.0f}% alert threshold. Beef (${beef_spend:,.0f}) and Lamb (${lamb_spend:,.0f}) are the top drivers. Consider menu pricing review or supplier negotiation.</div>', unsafe_allow_html=True)
         else:
-            suggestions.append(f"✅ Clears break-even by ${gap_to_be:,.0f} on average, but still has ${gap_to_best:,.0f} of upside vs. your best day ({dow_stats.loc[dow_stats['avg_net'].idxmax(),'Day']}).")
-
-        suggestions.append(f"📦 Scale your inventory ordering down for {day}s — over-prepping for low-volume days directly inflates food cost % and waste risk.")
-
-        sugg_html = "".join([f"<li style='margin:6px 0;'>{s}</li>" for s in suggestions])
-        st.markdown(f"""
-        <div style="background:white;border-radius:14px;padding:20px 24px;
-                    border-left:5px solid #D4A853;box-shadow:0 2px 12px rgba(0,0,0,0.06);margin-bottom:16px;">
-          <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:12px;">
-            <div>
-              <span style="font-family:'Playfair Display',serif;font-size:1.2rem;color:#C45C3A;font-weight:700;">{day}</span>
-              <span style="color:#8C7B72;font-size:0.85rem;margin-left:12px;">
-                Avg Gross: <b>${avg_gross:,.0f}</b> &nbsp;|&nbsp; Avg Net: <b>${avg_net:,.0f}</b> &nbsp;|&nbsp;
-                Contract Disc: <b>{avg_disc:.1f}%</b> (Aramark/Sodexo)
-              </span>
-            </div>
-            <div style="background:#FAF6F0;border-radius:8px;padding:6px 14px;font-size:0.85rem;">
-              {'🔴 Below break-even' if gap_to_be < 0 else f'🟢 +${gap_to_be:,.0f} above break-even'}
+            st.markdown(f'<div class="alert-box alert-good">✅ <b>Protein at {protein_pct}% of inventory spend</b> — within your {protein_alert_pct:.0f}% threshold.</div>', unsafe_allow_html=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            def build_prot():
+                fig_prot = go.Figure()
+                fig_prot.add_trace(go.Bar(x=protein_weekly['week_label'], y=protein_weekly['Total_Price'],
+                                          name='Protein Spend', marker_color='#8B3A22'))
+                fig_prot.add_hline(y=avg_protein_weekly, line_dash='dash', line_color=CLAY,
+                                   annotation_text=f'Avg ${avg_protein_weekly:,.0f}')
+                fig_prot.update_layout(title='Weekly Protein Spend', height=300,
+                                       plot_bgcolor=CREAM, paper_bgcolor=CREAM, yaxis=dict(tickprefix='$'))
+                return fig_prot
+            chart('prot', build_prot)
+        with col2:
+            prot_items = agg['prot_items']
+            def build_pi():
+                fig_pi = px.pie(prot_items, names='Standard_Item_Name', values='Total_Price',
+                                title='Protein Spend by Item', hole=0.35,
+                                color_discrete_sequence=['#8B3A22','#C45C3A','#D4A853','#E8C4B8','#5A6B3A','#2B2420','#8C7B72','#BDC3C7'])
+                fig_pi.update_layout(height=300, paper_bgcolor=CREAM)
+                return fig_pi
+            chart('pi', build_pi)
+
+        # Price trend for top proteins
+        top_proteins = agg['prot_items']['Standard_Item_Name'].head(4).tolist()
+        if top_proteins:
+            st.markdown("**Unit Price Trend — Top Protein Items** (watch for supplier price creep)")
+            def build_pp():
+                fig_pp     = go.Figure()
+                prot_price = nikos_store.item_prices(invoice_db, top_proteins, 'PROTEIN') if invoice_db \
+                             else agg['prot_price']
+                for i, item in enumerate(['#8B3A22','#C45C3A','#D4A853','#5A6B3A']):
+                    if i >= len(top_proteins): break
+                    name = top_proteins[i]
+                    d, _, _ = trend_frame(prot_price[prot_price['Standard_Item_Name'] == name], 'Invoice_Date',
+                                          ['unit_price'], trend_days, trend_grain)
+                    if len(d) > 1:
+                        fig_pp.add_trace(scatter(len(d))(x=d['Invoice_Date'], y=d['unit_price'],
+                                                         name=name, mode='lines+markers',
+                                                         line=dict(color=item, width=2), marker=dict(size=7)))
+                fig_pp.update_layout(height=280, plot_bgcolor=CREAM, paper_bgcolor=CREAM,
+                                     yaxis=dict(tickprefix='$', title='Unit Price'),
+                                     legend=dict(orientation='h', y=1.1))
+                return fig_pp
+            chart('pp', build_pp, trend_days, trend_grain)
+
+        # ── PRICE CREEP ─────────────────────────────
+        st.markdown('<div class="section-header">💸 Price Creep — Every Item × Vendor</div>', unsafe_allow_html=True)
+        st.caption(f"Each item's latest unit price vs. the average of its previous {CREEP_BASELINE} purchases from the same vendor. "
+                   f"🔴 Creep = at least {CREEP_Z:g}σ and 5% above baseline. Pick a row to see its price history.")
+        price_creep_view()
+
+        st.markdown("---")
+
+        # ── SLOW DAY RECOVERY SUGGESTIONS ───────────────
+        st.markdown('<div class="section-header">🐌 Slow Day Recovery Suggestions</div>', unsafe_allow_html=True)
+        st.markdown("Data-driven strategies for your 3 slowest days. Note: discount rates reflect Aramark/Sodexo contract terms and are not levers you can pull.")
+
+        for _, day_row in kpi['slow_days'].iterrows():
+            day         = day_row['Day']
+            avg_net     = day_row['avg_net']
+            avg_gross   = day_row['avg_gross']
+            avg_disc    = day_row['avg_disc']
+            gap_to_be   = day_row['gap_to_be']
+            gap_to_best = day_row['gap_to_best']
+
+            suggestions = []
+
+            # Contract context — don't suggest changing discounts
+            suggestions.append(f"ℹ️ The {avg_disc:.1f}% discount rate on {day}s is set by your Aramark/Sodexo contract — focus on increasing <b>transaction volume</b>, not discount depth.")
+
+            # University-specific traffic levers
+            if day in ['Sunday','Saturday']:
+                suggestions.append("📣 Weekend foot traffic on a university campus drops when students leave. Consider promoting to local community, faculty families, or campus event attendees.")
+                suggestions.append("🍽️ Offer a weekend-only menu item or combo exclusive to Saturday/Sunday — creates a reason to visit even with a lighter campus population.")
+            if day in ['Monday']:
+                suggestions.append("📚 Monday is often a recovery day after the weekend. Target early lunch through campus digital boards or email blasts before 10am.")
+            if day in ['Tuesday']:
+                suggestions.append("🎯 Tuesday tends to be mid-week low — consider coordinating with campus student orgs or clubs for group orders or catering pickups on this day.")
+            if day == 'Friday':
+                suggestions.append("🕐 Fridays often see a lunch rush then a sharp afternoon drop as students leave campus. Maximize the lunch window — fast service and visible specials board matter most.")
+                suggestions.append("📦 Consider a 'grab and go for the weekend' bundle on Fridays — students leaving for the weekend may buy extra if prompted.")
+
+            # Credit card vs meal plan context
+            suggestions.append(f"💳 Credit card transactions (full price, no Aramark discount) are your highest-margin sales. Find ways to attract off-campus visitors or faculty on {day}s who pay by card.")
+
+            # Break-even and inventory sizing
+            if gap_to_be < 0:
+                suggestions.append(f"🚨 This day averages ${abs(gap_to_be):,.0f} <b>below break-even</b>. Right-sizing staffing and prep quantities on {day}s is the most direct lever you have.")
+            else:
+                suggestions.append(f"✅ Clears break-even by ${gap_to_be:,.0f} on average, but still has ${gap_to_best:,.0f} of upside vs. your best day ({kpi['best_day']}).")
+
+            suggestions.append(f"📦 Scale your inventory ordering down for {day}s — over-prepping for low-volume days directly inflates food cost % and waste risk.")
+
+            sugg_html = "".join([f"<li style='margin:6px 0;'>{s}</li>" for s in suggestions])
+            st.markdown(f"""
+            <div style="background:white;border-radius:14px;padding:20px 24px;
+                        border-left:5px solid #D4A853;box-shadow:0 2px 12px rgba(0,0,0,0.06);margin-bottom:16px;">
+              <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:12px;">
+                <div>
+                  <span style="font-family:'Playfair Display',serif;font-size:1.2rem;color:#C45C3A;font-weight:700;">{day}</span>
+                  <span style="color:#8C7B72;font-size:0.85rem;margin-left:12px;">
+                    Avg Gross: <b>${avg_gross:,.0f}</b> &nbsp;|&nbsp; Avg Net: <b>${avg_net:,.0f}</b> &nbsp;|&nbsp;
+                    Contract Disc: <b>{avg_disc:.1f}%</b> (Aramark/Sodexo)
+                  </span>
+                </div>
+                <div style="background:#FAF6F0;border-radius:8px;padding:6px 14px;font-size:0.85rem;">
+                  {'🔴 Below break-even' if gap_to_be < 0 else f'🟢 +${gap_to_be:,.0f} above break-even'}
+                </div>
+              </div>
+              <ul style="margin:0;padding-left:18px;color:#2B2420;font-size:0.9rem;">{sugg_html}</ul>
             </div>
-          </div>
-          <ul style="margin:0;padding-left:18px;color:#2B2420;font-size:0.9rem;">{sugg_html}</ul>
-        </div>
-        """, unsafe_allow_html=True)
+            """, unsafe_allow_html=True)
 
-    st.markdown('<div class="section-header">📋 All Days — Performance vs Break-Even</div>', unsafe_allow_html=True)
-    be_summary = dow_stats[['Day','avg_gross','avg_net','avg_disc','count']].copy()
-    be_summary['vs_break_even'] = be_summary['avg_net'] - daily_fixed_cost
-    be_summary['status'] = be_summary['vs_break_even'].apply(
-        lambda x: '🔴 Below BE' if x < 0 else ('🟡 Near BE' if x < 200 else '🟢 Above BE'))
-    be_summary.columns = ['Day','Avg Gross','Avg Net','Contract Disc % (Aramark)','# Days Observed','vs Break-Even','Status']
-    st.dataframe(
-        be_summary.style
-            .format({'Avg Gross':'${:,.0f}','Avg Net':'${:,.0f}','Contract Disc % (Aramark)':'{:.1f}%','vs Break-Even':'${:+,.0f}'}),
-        use_container_width=True, hide_index=True)
+        st.markdown('<div class="section-header">📋 All Days — Performance vs Break-Even</div>', unsafe_allow_html=True)
+        be_summary = kpi['be_summary'].copy()
+        be_summary.columns = ['Day','Avg Gross','Avg Net','Contract Disc % (Aramark)','# Days Observed','vs Break-Even','Status']
+        table(be_summary, {'Avg Gross':'$%,.0f','Avg Net':'$%,.0f','Contract Disc % (Aramark)':'%.1f%%','vs Break-Even':'$%+,.0f'})
 
 # ─────────────────────────────────────────
 # FOOTER
@@ -1114,3 +1410,31 @@ st.markdown(
     "Thu–Wed week cycle"
     "</div>",
     unsafe_allow_html=True)
+
+# ─────────────────────────────────────────
+# PERFORMANCE PANEL
+# ─────────────────────────────────────────
+if perf_run is not None or profiler is not None or late is not None:
+    total = nikos_perf.end_run()
+    with perf_panel:
+        if perf_run is not None:
+            st.caption(f"Last full rerun: {total * 1000:,.0f} ms")
+            st.dataframe(pd.DataFrame(perf_run['stages'], columns=['Stage','Seconds'])
+                           .assign(ms=lambda d: (d['Seconds'] * 1000).round(1))[['Stage','ms']],
+                         width='stretch', hide_index=True)
+            frames = {'sales': fin_df, 'slots': slots_df}
+            if not snapshot_dir and 'inventory' not in load_errors:
+                frames['inventory'] = load_inventory(inv_path, inv_version, history_days)
+            st.caption("Loaded frames (MB, uncompacted → as loaded)")
+            st.dataframe(memory_report(frames), width='stretch', hide_index=True)
+            st.caption("Shared dataset cache (all sessions)")
+            st.dataframe(pd.DataFrame([dataset_cache().stats()]), width='stretch', hide_index=True)
+        if profiler is not None:
+            st.session_state.pop('perf_profiler', None)
+            report, raw = nikos_perf.profile_report(profiler)
+            st.download_button("Download .pstats", raw, file_name='nikos_rerun.pstats')
+            st.code(report, language=None)
+        if late is not None:
+            st.caption("Profile of the previous rerun, which stopped early")
+            st.download_button("Download .pstats", late[1], file_name='nikos_stopped_rerun.pstats')
+            st.code(late[0], language=None)
@@ -7,25 +7,24 @@
 
 set -e  # stop on any error
 
+SALES_XLSX="/Users/mayurpatil/Downloads/NIKOS_2026/Sales_data/Combined_reports/combined_sales_data.xlsx"
+INV_XLSX="/Users/mayurpatil/Downloads/NIKOS_2026/order_data/COMBINED_Master_Analysis.xlsx"
+
 echo ""
 echo "🥙 Nikos Cafe — Data Update"
 echo "─────────────────────────────"
 
-echo "📂 Copying latest Excel files into data/ ..."
-
-cp "/Users/mayurpatil/Downloads/NIKOS_2026/Sales_data/Combined_reports/combined_sales_data.xlsx" \
-   "$(dirname "$0")/data/combined_sales_data.xlsx"
+cd "$(dirname "$0")"
 
-cp "/Users/mayurpatil/Downloads/NIKOS_2026/order_data/COMBINED_Master_Analysis.xlsx" \
-   "$(dirname "$0")/data/COMBINED_Master_Analysis.xlsx"
+# Only new days / changed weeks become new Parquet files — the workbooks themselves stay out of git
+echo "📂 Appending new partitions to data/parts/ ..."
+python3 nikos_partitions.py --sales "$SALES_XLSX" --inventory "$INV_XLSX" --out data/parts
 
-echo "✅ Files copied."
 echo ""
 echo "📤 Pushing to GitHub..."
 
-cd "$(dirname "$0")"
-git add data/
-git diff --cached --quiet && echo "⚠️  No data changes to commit — files unchanged." && exit 0
+git add data/parts/
+git diff --cached --quiet && echo "⚠️  No data changes to commit — no new partitions." && exit 0
 git commit -m "data: update $(date '+%Y-%m-%d')"
 git push
 